@@ -215,9 +215,22 @@ class UserClient(TestbedClient):
             return [key for key, value in rsp.json().items() if value in {"finished", "failed"}]
         return list(rsp.json().keys())
 
+    def list_reservations(self) -> list[dict]:
+        """Query booked slots of the testbed (start & end, ID only for own experiments).
+
+        Experiments with a time_start reserve the testbed once they are scheduled.
+        """
+        rsp = self._req("get", "/experiments/reservations")
+        if not rsp.ok:
+            log.warning("Getting reservations failed with: %s", self._msg(rsp))
+            return []
+        return rsp.json()
+
     def create_experiment(self, xp: Experiment) -> UUID | None:
         """Upload a local experiment to the testbed-server and validate its feasibility.
 
+        With a time_start the experiment becomes a reservation (booked when scheduled),
+        otherwise the FIFO-scheduler picks the start.
         Will return the new UUID if successful.
         """
         data = xp.model_dump(mode="json")
@@ -227,6 +240,27 @@ class UserClient(TestbedClient):
             return None
         return UUID(rsp.json())
 
+    def create_experiments(
+        self, xps: list[Experiment], *, schedule: bool = False
+    ) -> list[UUID | None]:
+        """Upload several experiments with one request - optionally scheduling them as well.
+
+        The server validates all at once and checks the storage-quota once.
+        Returns the new UUIDs in the same order (None for rejected experiments).
+        Reservations (time_start) are not scheduled, use schedule_experiment() for them.
+        """
+        data = {"experiments": [xp.model_dump(mode="json") for xp in xps], "schedule": schedule}
+        rsp = self._req("post", "/experiments/batch", json=data)
+        if not rsp.ok:
+            log.warning("Batch creation failed with: %s", self._msg(rsp))
+            return [None] * len(xps)
+        xp_ids = []
+        for xp, item in zip(xps, rsp.json(), strict=True):
+            if item["error"] is not None:
+                log.warning("Experiment %s was rejected: %s", xp.name, item["error"])
+            xp_ids.append(UUID(item["id"]) if item["id"] is not None else None)
+        return xp_ids
+
     def get_experiment(self, xp_id: UUID) -> Experiment | None:
         """Request the experiment config matching the UUID."""
         rsp = self._req("get", f"/experiments/{xp_id}")
@@ -247,7 +281,7 @@ class UserClient(TestbedClient):
         """Get state of a specific experiment.
 
         - after valid submission: created
-        - after scheduling: scheduled
+        - after scheduling: scheduled (or waiting, while requested observers are offline)
         - during prep: preparation
         - during experiment: running
         - after the run: finished or failed
@@ -262,6 +296,14 @@ class UserClient(TestbedClient):
         log.info("Experiment state: %s", state)
         return state
 
+    def get_experiment_observers_awaited(self, xp_id: UUID) -> list[str] | None:
+        """Get the offline observers a "waiting" experiment is deferred for."""
+        rsp = self._req("get", f"/experiments/{xp_id}/awaited")
+        if not rsp.ok:
+            log.warning("Getting awaited observers failed with: %s", self._msg(rsp))
+            return None
+        return rsp.json()
+
     def get_experiment_statistics(self, xp_id: UUID) -> dict | None:
         """Get metadata of a specific experiment (relevant for statistics).
 
@@ -285,6 +327,19 @@ class UserClient(TestbedClient):
             log.warning("Scheduling experiment failed with: %s", self._msg(rsp))
         return rsp.ok
 
+    def cancel_experiment(self, xp_id: UUID) -> bool:
+        """Cancel a scheduled or running experiment.
+
+        Queued experiments return to state "created" and can be scheduled again.
+        Running ones get stopped by the scheduler, partial results stay available.
+        """
+        rsp = self._req("post", f"/experiments/{xp_id}/cancel")
+        if rsp.ok:
+            log.info("Experiment %s cancelled", xp_id)
+        else:
+            log.warning("Cancelling experiment failed with: %s", self._msg(rsp))
+        return rsp.ok
+
     def _get_experiment_downloads(self, xp_id: UUID) -> list[str] | None:
         """Query all endpoints for a specific experiment."""
         rsp = self._req("get", f"/experiments/{xp_id}/download")
@@ -334,3 +389,172 @@ class UserClient(TestbedClient):
         if delete_on_server:
             self.delete_experiment(xp_id)
         return downloads_ok
+
+    def get_experiment_preview(
+        self,
+        xp_id: UUID,
+        observer: str,
+        start_s: float = 0,
+        duration_s: float | None = None,
+        points: int = 1000,
+    ) -> dict | None:
+        """Get a decimated time-series of a finished recording without downloading it.
+
+        Voltage, current and power are reduced to min, max and mean per bin.
+        The window can be limited by start & duration (in seconds since start of recording).
+        """
+        params: dict[str, float | int] = {"start_s": start_s, "points": points}
+        if duration_s is not None:
+            params["duration_s"] = duration_s
+        rsp = self._req("get", f"/experiments/{xp_id}/preview/{observer}", params=params)
+        if not rsp.ok:
+            log.warning(
+                "Getting preview of %s - %s failed with: %s", xp_id, observer, self._msg(rsp)
+            )
+            return None
+        return rsp.json()
+
+    def download_experiment_bundle(
+        self,
+        xp_id: UUID,
+        path: Path,
+        observers: list[str] | None = None,
+        *,
+        delete_on_server: bool = False,
+    ) -> Path | None:
+        """Download a finished experiment as one tar-archive.
+
+        One long transfer instead of a request per observer - contains result-files,
+        experiment-config and logs. The selection can be limited to specific observers.
+        Existing archives are not overwritten. Returns the path of the archive.
+        """
+        xp = self.get_experiment(xp_id)
+        if xp is None:
+            return None
+        path_file = path / f"{xp.folder_name()}.tar"
+        if path_file.exists():
+            log.warning("File already exists - will skip download: %s", path_file)
+            return path_file
+        params = {"observers": observers} if observers else None
+        rsp = self._req("get", f"/experiments/{xp_id}/bundle", params=params, stream=True)
+        if not rsp.ok:
+            log.warning("Downloading bundle of %s failed with: %s", xp_id, self._msg(rsp))
+            return None
+        path.mkdir(parents=True, exist_ok=True)
+        path_part = path_file.with_suffix(".tar.part")  # avoids keeping incomplete archives
+        with path_part.open("wb") as fp:
+            shutil.copyfileobj(rsp.raw, fp)
+        path_part.rename(path_file)
+        log.info("Download of bundle completed: %s", path_file)
+        if delete_on_server:
+            self.delete_experiment(xp_id)
+        return path_file
+
+    def download_experiment_parquet(
+        self,
+        xp_id: UUID,
+        path: Path,
+        observers: list[str] | None = None,
+    ) -> bool:
+        """Download results of a finished experiment as parquet-dataset.
+
+        Files are stored partitioned by observer (path/xp_folder/observer=name/data.parquet),
+        so analysis-tools can load the directory directly.
+        The server converts each file on first request - this may take a while.
+        Existing files are not overwritten.
+        """
+        xp = self.get_experiment(xp_id)
+        if xp is None:
+            return False
+        node_ids = self._get_experiment_downloads(xp_id)
+        if node_ids is None:
+            return False
+        downloads_ok: bool = True
+        for node_id in node_ids:
+            if observers is not None and node_id not in observers:
+                continue
+            path_file = path / xp.folder_name() / f"observer={node_id}" / "data.parquet"
+            if path_file.exists():
+                log.warning("File already exists - will skip download: %s", path_file)
+                continue
+            rsp = self._req("get", f"/experiments/{xp_id}/export/{node_id}", stream=True)
+            if not rsp.ok:
+                log.warning("Exporting %s - %s failed with: %s", xp_id, node_id, self._msg(rsp))
+                downloads_ok = False
+                continue
+            path_file.parent.mkdir(parents=True, exist_ok=True)
+            with path_file.open("wb") as fp:
+                shutil.copyfileobj(rsp.raw, fp)
+            log.info("Download of file completed: %s", path_file)
+        return downloads_ok
+
+    # ####################################################################
+    # Campaigns
+    # ####################################################################
+
+    def create_campaign(
+        self, template: Experiment, parameters: dict[str, list], name: str | None = None
+    ) -> UUID | None:
+        """Upload a template-experiment with a parameter-grid to sweep.
+
+        Parameters are dotted paths into the template with their values, i.e.
+        {"target_configs.0.energy_env.name": ["eenv_a", "eenv_b"]}.
+        The server expands all combinations into experiments and validates them at once.
+        Will return the UUID of the campaign if successful.
+        """
+        data = {
+            "name": name or template.name,
+            "template": template.model_dump(mode="json"),
+            "parameters": parameters,
+        }
+        rsp = self._req("post", "/campaigns", json=data)
+        if not rsp.ok:
+            log.warning("Campaign creation failed with: %s", self._msg(rsp))
+            return None
+        return UUID(rsp.json())
+
+    def list_campaigns(self) -> dict[UUID, str]:
+        """Query IDs & names of the users campaigns."""
+        rsp = self._req("get", "/campaigns")
+        if not rsp.ok:
+            return {}
+        return {UUID(key): value for key, value in rsp.json().items()}
+
+    def get_campaign_state(self, campaign_id: UUID) -> dict | None:
+        """Get the summarized state and the state of each experiment of the campaign."""
+        rsp = self._req("get", f"/campaigns/{campaign_id}")
+        if not rsp.ok:
+            log.warning("Getting campaign state failed with: %s", self._msg(rsp))
+            return None
+        return rsp.json()
+
+    def schedule_campaign(self, campaign_id: UUID) -> bool:
+        """Enter all experiments of the campaign into the queue - they run back-to-back."""
+        rsp = self._req("post", f"/campaigns/{campaign_id}/schedule")
+        if rsp.ok:
+            log.info("Campaign %s scheduled", campaign_id)
+        else:
+            log.warning("Scheduling campaign failed with: %s", self._msg(rsp))
+        return rsp.ok
+
+    def download_campaign_bundle(self, campaign_id: UUID, path: Path) -> Path | None:
+        """Download results of all finished experiments of the campaign as one tar-archive.
+
+        Contains a folder per experiment and campaign.yaml with the parameters of each.
+        Existing archives are not overwritten. Returns the path of the archive.
+        """
+        path_file = path / f"campaign_{campaign_id}.tar"
+        if path_file.exists():
+            log.warning("File already exists - will skip download: %s", path_file)
+            return path_file
+        rsp = self._req("get", f"/campaigns/{campaign_id}/bundle", stream=True)
+        if not rsp.ok:
+            log.warning("Downloading campaign %s failed with: %s", campaign_id, self._msg(rsp))
+            return None
+        path.mkdir(parents=True, exist_ok=True)
+        path_part = path_file.with_suffix(".tar.part")  # avoids keeping incomplete archives
+        with path_part.open("wb") as fp:
+            shutil.copyfileobj(rsp.raw, fp)
+        path_part.rename(path_file)
+        log.info("Download of campaign completed: %s", path_file)
+        return path_file
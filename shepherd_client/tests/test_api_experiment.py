@@ -422,6 +422,31 @@ def test_schedule_experiment_as_admin(
     assert state == "scheduled"
 
 
+@pytest.mark.usefixtures("_server_api_up")
+def test_cancel_scheduled_experiment(
+    user1_client: UserClient, sample_experiment: Experiment
+) -> None:
+    uid = user1_client.create_experiment(sample_experiment)
+    assert uid is not None
+    assert not user1_client.cancel_experiment(uid)
+    assert user1_client.schedule_experiment(uid)
+    assert user1_client.cancel_experiment(uid)
+    state = user1_client.get_experiment_state(uid)
+    assert state == "created"
+
+
+@pytest.mark.usefixtures("_server_api_up")
+def test_cancel_experiment_is_private(
+    user1_client: UserClient, sample_experiment: Experiment, user2_client: UserClient
+) -> None:
+    uid = user1_client.create_experiment(sample_experiment)
+    assert uid is not None
+    assert user1_client.schedule_experiment(uid)
+    assert not user2_client.cancel_experiment(uid)
+    state = user1_client.get_experiment_state(uid)
+    assert state == "scheduled"
+
+
 # ###############################################################################
 # Download
 # ###############################################################################
@@ -468,6 +493,26 @@ def test_download_finished_experiment(
     assert success
 
 
+@pytest.mark.usefixtures("_server_api_up")
+def test_download_finished_experiment_bundle(
+    user1_client: UserClient, finished_experiment_id: UUID, tmp_path: Path
+) -> None:
+    path = user1_client.download_experiment_bundle(finished_experiment_id, tmp_path)
+    assert path is not None
+    assert path.exists()
+    assert path.suffix == ".tar"
+
+
+@pytest.mark.usefixtures("_server_api_up")
+def test_download_finished_experiment_parquet(
+    user1_client: UserClient, finished_experiment_id: UUID, tmp_path: Path
+) -> None:
+    pytest.importorskip("pyarrow")
+    success = user1_client.download_experiment_parquet(finished_experiment_id, tmp_path)
+    assert success
+    assert len(list(tmp_path.glob("*/observer=*/data.parquet"))) > 0
+
+
 @pytest.mark.usefixtures("_server_api_up")
 def test_download_deleted_experiment(
     user1_client: UserClient, finished_experiment_id: UUID, tmp_path: Path
@@ -603,3 +648,41 @@ def test_delete_experiment_as_admin(
     assert success
     state = user1_client.get_experiment_state(uid)
     assert state is None
+
+
+@pytest.mark.usefixtures("_server_api_up")
+def test_create_experiments_in_batch(
+    user1_client: UserClient, sample_experiment: Experiment
+) -> None:
+    xp_ids = user1_client.create_experiments([sample_experiment] * 3, schedule=True)
+    assert len(xp_ids) == 3
+    for xp_id in xp_ids:
+        assert xp_id is not None
+        assert user1_client.get_experiment_state(xp_id) == "scheduled"
+
+
+# ###############################################################################
+# Campaigns
+# ###############################################################################
+
+
+@pytest.mark.usefixtures("_server_api_up")
+def test_campaign_is_expanded_and_scheduled(
+    user1_client: UserClient, sample_experiment: Experiment
+) -> None:
+    campaign_id = user1_client.create_campaign(sample_experiment, {"duration": [10, 20, 30]})
+    assert campaign_id is not None
+    assert campaign_id in user1_client.list_campaigns()
+    state = user1_client.get_campaign_state(campaign_id)
+    assert state["state"] == "created"
+    assert len(state["experiments"]) == 3
+    assert user1_client.schedule_campaign(campaign_id)
+    state = user1_client.get_campaign_state(campaign_id)
+    assert state["state"] == "scheduled"
+
+
+@pytest.mark.usefixtures("_server_api_up")
+def test_campaign_rejects_invalid_grid(
+    user1_client: UserClient, sample_experiment: Experiment
+) -> None:
+    assert user1_client.create_campaign(sample_experiment, {"duratoin": [10, 20]}) is None
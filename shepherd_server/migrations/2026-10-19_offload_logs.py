@@ -0,0 +1,42 @@
+"""Specific Database migration
+
+Shrink documents:
+- inline logs of observers (stdout) and the scheduler-log are moved into compressed blobs
+- documents only keep the path to the blob
+
+"""
+
+import asyncio
+
+from shepherd_server.api_experiments.models import WebExperiment
+from shepherd_server.instance_db import db_available
+from shepherd_server.instance_db import db_client
+from shepherd_server.instance_fixtures import prepare_fixture_client
+from shepherd_server.logger import log
+
+
+async def offload_logs() -> None:
+    await db_client()
+
+    xp_states = await WebExperiment.get_all_states()
+    for uid in xp_states:
+        # one by one, as each document can be several MiB
+        wxp = await WebExperiment.get_by_id(uid)
+        if wxp is None:
+            continue
+        size_pre = len(wxp.model_dump_json())
+        wxp.offload_logs(wxp.id)
+        await wxp.save_changes()
+        log.info(
+            "Offloaded logs of XP %s: %d -> %d KiB",
+            uid,
+            size_pre / 2**10,
+            len(wxp.model_dump_json()) / 2**10,
+        )
+
+
+if __name__ == "__main__":
+    if not db_available(timeout=5):
+        raise ConnectionError("No connection to database! Will exit migration now.")
+    prepare_fixture_client()
+    asyncio.run(offload_logs())
@@ -157,7 +157,12 @@ class FastMailEngine(MailEngine):
                 "An observer failed, when errors were logged (non zero exit-code) "
                 "or no result-file was produced.\n"
             )
-        if web_exp.had_errors:
+        if len(web_exp.faulty_observers) > 0:
+            msg += (
+                f"- {len(web_exp.faulty_observers)} observer(s) recorded implausible data "
+                f"(empty or with time-jumps): {', '.join(web_exp.faulty_observers)}\n"
+            )
+        if web_exp.had_execution_errors:
             msg += "- the testbed is now being rebooted as a precaution\n"
             # TODO: should the user know about that?
 
@@ -167,6 +172,10 @@ class FastMailEngine(MailEngine):
             msg += f"\nResults can now be downloaded ({xp_files_n} files, {xp_size_MiB} MiB).\n"
         else:
             msg += "\nIt seems that no result-files were generated.\n"
+        if len(web_exp.observers_summary) > 0:
+            msg += "\nOverview of the results:\n"
+            for observer, summary in sorted(web_exp.observers_summary.items()):
+                msg += f"- {observer}: {summary}\n"
         if all_done:
             msg += "\nThere are no further experiments scheduled for you.\n"
 
@@ -188,6 +197,10 @@ class FastMailEngine(MailEngine):
         _miss_pre = _all - set(herd_composition.get("pre", []))
         _miss_pst = _all - set(herd_composition.get("post", []))
         msg = f"Herd was rebooted with:\n- {', '.join(sorted(_all))} (n={len(_all)})\n"
+        _rebooted = set(herd_composition.get("rebooted", _all))
+        if _rebooted != _all:
+            msg = f"Observers were rebooted:\n- {', '.join(sorted(_rebooted))}\n"
+            msg += f"Herd consists of {len(_all)} observers\n"
         if len(_miss_pre) > 0:
             msg += f"- pre-missing  = {', '.join(sorted(_miss_pre))} (n={len(_miss_pre)})\n"
         if len(_miss_pst) > 0:
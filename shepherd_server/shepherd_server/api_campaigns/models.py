@@ -0,0 +1,141 @@
+"""Measurement-campaigns: a template-experiment swept over a parameter-grid.
+
+The grid is expanded on the server, each variant becomes a regular WebExperiment.
+Variants are scheduled together and run back-to-back (FIFO). Preparation is shared
+implicitly - targets with identical firmware are not reprogrammed (see herd_cache.py).
+"""
+
+import itertools
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+from uuid import uuid4
+
+from beanie import Document
+from beanie import Link
+from pydantic import BaseModel
+from pydantic import Field
+from pydantic import ValidationError
+from shepherd_core.data_models.base.timezone import local_now
+from shepherd_core.data_models.experiment import Experiment
+from typing_extensions import Self
+
+from shepherd_server.api_accounts.models import User
+from shepherd_server.api_accounts.models import UserRole
+from shepherd_server.config import server_config
+
+
+class CampaignRequest(BaseModel):
+    name: str
+    template: Experiment
+    parameters: dict[str, list[Any]]
+    """
+    Dotted paths into the template with the values to sweep,
+    i.e. {"target_configs.0.virtual_source.name": ["direct", "BQ25504"]}.
+    All combinations are expanded (cartesian product).
+    """
+
+
+class CampaignState(BaseModel):
+    id: UUID
+    name: str
+    created_at: datetime
+    state: str
+    """Summary: created, scheduled, running, finished or partial (rest not scheduled)."""
+    experiments: dict[UUID, str]
+    """State of each variant (in order of expansion) - deleted ones are marked as such."""
+
+
+class Campaign(Document):
+    id: UUID = Field(default_factory=uuid4)
+    owner: Link[User] | None = None
+    name: str
+    created_at: datetime = Field(default_factory=local_now)
+
+    parameters: dict[str, list[Any]]
+    variants: list[dict[str, Any]] = Field(default_factory=list)
+    """Parameter-values per variant (same order as the experiments)."""
+    experiment_ids: list[UUID] = Field(default_factory=list)
+
+    class Settings:  # allows using .save_changes()
+        use_state_management = True
+        state_management_save_previous = True
+        validate_on_save = True
+
+    def may_be_accessed_by(self, user: User) -> bool:
+        if user.role == UserRole.admin:
+            return True
+        return isinstance(self.owner, Link) and self.owner.ref.id == user.id
+
+    @classmethod
+    async def get_by_id(cls, campaign_id: UUID) -> Self | None:
+        return await cls.find_one(cls.id == campaign_id)
+
+    @classmethod
+    async def get_by_user(cls, user: User) -> list[Self]:
+        return await cls.find(
+            cls.owner.email == user.email,
+            fetch_links=True,
+            lazy_parse=True,
+        ).to_list()
+
+
+def set_path(data: dict | list, path: str, value: Any) -> None:
+    """Replace the value behind a dotted path (list-indices as numbers).
+
+    Only existing keys can be replaced - this catches typos.
+    """
+    keys = path.split(".")
+    for key in keys[:-1]:
+        data = data[int(key)] if isinstance(data, list) else data[key]
+    if isinstance(data, list):
+        data[int(keys[-1])] = value
+    elif keys[-1] in data:
+        data[keys[-1]] = value
+    else:
+        raise KeyError(path)
+
+
+def expand_grid(request: CampaignRequest) -> list[tuple[dict[str, Any], Experiment]]:
+    """All combinations of the parameters applied to the template.
+
+    Raises ValueError on invalid paths, values or too many variants.
+    """
+    if len(request.parameters) == 0:
+        raise ValueError("Campaign needs at least one parameter to sweep")
+    count = 1
+    for values in request.parameters.values():
+        count *= len(values)
+    if count == 0 or count > server_config.campaign_variants_max:
+        msg = (
+            f"Campaign must expand to 1 - {server_config.campaign_variants_max} variants "
+            f"(has {count})"
+        )
+        raise ValueError(msg)
+    template = request.template.model_dump(mode="json", exclude_unset=True)
+    paths = list(request.parameters)
+    variants = []
+    for index, combination in enumerate(itertools.product(*request.parameters.values())):
+        assignment = dict(zip(paths, combination, strict=True))
+        data = template | {"name": f"{request.template.name[:46]}_{index:03d}"}
+        data = Experiment(**data).model_dump(mode="json")  # full structure for the paths
+        try:
+            for path, value in assignment.items():
+                set_path(data, path, value)
+            variants.append((assignment, Experiment(**data)))
+        except (KeyError, IndexError, TypeError, ValueError, ValidationError) as xcp:
+            msg = f"Variant {index} ({assignment}) is invalid: {xcp}"
+            raise ValueError(msg) from xcp
+    return variants
+
+
+def campaign_state(states: list[str]) -> str:
+    if len(states) == 0 or all(state in {"finished", "failed", "deleted"} for state in states):
+        return "finished"
+    if any(state in {"preparation", "running"} for state in states):
+        return "running"
+    if any(state in {"scheduled", "waiting"} for state in states):
+        return "scheduled"
+    if all(state == "created" for state in states):
+        return "created"
+    return "partial"  # some finished, the rest is not scheduled (i.e. cancelled)
@@ -0,0 +1,195 @@
+from datetime import datetime
+from datetime import timedelta
+from typing import Annotated
+from uuid import UUID
+
+import anyio
+import ryaml
+from beanie.operators import In
+from beanie.operators import Set
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import HTTPException
+from fastapi import Response
+from shepherd_core.data_models.base.timezone import local_now
+from shepherd_core.data_models.base.timezone import local_tz
+from shepherd_core.data_models.testbed import Testbed
+from starlette.responses import StreamingResponse
+
+from shepherd_server.api_accounts.models import User
+from shepherd_server.api_accounts.models import UserRole
+from shepherd_server.api_accounts.utils_misc import active_user
+from shepherd_server.api_experiments.models import BundleView
+from shepherd_server.api_experiments.models import WebExperiment
+from shepherd_server.api_experiments.utils_bundle import BundleMember
+from shepherd_server.api_experiments.utils_bundle import TarBundle
+from shepherd_server.api_experiments.utils_bundle import bundle_members
+from shepherd_server.api_experiments.utils_validate import check_experiment
+from shepherd_server.config import server_config
+
+from .models import Campaign
+from .models import CampaignRequest
+from .models import CampaignState
+from .models import campaign_state
+from .models import expand_grid
+
+router = APIRouter(prefix="/campaigns", tags=["Campaigns"])
+
+
+async def owned_campaign(
+    campaign_id: UUID,
+    user: Annotated[User, Depends(active_user)],
+) -> Campaign:
+    campaign = await Campaign.get_by_id(campaign_id)
+    if campaign is None:
+        raise HTTPException(404, "Not Found")
+    if not campaign.may_be_accessed_by(user):
+        raise HTTPException(403, "Forbidden")
+    return campaign
+
+
+@router.post("/")
+async def create_campaign(
+    request: CampaignRequest,
+    user: Annotated[User, Depends(active_user)],
+) -> UUID:
+    """Expand the template over the parameter-grid and validate all variants in one pass.
+
+    Nothing is stored if a single variant is rejected.
+    """
+    if request.template.time_start is not None:
+        raise HTTPException(403, "template.time_start must be None, variants run back-to-back")
+    try:
+        variants = expand_grid(request)
+    except ValueError as xcp:
+        raise HTTPException(403, str(xcp)) from xcp
+
+    def check_all() -> str | None:
+        testbed = Testbed(name=server_config.testbed_name)
+        for index, (_, experiment) in enumerate(variants):
+            reason = check_experiment(experiment, user, testbed)
+            if reason is not None:
+                return f"Variant {index}: {reason}"
+        return None
+
+    reason = await anyio.to_thread.run_sync(check_all)
+    if reason is not None:
+        raise HTTPException(403, reason)
+
+    campaign = Campaign(
+        owner=user,
+        name=request.name,
+        parameters=request.parameters,
+        variants=[assignment for assignment, _ in variants],
+    )
+    ts_now = local_now()
+    web_experiments = [
+        WebExperiment(
+            experiment=experiment,
+            owner=user,
+            campaign_id=campaign.id,
+            created_at=ts_now + timedelta(milliseconds=index),  # keeps the order in the queue
+        )
+        for index, (_, experiment) in enumerate(variants)
+    ]
+    campaign.experiment_ids = [web_exp.id for web_exp in web_experiments]
+    await WebExperiment.insert_many(web_experiments)
+    await campaign.insert()
+    return campaign.id
+
+
+@router.get("/")
+async def list_campaigns(
+    user: Annotated[User, Depends(active_user)],
+) -> dict[UUID, str]:
+    return {campaign.id: campaign.name for campaign in await Campaign.get_by_user(user)}
+
+
+@router.get("/{campaign_id}")
+async def get_campaign_state(
+    campaign: Annotated[Campaign, Depends(owned_campaign)],
+) -> CampaignState:
+    states = await WebExperiment.get_states(campaign.experiment_ids)
+    experiments = {xp_id: states.get(xp_id, "deleted") for xp_id in campaign.experiment_ids}
+    return CampaignState(
+        id=campaign.id,
+        name=campaign.name,
+        created_at=campaign.created_at,
+        state=campaign_state(list(experiments.values())),
+        experiments=experiments,
+    )
+
+
+@router.post("/{campaign_id}/schedule")
+async def schedule_campaign(
+    campaign: Annotated[Campaign, Depends(owned_campaign)],
+    user: Annotated[User, Depends(active_user)],
+) -> Response:
+    """Enqueue all unscheduled variants at once - they run back-to-back."""
+    _storage = await WebExperiment.get_storage(user)
+    if _storage > user.quota_storage:
+        _size_GiB = _storage / (1024**3)
+        _quota_GiB = user.quota_storage / (1024**3)
+        raise HTTPException(
+            409,
+            f"Quota on storage was exceeded ({_size_GiB:.3f} > {_quota_GiB:.3f} GiB). "
+            "Delete old experiments first to continue.",
+        )
+    result = await WebExperiment.find(
+        In(WebExperiment.id, campaign.experiment_ids),
+        WebExperiment.requested_execution_at == None,  # noqa: E711 beanie cannot handle 'is None'
+    ).update(Set({WebExperiment.requested_execution_at: datetime.now(tz=local_tz())}))
+    if result.modified_count == 0:
+        raise HTTPException(409, "Campaign already scheduled")
+    return Response(status_code=204)
+
+
+@router.get("/{campaign_id}/bundle")
+async def download_campaign_bundle(
+    campaign: Annotated[Campaign, Depends(owned_campaign)],
+    user: Annotated[User, Depends(active_user)],
+) -> StreamingResponse:
+    """Stream results of all finished variants as one tar-archive (one folder per variant).
+
+    campaign.yaml maps the folders to the parameter-values.
+    """
+    index = []
+    members = []
+    for number, xp_id in enumerate(campaign.experiment_ids):
+        web_experiment = await WebExperiment.get_view(xp_id, BundleView)
+        state = web_experiment.state if web_experiment is not None else "deleted"
+        folder = None
+        if state in {"finished", "failed"} and web_experiment.result_paths is not None:
+            folder = web_experiment.experiment.folder_name()
+            observers = sorted(
+                observer for observer, path in web_experiment.result_paths.items() if path.is_file()
+            )
+            members += bundle_members(
+                web_experiment,
+                xp_id,
+                observers,
+                prefix=f"{folder}/",
+                scheduler_log=user.role == UserRole.admin,
+            )
+        index.append(
+            {
+                "id": str(xp_id),
+                "state": state,
+                "folder": folder,
+                "parameters": campaign.variants[number] if number < len(campaign.variants) else {},
+            }
+        )
+    if len(members) == 0:
+        raise HTTPException(409, "No variant of the campaign finished yet")
+    summary = {"name": campaign.name, "parameters": campaign.parameters, "variants": index}
+    members.insert(0, BundleMember(name="campaign.yaml", data=ryaml.dumps(summary).encode()))
+
+    bundle = TarBundle(members)
+    return StreamingResponse(
+        bundle.stream(),
+        media_type="application/x-tar",
+        headers={
+            "Content-Length": str(bundle.size),
+            "Content-Disposition": f'attachment; filename="campaign_{campaign.id}.tar"',
+        },
+    )
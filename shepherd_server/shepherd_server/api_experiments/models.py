@@ -3,15 +3,19 @@ import shutil
 import subprocess
 from datetime import datetime
 from datetime import timedelta
+from enum import Enum
 from io import StringIO
 from pathlib import Path
+from typing import TypeVar
 from uuid import UUID
 from uuid import uuid4
 
 import pymongo
 from beanie import Document
 from beanie import Link
+from beanie.odm.queries.update import UpdateResponse
 from beanie.operators import In
+from beanie.operators import Set
 from fastapi import UploadFile
 from pydantic import BaseModel
 from pydantic import EmailStr
@@ -28,6 +32,12 @@ from shepherd_server.api_accounts.models import UserRole
 from shepherd_server.config import server_config
 from shepherd_server.logger import log
 
+from .utils_storage import blob_path
+from .utils_storage import blob_read
+from .utils_storage import blob_write
+from .utils_summary import ObserverSummary
+from .utils_summary import summarize_results
+
 
 def obtain_access_permissions(path: Path) -> None:
     ret = subprocess.run(  # noqa: S603
@@ -44,8 +54,22 @@ def obtain_access_permissions(path: Path) -> None:
 
 class ReplyData(BaseModel):
     exited: int  # state of process: -1: still active, 0: exited without error, 1: exited with error
-    stdout: str
-    stderr: str
+    stdout: str = ""
+    stderr: str = ""
+    log_path: Path | None = None
+    """Compressed service-log on the server, streamed during the experiment.
+    Referenced instead of embedding the (potentially large) stdout.
+    """
+
+    def get_stdout(self) -> str:
+        return self.stdout + (blob_read(self.log_path) or "")
+
+    def offload(self, path: Path) -> None:
+        """Move inline stdout into a compressed blob."""
+        if len(self.stdout) == 0:
+            return
+        self.log_path = blob_write(path, self.stdout, append=self.log_path == path)
+        self.stdout = ""
 
 
 class ErrorData(BaseModel):
@@ -56,9 +80,41 @@ class ErrorData(BaseModel):
 
     observers_output: dict[str, ReplyData] = {}
     observers_had_data: dict[str, bool] = {}
+    observers_summary: dict[str, ObserverSummary] = {}
+    """Data-quality of the result-files, filled by post-processing after the run."""
 
     scheduler_error: str | None = None
-    scheduler_log: str | None = None  # for admin
+    scheduler_retries: int = 0
+    """Attempts that were aborted by transient failures (see herd_recovery.py)."""
+    scheduler_log: str | None = None  # for admin, only inline for legacy documents
+    scheduler_log_path: Path | None = None
+    """Compressed log of the scheduler (for admin), loaded only on demand."""
+
+    def get_scheduler_log(self) -> str | None:
+        if self.scheduler_log_path is None:
+            return self.scheduler_log
+        return blob_read(self.scheduler_log_path)
+
+    def offload_logs(self, xp_id: UUID) -> None:
+        """Move all inline logs into compressed blobs to keep the document small."""
+        for hostname, reply in self.observers_output.items():
+            reply.offload(blob_path(xp_id, f"{hostname}.log"))
+        if self.scheduler_log is not None and len(self.scheduler_log) > 0:
+            self.scheduler_log_path = blob_write(
+                blob_path(xp_id, "scheduler.log"), self.scheduler_log
+            )
+        self.scheduler_log = None
+
+    def delete_logs(self) -> None:
+        log_dirs = {
+            reply.log_path.parent
+            for reply in self.observers_output.values()
+            if reply.log_path is not None
+        }
+        if self.scheduler_log_path is not None:
+            log_dirs.add(self.scheduler_log_path.parent)
+        for log_dir in log_dirs:
+            shutil.rmtree(log_dir, ignore_errors=True)
 
     def get_terminal_output(self, *, only_faulty: bool = False) -> list[UploadFile]:
         """Log output-results of shell commands."""
@@ -72,9 +128,10 @@ class ErrorData(BaseModel):
             if only_faulty and not had_error:
                 continue
             string = ""
-            if len(reply.stdout) > 0:
+            stdout = reply.get_stdout()
+            if len(stdout) > 0:
                 string += f"\n************** {hostname} - stdout **************\n"
-                string += reply.stdout
+                string += stdout
             if len(reply.stderr) > 0:
                 string += f"\n~~~~~~~~~~~~~~ {hostname} - stderr ~~~~~~~~~~~~~~\n"
                 string += reply.stderr
@@ -85,9 +142,10 @@ class ErrorData(BaseModel):
                     file=StringIO(string),
                 )
             )
-        if self.scheduler_log is not None and len(self.scheduler_log) > 0:
+        scheduler_log = self.get_scheduler_log()
+        if scheduler_log is not None and len(scheduler_log) > 0:
             # TODO: only admin & only if faulty
-            files.append(UploadFile(filename="scheduler.log", file=StringIO(self.scheduler_log)))
+            files.append(UploadFile(filename="scheduler.log", file=StringIO(scheduler_log)))
         return files
 
     @property
@@ -104,6 +162,107 @@ class ErrorData(BaseModel):
     def missing_observers(self) -> list[str]:
         return sorted(set(self.observers_requested) - set(self.observers_online))
 
+    @property
+    def faulty_observers(self) -> list[str]:
+        """Observers that produced a result-file with implausible content."""
+        return sorted(
+            obs
+            for obs, summary in self.observers_summary.items()
+            if obs in self.observers_requested and not summary.is_plausible
+        )
+
+
+class StateData(ErrorData):
+    requested_execution_at: datetime | None = None
+    """
+    None, if the experiment should not be executed.
+    Set by the API to current wall-clock time when the user requests the experiment
+    to be executed.
+    This is NOT the time when the experiment should be run!
+    """
+
+    started_at: datetime | None = None
+    """
+    None, when the experiment is not yet prepared on the testbed.
+    Set to current wall-clock time when the web runner picks experiment and
+    starts preparation on the testbed.
+    """
+
+    executed_at: datetime | None = None
+    """
+    None, when the experiment is not yet executed.
+    Set to current wall-clock time when the actual experiment starts.
+    """
+
+    finished_at: datetime | None = None
+    """
+    None, when the experiment is not yet finished (still executing or not yet started).
+    Set to current wall-clock time by the web runner when the testbed finished execution.
+    """
+
+    observers_awaited: list[str] = []
+    """
+    Requested observers that are offline - the scheduler defers the experiment
+    till they return (or the maximum deferral passed). Empty otherwise.
+    """
+
+    deferred_since: datetime | None = None
+    """Set by the scheduler when it first deferred the experiment."""
+
+    cancel_requested_at: datetime | None = None
+    """
+    None, if the experiment was not cancelled while on the testbed.
+    Set by the API when the user cancels - the scheduler stops the measurement,
+    collects the partial results and moves on.
+    """
+
+    @property
+    def state(self) -> str:
+        # TODO: add deleted?
+        if self.finished_at is not None:
+            if self.had_errors:
+                return "failed"
+            return "finished"
+        if self.executed_at is not None and self.executed_at < datetime.now(
+            tz=self.executed_at.tzinfo
+        ):
+            # the code above looks weird, but default beanie does not save TZ, so we adapt
+            return "running"
+        if self.started_at is not None:
+            return "preparation"
+        if self.requested_execution_at is not None:
+            if len(self.observers_awaited) > 0:
+                return "waiting"
+            return "scheduled"
+        return "created"
+
+    @property
+    def skipped_execution(self) -> bool:
+        return self.finished_at is not None and self.executed_at is None
+
+    @property
+    def has_missing_data(self) -> bool:
+        return (
+            self.finished_at is not None
+            and self.executed_at is not None
+            and super().has_missing_data
+        )
+
+    @property
+    def had_execution_errors(self) -> bool:
+        """Errors of the testbed itself (independent of the content of the results)."""
+        return (
+            self.max_exit_code > 0
+            or self.scheduler_error is not None
+            or self.skipped_execution
+            or self.has_missing_data
+            or len(self.missing_observers) > 0
+        )
+
+    @property
+    def had_errors(self) -> bool:
+        return self.had_execution_errors or len(self.faulty_observers) > 0
+
 
 class ResultData(ErrorData):
     observer_paths: dict[str, Path] | None = None
@@ -117,6 +276,8 @@ class ResultData(ErrorData):
     Content-path is currently the parent of result-path.
     Besides the H5-files, it contains firmware and meta-data.
     """
+    repacked_at: datetime | None = None
+    """Set when result-files were recompressed to save storage."""
 
     async def update_size(self) -> None:
         _size = 0
@@ -185,6 +346,17 @@ class ResultData(ErrorData):
         else:
             raise TypeError("ResultData-Type was used outside of WebExperiment-Context")
 
+    async def update_summary(self) -> None:
+        """Analyze result-files - costly, so it runs as post-processing of the scheduler."""
+        if isinstance(self.result_paths, dict):
+            self.observers_summary = await summarize_results(self.result_paths)
+        else:
+            self.observers_summary = {}
+        if isinstance(self, Document):
+            await self.save_changes()
+        else:
+            raise TypeError("ResultData-Type was used outside of WebExperiment-Context")
+
     async def delete_content(self) -> None:
         # TODO: just overwrite default delete-method?
         if isinstance(self.result_paths, dict):
@@ -198,50 +370,127 @@ class ResultData(ErrorData):
             for content_dir in self.content_paths.values():
                 shutil.rmtree(content_dir, ignore_errors=True)
             self.content_paths = None
+        self.delete_logs()
         if isinstance(self, Document):
             await self.save_changes()
         else:
             raise TypeError("ResultData-Type was used outside of WebExperiment-Context")
 
 
-class WebExperiment(Document, ResultData, ErrorData):
-    id: UUID = Field(default_factory=uuid4)
+class OwnerView(BaseModel):
+    """Projection of a WebExperiment to check access without loading the whole document.
+
+    The owner stays an unfetched link, so only the ID of the user is compared.
+    """
+
     owner: Link[User] | None = None
+
+    def may_be_accessed_by(self, user: User) -> bool:
+        if user.role == UserRole.admin:
+            return True
+        return isinstance(self.owner, Link) and self.owner.ref.id == user.id
+
+
+class ExperimentView(OwnerView):
     experiment: Experiment
 
-    created_at: datetime = Field(default_factory=local_now)
 
+class StateView(OwnerView, StateData):
+    pass
+
+
+class DownloadView(StateView):
+    result_paths: dict[str, Path] | None = None
+
+
+class BundleView(DownloadView):
+    experiment: Experiment
+
+
+class ExperimentTiming(BaseModel):
+    """Subset of the experiment-config that decides about reservations."""
+
+    time_start: datetime | None = None
+    duration: timedelta | None = None
+
+
+class ScheduleView(StateView):
+    experiment: ExperimentTiming
+
+    class Settings:
+        # only the timing of the (possibly large) experiment-config is loaded
+        projection = {  # noqa: RUF012
+            **dict.fromkeys(StateView.model_fields, 1),
+            "experiment.time_start": 1,
+            "experiment.duration": 1,
+        }
+
+
+class ReservationView(OwnerView):
+    """Booked slot of an experiment (see utils_calendar)."""
+
+    id: UUID = Field(alias="_id")
     requested_execution_at: datetime | None = None
-    """
-    None, if the experiment should not be executed.
-    Set by the API to current wall-clock time when the user requests the experiment
-    to be executed.
-    This is NOT the time when the experiment should be run!
-    """
+    reserved_from: datetime
+    reserved_until: datetime
 
-    started_at: datetime | None = None
-    """
-    None, when the experiment is not yet prepared on the testbed.
-    Set to current wall-clock time when the web runner picks experiment and
-    starts preparation on the testbed.
-    """
 
-    executed_at: datetime | None = None
-    """
-    None, when the experiment is not yet executed.
-    Set to current wall-clock time when the actual experiment starts.
-    """
+class ExperimentBatch(BaseModel):
+    experiments: list[Experiment]
+    schedule: bool = False
+    """Enqueue the accepted experiments right away (reservations excluded)."""
 
-    finished_at: datetime | None = None
-    """
-    None, when the experiment is not yet finished (still executing or not yet started).
-    Set to current wall-clock time by the web runner when the testbed finished execution.
-    """
+
+class BatchItem(BaseModel):
+    """Result per submitted experiment (same order as the batch)."""
+
+    id: UUID | None = None
+    scheduled: bool = False
+    error: str | None = None
+
+
+ViewType = TypeVar("ViewType", bound=OwnerView)
+
+
+class SchedulerPhase(str, Enum):
+    """Progress of the scheduler on an experiment - persisted to survive restarts."""
+
+    preparing = "preparing"
+    executing = "executing"
+    collecting = "collecting"
+
+
+class WebExperiment(Document, ResultData, StateData):
+    id: UUID = Field(default_factory=uuid4)
+    owner: Link[User] | None = None
+    experiment: Experiment
+
+    created_at: datetime = Field(default_factory=local_now)
+
+    scheduler_phase: SchedulerPhase | None = None
+    """Set while the scheduler works on the experiment (None once finished)."""
+    herd_since: datetime | None = None
+    """Observer-time before preparation - start of the service-logs."""
+    expected_end_at: datetime | None = None
+    """Deadline of the execution - a restarted scheduler can reattach till then."""
+
+    campaign_id: UUID | None = None
+    """Set for variants of a measurement-campaign (see api_campaigns)."""
+
+    reserved_from: datetime | None = None
+    """Booked slot of experiments with a fixed time_start (see utils_calendar)."""
+    reserved_until: datetime | None = None
 
     class Settings:  # allows using .save_changes()
         use_state_management = True
         state_management_save_previous = True
         validate_on_save = True
+        indexes = [  # noqa: RUF012
+            pymongo.IndexModel(
+                [("reserved_from", pymongo.ASCENDING), ("reserved_until", pymongo.ASCENDING)],
+                sparse=True,
+            ),
+        ]
 
     @classmethod
     async def get_by_id(cls, experiment_id: UUID) -> Self | None:
@@ -251,6 +500,11 @@ class WebExperiment(Document, ResultData, ErrorData):
             # lazy_parse only recommended when not changing & saving
         )
 
+    @classmethod
+    async def get_view(cls, experiment_id: UUID, view: type[ViewType]) -> ViewType | None:
+        """Light-weight alternative to .get_by_id() that only loads the fields of the view."""
+        return await cls.find_one(cls.id == experiment_id, projection_model=view)
+
     @classmethod
     @deprecated("Usage discouraged, as each element may be 1 - 10 MiB in size.")
     async def get_by_user(cls, user: User) -> list[Self]:
@@ -280,6 +534,12 @@ class WebExperiment(Document, ResultData, ErrorData):
             ).to_list()
         return {date.id: date.state for date in data}
 
+    @classmethod
+    async def get_states(cls, experiment_ids: list[UUID]) -> dict[UUID, str]:
+        """States of a selection of experiments - missing ones are left out."""
+        data = await cls.find(In(cls.id, experiment_ids), lazy_parse=True).to_list()
+        return {date.id: date.state for date in data}
+
     @classmethod
     async def get_storage(cls, user: User) -> int:
         # TODO: performance optimization
@@ -296,21 +556,106 @@ class WebExperiment(Document, ResultData, ErrorData):
         Finds the WebExperiment with the oldest scheduling_at datetime,
         that has not been executed yet (status less than active).
         """
+        next_experiments = await cls.get_queue(only_elevated=only_elevated, limit=1)
+        if len(next_experiments) > 0:
+            return next_experiments[0]
+        return None
+
+    @classmethod
+    async def get_queue(cls, *, only_elevated: bool = False, limit: int = 20) -> list[Self]:
+        """Scheduled experiments in FIFO-order (like get_next_scheduling()).
+
+        Reservations are excluded, see get_reservations().
+        """
         roles_allow = [UserRole.admin, UserRole.elevated] if only_elevated else list(UserRole)
-        next_experiments = (
+        return (
             await cls.find(
                 cls.requested_execution_at != None,  # noqa: E711 beanie cannot handle 'is not None'
                 cls.started_at == None,  # noqa: E711
+                cls.reserved_from == None,  # noqa: E711
                 In(cls.owner.role, roles_allow),
                 fetch_links=True,
             )
-            .sort((cls.requested_execution_at, pymongo.ASCENDING))
-            .limit(1)
+            .sort(
+                (cls.requested_execution_at, pymongo.ASCENDING),
+                (cls.created_at, pymongo.ASCENDING),  # keeps order of batches & campaigns
+            )
+            .limit(limit)
+            .to_list()
+        )
+
+    @classmethod
+    async def get_reservations(cls) -> list[Self]:
+        """Booked slots of unfinished experiments, sorted by start."""
+        return (
+            await cls.find(
+                cls.reserved_from != None,  # noqa: E711 beanie cannot handle 'is not None'
+                cls.finished_at == None,  # noqa: E711
+                fetch_links=True,
+            )
+            .sort((cls.reserved_from, pymongo.ASCENDING))
             .to_list()
         )
-        if len(next_experiments) > 0:
-            return next_experiments[0]
-        return None
+
+    @classmethod
+    async def get_slots(
+        cls,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        user: User | None = None,
+    ) -> list[ReservationView]:
+        """Light-weight alternative to .get_reservations(), sorted by start.
+
+        Optionally only slots that overlap the interval or belong to the user.
+        """
+        filters = [
+            cls.reserved_from != None,  # noqa: E711 beanie cannot handle 'is not None'
+            cls.finished_at == None,  # noqa: E711
+        ]
+        if start is not None:
+            filters.append(cls.reserved_until > start)
+        if end is not None:
+            filters.append(cls.reserved_from < end)
+        if user is not None:
+            filters.append(cls.owner.id == user.id)
+        return (
+            await cls.find(*filters, projection_model=ReservationView)
+            .sort((cls.reserved_from, pymongo.ASCENDING))
+            .to_list()
+        )
+
+    @classmethod
+    async def claim(cls, xp_id: UUID) -> Self | None:
+        """Atomically mark the experiment as started - None if another scheduler was faster."""
+        claimed = await cls.find_one(
+            cls.id == xp_id,
+            cls.started_at == None,  # noqa: E711 beanie cannot handle 'is None'
+            cls.requested_execution_at != None,  # noqa: E711 might got cancelled meanwhile
+        ).update(
+            Set(
+                {
+                    cls.started_at: local_now(),
+                    cls.observers_awaited: [],
+                    cls.deferred_since: None,
+                }
+            ),
+            response_type=UpdateResponse.NEW_DOCUMENT,
+        )
+        if claimed is None:
+            return None
+        return await cls.get_by_id(xp_id)
+
+    @classmethod
+    async def defer(cls, xp_id: UUID, observers: list[str]) -> None:
+        """Mark a queued experiment as waiting for the offline observers."""
+        await cls.find_one(
+            cls.id == xp_id,
+            cls.started_at == None,  # noqa: E711 beanie cannot handle 'is None'
+        ).update(Set({cls.observers_awaited: observers}))
+        await cls.find_one(
+            cls.id == xp_id,
+            cls.deferred_since == None,  # noqa: E711
+        ).update(Set({cls.deferred_since: local_now()}))
 
     @classmethod
     async def has_scheduled_by_user(cls, user: User) -> bool:
@@ -327,6 +672,24 @@ class WebExperiment(Document, ResultData, ErrorData):
         )
         return len(xp_) > 0
 
+    @classmethod
+    async def cancel_requested(cls, xp_id: UUID) -> bool:
+        """Cheap check for the scheduler - the document is not loaded."""
+        count = await cls.find(
+            cls.id == xp_id,
+            cls.cancel_requested_at != None,  # noqa: E711 beanie cannot handle 'is not None'
+        ).count()
+        return count > 0
+
+    @classmethod
+    async def get_in_flight(cls) -> list[Self]:
+        """Experiments that were started but not finished (i.e. before a restart)."""
+        return await cls.find(
+            cls.finished_at == None,  # noqa: E711 beanie cannot handle 'is not None'
+            cls.started_at != None,  # noqa: E711
+            fetch_links=True,
+        ).to_list()
+
     @classmethod
     async def reset_stuck_items(cls) -> None:
         """Find and reset scheduled, but unfinished experiments."""
@@ -340,6 +703,7 @@ class WebExperiment(Document, ResultData, ErrorData):
         for _xp in stuck_xps:
             log.info("Resetting experiment: %s", _xp.id)
             _xp.started_at = None
+            _xp.scheduler_phase = None
             await _xp.save_changes()
 
     @classmethod
@@ -401,46 +765,6 @@ class WebExperiment(Document, ResultData, ErrorData):
             log.info("Pruning old experiments freed: %d MiB", size_total / (2**20))
         return size_total
 
-    @property
-    def state(self) -> str:
-        # TODO: add deleted?
-        if self.finished_at is not None:
-            if self.had_errors:
-                return "failed"
-            return "finished"
-        if self.executed_at is not None and self.executed_at < datetime.now(
-            tz=self.executed_at.tzinfo
-        ):
-            # the code above looks weird, but default beanie does not save TZ, so we adapt
-            return "running"
-        if self.started_at is not None:
-            return "preparation"
-        if self.requested_execution_at is not None:
-            return "scheduled"
-        return "created"
-
-    @property
-    def skipped_execution(self) -> bool:
-        return self.finished_at is not None and self.executed_at is None
-
-    @property
-    def has_missing_data(self) -> bool:
-        return (
-            self.finished_at is not None
-            and self.executed_at is not None
-            and super().has_missing_data
-        )
-
-    @property
-    def had_errors(self) -> bool:
-        return (
-            self.max_exit_code > 0
-            or self.scheduler_error is not None
-            or self.skipped_execution
-            or self.has_missing_data
-            or len(self.missing_observers) > 0
-        )
-
     async def update_time_start(
         self, time_start: datetime | None = None, *, force: bool = False
     ) -> None:
@@ -498,6 +822,7 @@ class ExperimentStats(Document):
     max_exit_code: int | None = None
     scheduler_error: str | None = None
     missing_observers: list[str] | None = None
+    observers_awaited: list[str] | None = None
 
     # TODO: if these statistics stay, consider adding
     #      - used eenvs &
@@ -537,6 +862,7 @@ class ExperimentStats(Document):
         self.max_exit_code = wxp.max_exit_code
         self.scheduler_error = wxp.scheduler_error
         self.missing_observers = wxp.missing_observers
+        self.observers_awaited = wxp.observers_awaited
 
     @classmethod
     async def update_with(
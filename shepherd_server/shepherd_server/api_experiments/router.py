@@ -1,16 +1,22 @@
+import asyncio
 from datetime import datetime
+from datetime import timedelta
 from typing import Annotated
 from uuid import UUID
 
+import anyio
+from beanie.operators import Set
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import HTTPException
+from fastapi import Query
 from fastapi import Response
+from shepherd_core.data_models.base.timezone import local_now
 from shepherd_core.data_models.base.timezone import local_tz
 from shepherd_core.data_models.experiment import Experiment
-from shepherd_core.data_models.task import TestbedTasks
 from shepherd_core.data_models.testbed import Testbed
 from starlette.responses import FileResponse
+from starlette.responses import StreamingResponse
 
 from shepherd_server.api_accounts.models import User
 from shepherd_server.api_accounts.models import UserRole
@@ -18,8 +24,33 @@ from shepherd_server.api_accounts.utils_misc import active_admin_user
 from shepherd_server.api_accounts.utils_misc import active_user
 from shepherd_server.config import server_config
 
+from .models import BatchItem
+from .models import BundleView
+from .models import DownloadView
+from .models import ExperimentBatch
 from .models import ExperimentStats
+from .models import ExperimentView
+from .models import OwnerView
+from .models import ReservationView
+from .models import ScheduleView
+from .models import StateView
 from .models import WebExperiment
+from .utils_access import owned_experiment
+from .utils_bundle import TarBundle
+from .utils_bundle import bundle_members
+from .utils_calendar import ReservationSlot
+from .utils_calendar import booked_first
+from .utils_calendar import check_reservation
+from .utils_calendar import get_calendar
+from .utils_calendar import reservation_slot
+from .utils_calendar import validate_time_start
+from .utils_export import export_available
+from .utils_export import get_export
+from .utils_preview import PREVIEW_POINTS_MAX
+from .utils_preview import PreviewData
+from .utils_preview import get_preview
+from .utils_validate import check_experiment
+from .utils_validate import projected_size
 
 router = APIRouter(prefix="/experiments", tags=["Experiments"])
 
@@ -29,31 +60,9 @@ async def create_experiment(
     experiment: Experiment,
     user: Annotated[User, Depends(active_user)],
 ) -> UUID:
-    if experiment.time_start is not None:
-        raise HTTPException(
-            403,
-            "xp.time_start must be None,"
-            "the FIFO-scheduler will pick the start time after the experiment is scheduled.",
-        )
-    if (experiment.duration is None) or (experiment.duration > user.quota_duration):
-        raise HTTPException(
-            403,
-            f"xp.duration must be set to value <= {user.quota_duration} s (user-quota)",
-        )
-
-    tb = Testbed(name=server_config.testbed_name)
-    tb_tasks = TestbedTasks.from_xp(experiment, tb)
-    try:
-        contained = tb_tasks.is_contained()
-    except AttributeError:
-        contained = True
-    if not contained:
-        raise HTTPException(403, "Experiment was assessed as potentially hazardous.")
-
-    for tgt_cfg in experiment.target_configs:
-        # TODO: only temporary until numpy is updated
-        if tgt_cfg.power_tracing is not None and tgt_cfg.power_tracing.samplerate != 100_000:
-            raise HTTPException(403, "power_tracing.samplerate must be 100 kHz (unstable)")
+    reason = check_experiment(experiment, user)
+    if reason is not None:
+        raise HTTPException(403, reason)
     web_experiment = WebExperiment(
         experiment=experiment,
         owner=user,
@@ -66,6 +75,68 @@ async def create_experiment(
     return web_experiment.id
 
 
+@router.post("/batch")
+async def create_experiments(
+    batch: ExperimentBatch,
+    user: Annotated[User, Depends(active_user)],
+) -> list[BatchItem]:
+    """Create (and optionally schedule) many experiments with one request.
+
+    Items are validated concurrently, the storage-quota is checked once against the
+    combined projected size and accepted experiments are inserted with one bulk-write.
+    Rejected items carry the reason. Reservations (time_start) are created,
+    but have to be scheduled individually (conflict-check).
+    """
+    if len(batch.experiments) > server_config.batch_size_max:
+        raise HTTPException(403, f"Batch is limited to {server_config.batch_size_max} experiments")
+    testbed = Testbed(name=server_config.testbed_name)
+    reasons = await asyncio.gather(
+        *(
+            anyio.to_thread.run_sync(check_experiment, experiment, user, testbed)
+            for experiment in batch.experiments
+        )
+    )
+    schedule = [
+        batch.schedule and reason is None and experiment.time_start is None
+        for experiment, reason in zip(batch.experiments, reasons, strict=True)
+    ]
+    if any(schedule):
+        _storage = await WebExperiment.get_storage(user) + sum(
+            projected_size(experiment)
+            for experiment, scheduled in zip(batch.experiments, schedule, strict=True)
+            if scheduled
+        )
+        if _storage > user.quota_storage:
+            _size_GiB = _storage / (1024**3)
+            _quota_GiB = user.quota_storage / (1024**3)
+            raise HTTPException(
+                409,
+                f"Quota on storage would be exceeded ({_size_GiB:.3f} > {_quota_GiB:.3f} GiB, "
+                "projected). Delete old experiments or submit fewer to continue.",
+            )
+
+    ts_now = local_now()
+    items = []
+    web_experiments = []
+    for index, (experiment, reason, scheduled) in enumerate(
+        zip(batch.experiments, reasons, schedule, strict=True)
+    ):
+        if reason is not None:
+            items.append(BatchItem(error=reason))
+            continue
+        web_experiment = WebExperiment(
+            experiment=experiment,
+            owner=user,
+            created_at=ts_now + timedelta(milliseconds=index),  # keeps the order in the queue
+            requested_execution_at=ts_now if scheduled else None,
+        )
+        web_experiments.append(web_experiment)
+        items.append(BatchItem(id=web_experiment.id, scheduled=scheduled))
+    if len(web_experiments) > 0:
+        await WebExperiment.insert_many(web_experiments)
+    return items
+
+
 @router.get("/")
 async def list_experiments(
     user: Annotated[User, Depends(active_user)],
@@ -81,36 +152,30 @@ async def list_all_experiments() -> dict[UUID, str]:
     return stt_states | wxp_states
 
 
+@router.get("/reservations")
+async def list_reservations(
+    user: Annotated[User, Depends(active_user)],
+) -> list[ReservationSlot]:
+    """Booked slots of the testbed - the experiment-ID is only shown to its owner."""
+    return await get_calendar(user)
+
+
 @router.get("/{experiment_id}")
 async def get_experiment(
-    experiment_id: UUID,
-    user: Annotated[User, Depends(active_user)],
+    web_experiment: Annotated[ExperimentView, Depends(owned_experiment(ExperimentView))],
 ) -> Experiment:
-    web_experiment = await WebExperiment.get_by_id(experiment_id)
-    if web_experiment is None:
-        raise HTTPException(404, "Not Found")
-    if not isinstance(web_experiment.owner, User):
-        raise HTTPException(403, "User of Experiment could not be verified")
-    if (user.role != UserRole.admin) and (web_experiment.owner.email != user.email):
-        # TODO: maybe also emit 404 to leak less data - but since UUID is used its min hit-rate
-        raise HTTPException(403, "Forbidden")
-
     return web_experiment.experiment
 
 
 @router.delete("/{experiment_id}")
 async def delete_experiment(
     experiment_id: UUID,
-    user: Annotated[User, Depends(active_user)],
+    _owner: Annotated[OwnerView, Depends(owned_experiment(OwnerView))],
 ) -> Response:
+    # deletion needs the whole document (statistics & content)
     web_experiment = await WebExperiment.get_by_id(experiment_id)
     if web_experiment is None:
         raise HTTPException(404, "Not Found")
-    if not isinstance(web_experiment.owner, User):
-        raise HTTPException(403, "User of Experiment could not be verified")
-    if (user.role != UserRole.admin) and (web_experiment.owner.email != user.email):
-        # TODO: maybe also emit 404 to leak less data - but since UUID is used its min hit-rate
-        raise HTTPException(403, "Forbidden")
     if web_experiment.started_at is not None and web_experiment.finished_at is None:
         # TODO: possible race-condition
         raise HTTPException(409, "Experiment is running - cannot delete")
@@ -124,18 +189,12 @@ async def delete_experiment(
 @router.post("/{experiment_id}/schedule")
 async def schedule_experiment(
     experiment_id: UUID,
+    web_experiment: Annotated[ScheduleView, Depends(owned_experiment(ScheduleView))],
     user: Annotated[User, Depends(active_user)],
 ) -> Response:
-    web_experiment = await WebExperiment.get_by_id(experiment_id)
-    if web_experiment is None:
-        raise HTTPException(404, "Not Found")
-    if not isinstance(web_experiment.owner, User):
-        raise HTTPException(403, "User of Experiment could not be verified")
-    if (user.role != UserRole.admin) and (web_experiment.owner.email != user.email):
-        raise HTTPException(403, "Forbidden")
     if web_experiment.requested_execution_at is not None:
         raise HTTPException(409, "Experiment already scheduled")
-    _storage = await web_experiment.get_storage(user)
+    _storage = await WebExperiment.get_storage(user)
     if _storage > user.quota_storage:
         _size_GiB = _storage / (1024**3)
         _quota_GiB = user.quota_storage / (1024**3)
@@ -145,41 +204,109 @@ async def schedule_experiment(
             "Delete old experiments first to continue.",
         )
 
-    web_experiment.requested_execution_at = datetime.now(tz=local_tz())
-    await web_experiment.save_changes()
+    booking = {}
+    timing = web_experiment.experiment
+    if timing.time_start is not None:
+        reason = validate_time_start(timing.time_start)
+        if reason is not None:
+            raise HTTPException(409, reason)
+        slot = reservation_slot(timing.time_start, timing.duration)
+        await check_reservation(experiment_id, slot, user)
+        booking = {WebExperiment.reserved_from: slot[0], WebExperiment.reserved_until: slot[1]}
+
+    # only set if still unscheduled -> avoids race-condition without loading the document
+    result = await WebExperiment.find_one(
+        WebExperiment.id == experiment_id,
+        WebExperiment.requested_execution_at == None,  # noqa: E711 beanie cannot handle 'is None'
+    ).update(Set({WebExperiment.requested_execution_at: datetime.now(tz=local_tz())} | booking))
+    if result.modified_count == 0:
+        raise HTTPException(409, "Experiment already scheduled")
+
+    if len(booking) > 0:
+        # concurrent bookings both passed the check -> the later one steps back
+        web_exp = await WebExperiment.get_view(experiment_id, ReservationView)
+        others = [
+            view
+            for view in await WebExperiment.get_slots(start=slot[0], end=slot[1])
+            if view.id != experiment_id
+        ]
+        if web_exp is not None and any(booked_first(web_exp, view) for view in others):
+            await WebExperiment.find_one(WebExperiment.id == experiment_id).update(
+                Set(
+                    {
+                        WebExperiment.requested_execution_at: None,
+                        WebExperiment.reserved_from: None,
+                        WebExperiment.reserved_until: None,
+                    }
+                )
+            )
+            raise HTTPException(409, "Testbed is already reserved within the requested time")
 
     return Response(status_code=204)
 
 
+@router.post("/{experiment_id}/cancel")
+async def cancel_experiment(
+    experiment_id: UUID,
+    web_experiment: Annotated[StateView, Depends(owned_experiment(StateView))],
+) -> Response:
+    """Dequeue a scheduled experiment or stop a running one (partial results are kept).
+
+    Returns 204 when dequeued and 202 while the scheduler stops the measurement.
+    """
+    if web_experiment.requested_execution_at is None:
+        raise HTTPException(409, "Experiment not scheduled")
+    if web_experiment.finished_at is not None:
+        raise HTTPException(409, "Experiment already finished")
+
+    # not yet picked by the scheduler -> back to state 'created'
+    result = await WebExperiment.find_one(
+        WebExperiment.id == experiment_id,
+        WebExperiment.started_at == None,  # noqa: E711 beanie cannot handle 'is None'
+    ).update(
+        Set(
+            {
+                WebExperiment.requested_execution_at: None,
+                WebExperiment.observers_awaited: [],
+                WebExperiment.deferred_since: None,
+                WebExperiment.reserved_from: None,
+                WebExperiment.reserved_until: None,
+            }
+        )
+    )
+    if result.modified_count > 0:
+        return Response(status_code=204)
+
+    # on the testbed -> the scheduler polls this flag
+    result = await WebExperiment.find_one(
+        WebExperiment.id == experiment_id,
+        WebExperiment.finished_at == None,  # noqa: E711 beanie cannot handle 'is None'
+        WebExperiment.cancel_requested_at == None,  # noqa: E711
+    ).update(Set({WebExperiment.cancel_requested_at: datetime.now(tz=local_tz())}))
+    if result.modified_count == 0:
+        raise HTTPException(409, "Experiment already finished or cancelled")
+    return Response(status_code=202)
+
+
 @router.get("/{experiment_id}/state")
 async def get_experiment_state(
-    experiment_id: UUID,
-    user: Annotated[User, Depends(active_user)],
+    web_experiment: Annotated[StateView, Depends(owned_experiment(StateView))],
 ) -> str:
-    web_experiment = await WebExperiment.get_by_id(experiment_id)
-    if web_experiment is None:
-        raise HTTPException(404, "Not Found")
-    if not isinstance(web_experiment.owner, User):
-        raise HTTPException(403, "User of Experiment could not be verified")
-    if (user.role != UserRole.admin) and (web_experiment.owner.email != user.email):
-        raise HTTPException(403, "Forbidden")
-
     return web_experiment.state
 
 
+@router.get("/{experiment_id}/awaited")
+async def get_observers_awaited(
+    web_experiment: Annotated[StateView, Depends(owned_experiment(StateView))],
+) -> list[str]:
+    """Offline observers the experiment is waiting for (state "waiting")."""
+    return web_experiment.observers_awaited
+
+
 @router.get("/{experiment_id}/download")
 async def download(
-    experiment_id: UUID,
-    user: Annotated[User, Depends(active_user)],
+    web_experiment: Annotated[DownloadView, Depends(owned_experiment(DownloadView))],
 ) -> list[str]:
-    web_experiment = await WebExperiment.get_by_id(experiment_id)
-    if web_experiment is None:
-        raise HTTPException(404, "Not Found")
-    if not isinstance(web_experiment.owner, User):
-        raise HTTPException(403, "User of Experiment could not be verified")
-    if (user.role != UserRole.admin) and (web_experiment.owner.email != user.email):
-        # TODO: maybe also emit 404 to leak less data - but since UUID is used its min hit-rate
-        raise HTTPException(403, "Forbidden")
     if web_experiment.state not in {"finished", "failed"}:
         raise HTTPException(409, "Experiment not yet finished")
     if web_experiment.result_paths is None:
@@ -208,18 +335,10 @@ async def statistics(
 
 @router.get("/{experiment_id}/download/{observer}")
 async def download_sheep_file(
-    experiment_id: UUID,
     observer: str,
-    user: Annotated[User, Depends(active_user)],
+    web_experiment: Annotated[DownloadView, Depends(owned_experiment(DownloadView))],
 ) -> FileResponse:
-    web_experiment = await WebExperiment.get_by_id(experiment_id)
-    if web_experiment is None:
-        raise HTTPException(404, "Not Found")
-    if not isinstance(web_experiment.owner, User):
-        raise HTTPException(403, "User of Experiment could not be verified")
-    if (user.role != UserRole.admin) and (web_experiment.owner.email != user.email):
-        raise HTTPException(403, "Forbidden")
-    if observer not in web_experiment.result_paths:
+    if web_experiment.result_paths is None or observer not in web_experiment.result_paths:
         raise HTTPException(404, "Observer not contained in resulting list of the experiment.")
 
     output_path = web_experiment.result_paths[observer]
@@ -227,3 +346,104 @@ async def download_sheep_file(
         raise HTTPException(404, "File not found on server (but it should exist).")
 
     return FileResponse(output_path.as_posix())
+
+
+@router.get("/{experiment_id}/preview/{observer}")
+async def preview_sheep_file(
+    observer: str,
+    web_experiment: Annotated[DownloadView, Depends(owned_experiment(DownloadView))],
+    start_s: Annotated[float, Query(ge=0)] = 0,
+    duration_s: Annotated[float | None, Query(gt=0)] = None,
+    points: Annotated[int, Query(ge=1, le=PREVIEW_POINTS_MAX)] = 1000,
+) -> PreviewData:
+    """Decimated time-series (min, max, mean per bin) of a window of the recording.
+
+    Allows judging the results without downloading the whole file.
+    """
+    if web_experiment.state not in {"finished", "failed"}:
+        raise HTTPException(409, "Experiment not yet finished")
+    if web_experiment.result_paths is None or observer not in web_experiment.result_paths:
+        raise HTTPException(404, "Observer not contained in resulting list of the experiment.")
+
+    output_path = web_experiment.result_paths[observer]
+    if not output_path.exists() or not output_path.is_file():
+        raise HTTPException(404, "File not found on server (but it should exist).")
+    try:
+        # reading is blocking -> keep event-loop free
+        return await anyio.to_thread.run_sync(
+            get_preview, output_path, observer, start_s, duration_s, points
+        )
+    except ValueError as xcp:
+        raise HTTPException(400, str(xcp)) from xcp
+    except (TypeError, KeyError) as xcp:
+        raise HTTPException(409, "Result-file could not be read.") from xcp
+
+
+@router.get("/{experiment_id}/export/{observer}")
+async def export_sheep_file(
+    observer: str,
+    web_experiment: Annotated[DownloadView, Depends(owned_experiment(DownloadView))],
+) -> FileResponse:
+    """Result of an observer as parquet-file (columns time, voltage, current).
+
+    The file gets converted on first request and is cached afterwards.
+    """
+    if web_experiment.state not in {"finished", "failed"}:
+        raise HTTPException(409, "Experiment not yet finished")
+    if web_experiment.result_paths is None or observer not in web_experiment.result_paths:
+        raise HTTPException(404, "Observer not contained in resulting list of the experiment.")
+
+    output_path = web_experiment.result_paths[observer]
+    if not output_path.exists() or not output_path.is_file():
+        raise HTTPException(404, "File not found on server (but it should exist).")
+    if not export_available():
+        raise HTTPException(501, "Export is not available on this server.")
+    try:
+        # conversion is blocking -> keep event-loop free
+        export_path = await anyio.to_thread.run_sync(get_export, output_path, observer)
+    except (TypeError, KeyError, OSError) as xcp:
+        raise HTTPException(409, "Result-file could not be converted.") from xcp
+    return FileResponse(
+        export_path.as_posix(),
+        media_type="application/vnd.apache.parquet",
+        filename=f"{observer}.parquet",
+    )
+
+
+@router.get("/{experiment_id}/bundle")
+async def download_bundle(
+    experiment_id: UUID,
+    web_experiment: Annotated[BundleView, Depends(owned_experiment(BundleView))],
+    user: Annotated[User, Depends(active_user)],
+    observers: Annotated[list[str] | None, Query()] = None,
+) -> StreamingResponse:
+    """Stream results, experiment-config and logs as one tar-archive.
+
+    Optionally only a selection of observers is included.
+    """
+    if web_experiment.state not in {"finished", "failed"}:
+        raise HTTPException(409, "Experiment not yet finished")
+    if web_experiment.result_paths is None:
+        raise HTTPException(403, "Data not found on Server.")
+    selection = sorted(set(observers)) if observers else sorted(web_experiment.result_paths)
+    for observer in selection:
+        if observer not in web_experiment.result_paths:
+            raise HTTPException(404, f"Observer {observer} not contained in experiment-results.")
+        if not web_experiment.result_paths[observer].is_file():
+            raise HTTPException(404, "File not found on server (but it should exist).")
+
+    members = bundle_members(
+        web_experiment, experiment_id, selection, scheduler_log=user.role == UserRole.admin
+    )
+
+    bundle = TarBundle(members)
+    return StreamingResponse(
+        bundle.stream(),
+        media_type="application/x-tar",
+        headers={
+            "Content-Length": str(bundle.size),
+            "Content-Disposition": (
+                f'attachment; filename="{web_experiment.experiment.folder_name()}.tar"'
+            ),
+        },
+    )
@@ -0,0 +1,39 @@
+from collections.abc import Callable
+from collections.abc import Coroutine
+from typing import Annotated
+from typing import Any
+from uuid import UUID
+
+from fastapi import Depends
+from fastapi import HTTPException
+
+from shepherd_server.api_accounts.models import User
+from shepherd_server.api_accounts.utils_misc import active_user
+
+from .models import ViewType
+from .models import WebExperiment
+
+
+def owned_experiment(
+    view: type[ViewType],
+) -> Callable[[UUID, User], Coroutine[Any, Any, ViewType]]:
+    """Create a dependency that loads a view of an experiment only for its owner (or admin).
+
+    One indexed query with projection - the document and the user are not fetched in full.
+    """
+
+    async def dependency(
+        experiment_id: UUID,
+        user: Annotated[User, Depends(active_user)],
+    ) -> ViewType:
+        web_experiment = await WebExperiment.get_view(experiment_id, view)
+        if web_experiment is None:
+            raise HTTPException(404, "Not Found")
+        if web_experiment.owner is None:
+            raise HTTPException(403, "User of Experiment could not be verified")
+        if not web_experiment.may_be_accessed_by(user):
+            # TODO: maybe also emit 404 to leak less data - but since UUID is used its min hit-rate
+            raise HTTPException(403, "Forbidden")
+        return web_experiment
+
+    return dependency
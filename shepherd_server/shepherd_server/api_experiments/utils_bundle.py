@@ -0,0 +1,132 @@
+"""Stream several files as one uncompressed tar-archive.
+
+The archive is assembled on the fly - no temporary file is needed and
+the final size is known in advance (Content-Length), which keeps proxies happy.
+HDF5-results are already compressed, so the tar only adds headers & padding.
+"""
+
+import tarfile
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from uuid import UUID
+
+import anyio
+import ryaml
+from pydantic import BaseModel
+from shepherd_core.data_models.base.shepherd import ShpModel
+from shepherd_core.data_models.base.timezone import local_now
+from shepherd_core.data_models.base.wrapper import Wrapper
+
+from .models import BundleView
+
+BLOCK_SIZE = tarfile.BLOCKSIZE
+CHUNK_SIZE = 2**20  # larger chunks keep read-ahead of the kernel busy
+
+
+class BundleMember(BaseModel):
+    name: str
+    """Path inside the archive."""
+    path: Path | None = None
+    """Source on disk - streamed in chunks."""
+    data: bytes | None = None
+    """Alternative in-memory content (small files only)."""
+
+    @property
+    def size(self) -> int:
+        if self.data is not None:
+            return len(self.data)
+        if self.path is not None:
+            return self.path.stat().st_size
+        return 0
+
+    def header(self, size: int) -> bytes:
+        info = tarfile.TarInfo(self.name)
+        info.size = size
+        info.mode = 0o644
+        info.mtime = int(
+            self.path.stat().st_mtime if self.path is not None else local_now().timestamp()
+        )
+        # PAX allows files > 8 GiB
+        return info.tobuf(format=tarfile.PAX_FORMAT)
+
+
+def model_to_yaml(model: ShpModel, comment: str | None = None) -> bytes:
+    """In-memory equivalent of ShpModel.to_file()."""
+    model_wrap = Wrapper(
+        datatype=type(model).__name__,
+        comment=comment,
+        created=local_now(),
+        parameters=model.model_dump(exclude_unset=True),
+    )
+    model_dict = model_wrap.model_dump(mode="json", exclude_unset=True, exclude_defaults=True)
+    return ryaml.dumps(model_dict).encode("utf-8")
+
+
+def bundle_members(
+    web_experiment: BundleView,
+    experiment_id: UUID,
+    observers: list[str],
+    *,
+    prefix: str = "",
+    scheduler_log: bool = False,
+) -> list[BundleMember]:
+    """Config, results & logs of the selected observers (placed below the prefix)."""
+    members = [
+        BundleMember(
+            name=f"{prefix}experiment_config.yaml",
+            data=model_to_yaml(
+                web_experiment.experiment, comment=f"Shepherd Nova ID: {experiment_id}"
+            ),
+        )
+    ]
+    for observer in observers:
+        members.append(
+            BundleMember(name=f"{prefix}{observer}.h5", path=web_experiment.result_paths[observer])
+        )
+        reply = web_experiment.observers_output.get(observer)
+        if reply is not None and reply.log_path is not None and reply.log_path.is_file():
+            members.append(
+                BundleMember(name=f"{prefix}logs/{observer}.log.gz", path=reply.log_path)
+            )
+    log_path = web_experiment.scheduler_log_path
+    if scheduler_log and log_path is not None and log_path.is_file():
+        members.append(BundleMember(name=f"{prefix}logs/scheduler.log.gz", path=log_path))
+    return members
+
+
+def padding(size: int) -> bytes:
+    return bytes(-size % BLOCK_SIZE)
+
+
+class TarBundle:
+    def __init__(self, members: list[BundleMember]) -> None:
+        # sizes & headers are frozen here to guarantee a matching Content-Length
+        self.members: list[tuple[BundleMember, int, bytes]] = []
+        for member in members:
+            size = member.size
+            self.members.append((member, size, member.header(size)))
+
+    @property
+    def size(self) -> int:
+        return (
+            sum(len(header) + size + len(padding(size)) for _, size, header in self.members)
+            + 2 * BLOCK_SIZE
+        )
+
+    async def stream(self) -> AsyncGenerator[bytes, None]:
+        for member, size, header in self.members:
+            yield header
+            if member.data is not None:
+                yield member.data
+            elif member.path is not None:
+                remaining = size
+                async with await anyio.open_file(member.path, "rb") as fd:
+                    while remaining > 0:
+                        chunk = await fd.read(min(CHUNK_SIZE, remaining))
+                        if len(chunk) == 0:
+                            # file shrank meanwhile -> keep archive consistent
+                            chunk = bytes(min(CHUNK_SIZE, remaining))
+                        remaining -= len(chunk)
+                        yield chunk
+            yield padding(size)
+        yield bytes(2 * BLOCK_SIZE)  # end of archive
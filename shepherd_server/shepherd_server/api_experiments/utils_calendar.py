@@ -0,0 +1,98 @@
+"""Reservations - experiments with a fixed time_start book a slot of the testbed.
+
+The testbed runs one experiment at a time, so slots are booked for the whole testbed.
+A slot also covers the preparation before and the collection after the measurement.
+Conflicts are checked when scheduling, the scheduler packs FIFO-experiments
+into the gaps between reservations (see instance_scheduler.claim_runnable()).
+"""
+
+from datetime import datetime
+from datetime import timedelta
+from uuid import UUID
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from shepherd_core.data_models.base.timezone import local_now
+from shepherd_core.data_models.base.timezone import local_tz
+
+from shepherd_server.api_accounts.models import User
+from shepherd_server.api_accounts.models import UserRole
+from shepherd_server.config import server_config
+
+from .models import ReservationView
+from .models import WebExperiment
+
+
+class ReservationSlot(BaseModel):
+    reserved_from: datetime
+    reserved_until: datetime
+    experiment_id: UUID | None = None
+    # ⤷ only revealed to the owner
+
+
+def as_aware(ts: datetime) -> datetime:
+    """Naive timestamps are interpreted as local time."""
+    return ts if ts.tzinfo is not None else ts.replace(tzinfo=local_tz())
+
+
+def reservation_slot(time_start: datetime, duration: timedelta) -> tuple[datetime, datetime]:
+    time_start = as_aware(time_start)
+    return (
+        time_start - server_config.reservation_prep_time,
+        time_start + duration + server_config.reservation_collect_time,
+    )
+
+
+def validate_time_start(time_start: datetime) -> str | None:
+    """Reason why the start can't be reserved (None if fine)."""
+    time_start = as_aware(time_start)
+    ts_now = local_now()
+    if time_start < ts_now + server_config.reservation_prep_time:
+        return (
+            f"xp.time_start must be at least {server_config.reservation_prep_time} hms "
+            "in the future (preparation of the testbed)"
+        )
+    if time_start > ts_now + server_config.reservation_horizon:
+        return f"xp.time_start must be within {server_config.reservation_horizon.days} days"
+    return None
+
+
+def booked_first(web_exp: ReservationView, other: ReservationView) -> bool:
+    """Tie-breaker for concurrent bookings - the earlier scheduling wins."""
+    return (other.requested_execution_at, str(other.id)) < (
+        web_exp.requested_execution_at,
+        str(web_exp.id),
+    )
+
+
+async def check_reservation(
+    experiment_id: UUID, slot: tuple[datetime, datetime], user: User
+) -> None:
+    """Raise if the slot overlaps other reservations or exceeds the share of the user."""
+    overlapping = await WebExperiment.get_slots(start=slot[0], end=slot[1])
+    if any(view.id != experiment_id for view in overlapping):
+        raise HTTPException(409, "Testbed is already reserved within the requested time")
+    if user.role == UserRole.admin:
+        return
+    reserved = slot[1] - slot[0]
+    for view in await WebExperiment.get_slots(user=user):
+        if view.id != experiment_id:
+            reserved += view.reserved_until - view.reserved_from
+    reserved_max = server_config.reservation_horizon * server_config.reservation_share_max
+    if reserved > reserved_max:
+        raise HTTPException(
+            409,
+            f"Share of reserved time exceeded ({reserved} > {reserved_max} hms). "
+            "Wait for your reservations to finish or cancel some.",
+        )
+
+
+async def get_calendar(user: User) -> list[ReservationSlot]:
+    return [
+        ReservationSlot(
+            reserved_from=view.reserved_from,
+            reserved_until=view.reserved_until,
+            experiment_id=view.id if view.may_be_accessed_by(user) else None,
+        )
+        for view in await WebExperiment.get_slots()
+    ]
@@ -0,0 +1,106 @@
+"""Columnar export of result-files (Apache Parquet).
+
+Parquet is directly loadable by pandas, polars, duckdb & co.
+The HDF5-file is streamed in fixed-size chunks and calibrated vectorized,
+so the whole recording is never held in RAM.
+Exports are hive-partitioned by observer, i.e. "observer=sheep0/data.parquet".
+
+Needs the optional dependency pyarrow (shepherd-server[export]).
+"""
+
+from pathlib import Path
+from uuid import uuid4
+
+import numpy as np
+from shepherd_core.data_models.base.calibration import CalibrationPair
+from shepherd_core.reader import Reader as CoreReader
+
+from shepherd_server.logger import log
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+CHUNK_SAMPLES = 2**20  # one row-group each, ~ 24 MiB of RAM
+
+
+def export_available() -> bool:
+    return pa is not None
+
+
+def partition_path(path_dir: Path, observer: str) -> Path:
+    return path_dir / f"observer={observer}" / "data.parquet"
+
+
+def time_to_ns(values_raw: np.ndarray, cal: CalibrationPair) -> np.ndarray:
+    """Calibrate timestamps without the precision-loss of float seconds."""
+    gain_ns = cal.gain * 1e9
+    offset_ns = cal.offset * 1e9
+    if gain_ns.is_integer() and offset_ns.is_integer():
+        return values_raw.astype(np.int64) * int(gain_ns) + int(offset_ns)
+    return np.round(values_raw * gain_ns + offset_ns).astype(np.int64)
+
+
+def export_parquet(path: Path, path_out: Path, observer: str | None = None) -> Path:
+    """Convert a result-file into a parquet-file with columns time, voltage & current.
+
+    The observer defaults to the hostname stored in the file.
+    The file is written under a temporary name and renamed when complete.
+    Returns the path of the parquet-file.
+    """
+    if pa is None or pq is None:
+        raise RuntimeError("Export needs pyarrow -> install shepherd-server[export]")
+    with CoreReader(path, verbose=False) as reader:
+        if observer is None:
+            observer = reader.get_hostname()
+        cal = reader.get_calibration_data()
+        schema = pa.schema(
+            [
+                ("time", pa.timestamp("ns", tz="UTC")),
+                ("voltage", pa.float64()),
+                ("current", pa.float64()),
+            ],
+            metadata={
+                "observer": observer,
+                "source": path.name,
+                "mode": reader.get_mode(),
+                "datatype": str(reader.get_datatype()),
+            },
+        )
+        path_file = partition_path(path_out, observer)
+        path_file.parent.mkdir(parents=True, exist_ok=True)
+        path_temp = path_file.with_suffix(f".{uuid4().hex[:8]}.tmp")
+        try:
+            with pq.ParquetWriter(path_temp, schema, compression="zstd") as writer:
+                for idx in range(0, reader.samples_n, CHUNK_SAMPLES):
+                    idx_end = min(idx + CHUNK_SAMPLES, reader.samples_n)
+                    writer.write_table(
+                        pa.table(
+                            {
+                                "time": time_to_ns(reader.ds_time[idx:idx_end], cal.time),
+                                "voltage": cal.voltage.raw_to_si(reader.ds_voltage[idx:idx_end]),
+                                "current": cal.current.raw_to_si(reader.ds_current[idx:idx_end]),
+                            },
+                            schema=schema,
+                        )
+                    )
+            path_temp.replace(path_file)
+        finally:
+            path_temp.unlink(missing_ok=True)
+    log.debug("Exported %s to %s", path.as_posix(), path_file.as_posix())
+    return path_file
+
+
+def get_export(path: Path, observer: str) -> Path:
+    """Cached version of export_parquet() - stored next to the result-file.
+
+    The cache is invalidated if the result-file changed afterwards.
+    """
+    path_dir = path.parent / "export"
+    path_file = partition_path(path_dir, observer)
+    if path_file.is_file() and path_file.stat().st_mtime >= path.stat().st_mtime:
+        return path_file
+    return export_parquet(path, path_dir, observer)
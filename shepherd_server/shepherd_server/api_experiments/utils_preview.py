@@ -0,0 +1,143 @@
+"""Decimated previews of result-files.
+
+Recordings reach several GB per observer-hour (100 kHz power tracing).
+A preview condenses a window of the recording into a fixed number of bins
+with min / max / mean per bin - enough to judge if a run is usable.
+The file is read in bounded chunks and previews get cached next to the result-file,
+so they are removed together with the content of the experiment.
+"""
+
+import math
+from pathlib import Path
+from uuid import uuid4
+
+import numpy as np
+from pydantic import BaseModel
+from shepherd_core.reader import Reader as CoreReader
+
+from shepherd_server.logger import log
+
+PREVIEW_POINTS_MAX = 10_000
+CHUNK_SAMPLES_MAX = 2**20  # ~ 10 s @ 100 kHz, bounds RAM use to ~ 50 MB
+
+
+class SeriesPreview(BaseModel):
+    min: list[float]
+    max: list[float]
+    mean: list[float]
+
+
+class PreviewData(BaseModel):
+    observer: str
+    start_s: float
+    """Begin of window, relative to start of recording."""
+    duration_s: float
+    bin_s: float
+    """Width of each bin."""
+    time_s: list[float]
+    """Begin of each bin, relative to start of recording."""
+    voltage: SeriesPreview
+    """in V"""
+    current: SeriesPreview
+    """in A"""
+    power: SeriesPreview
+    """in W"""
+
+
+class BinStats:
+    """Running min / max / mean per bin - chunks may start & end within a bin."""
+
+    def __init__(self, bins_n: int) -> None:
+        self.min = np.full(bins_n, np.inf)
+        self.max = np.full(bins_n, -np.inf)
+        self.sum = np.zeros(bins_n)
+        self.count = np.zeros(bins_n, dtype=np.int64)
+
+    def add(self, values: np.ndarray, offset: int, bin_n: int) -> None:
+        """Vectorized update with a chunk that begins at sample-offset of the window."""
+        bin_first = offset // bin_n
+        borders = np.arange((bin_first + 1) * bin_n - offset, values.size, bin_n)
+        starts = np.concatenate(([0], borders))
+        bins = slice(bin_first, bin_first + starts.size)
+        self.min[bins] = np.minimum(self.min[bins], np.minimum.reduceat(values, starts))
+        self.max[bins] = np.maximum(self.max[bins], np.maximum.reduceat(values, starts))
+        self.sum[bins] += np.add.reduceat(values, starts)
+        self.count[bins] += np.diff(np.append(starts, values.size))
+
+    def to_series(self) -> SeriesPreview:
+        return SeriesPreview(
+            min=self.min.tolist(),
+            max=self.max.tolist(),
+            mean=(self.sum / np.maximum(self.count, 1)).tolist(),
+        )
+
+
+def compute_preview(
+    path: Path,
+    observer: str,
+    start_s: float = 0,
+    duration_s: float | None = None,
+    points: int = 1000,
+) -> PreviewData:
+    """Reduce a window of the recording to (at most) the requested number of points."""
+    with CoreReader(path, verbose=False) as reader:
+        start_n = round(start_s * reader.samplerate_sps)
+        end_n = reader.samples_n
+        if duration_s is not None:
+            end_n = min(start_n + round(duration_s * reader.samplerate_sps), end_n)
+        if end_n <= start_n:
+            raise ValueError("Requested window contains no samples")
+        bin_n = max(math.ceil((end_n - start_n) / points), 1)
+        bins_n = math.ceil((end_n - start_n) / bin_n)
+        cal = reader.get_calibration_data()
+
+        series = {key: BinStats(bins_n) for key in ["voltage", "current", "power"]}
+        for idx in range(start_n, end_n, CHUNK_SAMPLES_MAX):
+            # ⤷ bins can be wider than a chunk (few points for a long window)
+            idx_end = min(idx + CHUNK_SAMPLES_MAX, end_n)
+            voltage = cal.voltage.raw_to_si(reader.ds_voltage[idx:idx_end])
+            current = cal.current.raw_to_si(reader.ds_current[idx:idx_end])
+            series["voltage"].add(voltage, idx - start_n, bin_n)
+            series["current"].add(current, idx - start_n, bin_n)
+            series["power"].add(voltage * current, idx - start_n, bin_n)
+        bin_s = bin_n * reader.sample_interval_s
+        return PreviewData(
+            observer=observer,
+            start_s=start_n * reader.sample_interval_s,
+            duration_s=(end_n - start_n) * reader.sample_interval_s,
+            bin_s=bin_s,
+            time_s=(start_n * reader.sample_interval_s + bin_s * np.arange(bins_n)).tolist(),
+            **{key: stats.to_series() for key, stats in series.items()},
+        )
+
+
+def preview_cache_path(path: Path, start_s: float, duration_s: float | None, points: int) -> Path:
+    return path.parent / "preview" / f"{path.stem}_{start_s:g}_{duration_s}_{points}.json"
+
+
+def get_preview(
+    path: Path,
+    observer: str,
+    start_s: float = 0,
+    duration_s: float | None = None,
+    points: int = 1000,
+) -> PreviewData:
+    """Cached version of compute_preview().
+
+    The cache is invalidated if the result-file changed afterwards.
+    """
+    path_cache = preview_cache_path(path, start_s, duration_s, points)
+    if path_cache.is_file() and path_cache.stat().st_mtime >= path.stat().st_mtime:
+        try:
+            return PreviewData.model_validate_json(path_cache.read_text())
+        except ValueError:
+            log.warning("Discarding corrupted preview %s", path_cache.as_posix())
+    preview = compute_preview(path, observer, start_s, duration_s, points)
+    try:
+        path_cache.parent.mkdir(exist_ok=True)
+        path_temp = path_cache.with_suffix(f".{uuid4().hex[:8]}.tmp")
+        path_temp.write_text(preview.model_dump_json())
+        path_temp.replace(path_cache)  # atomic -> parallel requests never see partial files
+    except OSError:
+        log.warning("Could not cache preview %s", path_cache.as_posix())
+    return preview
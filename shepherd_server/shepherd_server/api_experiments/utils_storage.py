@@ -0,0 +1,40 @@
+"""Compressed on-disk blobs for large text-fields of experiments.
+
+Logs can reach several MiB per observer. Keeping them inline made every
+query of a WebExperiment expensive, so the documents only store the path.
+"""
+
+import gzip
+from pathlib import Path
+from uuid import UUID
+
+from shepherd_server.config import server_config
+from shepherd_server.logger import log
+
+
+def blob_path(xp_id: UUID, name: str) -> Path:
+    """Location of a blob - one directory per experiment."""
+    return server_config.path_logs / str(xp_id) / f"{name}.gz"
+
+
+def blob_write(path: Path, text: str, *, append: bool = False) -> Path:
+    """Store text compressed.
+
+    Appending creates a multi-member gzip-file that reads like a single one.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "at" if append else "wt", encoding="utf-8") as fd:
+        fd.write(text)
+    return path
+
+
+def blob_read(path: Path | None) -> str | None:
+    """Load a blob - returns None if it is missing or corrupted."""
+    if path is None:
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8", errors="replace") as fd:
+            return fd.read()
+    except (OSError, EOFError):
+        log.warning("Could not read blob %s", path.as_posix())
+        return None
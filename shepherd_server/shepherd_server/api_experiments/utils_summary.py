@@ -0,0 +1,120 @@
+"""Compact summaries of result-files, computed after each experiment.
+
+Each file is streamed through the reader in bounded chunks.
+Files are analyzed in parallel by a process-pool (one process per file),
+so the scheduler stays responsive and the GIL is no bottleneck.
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import h5py
+import numpy as np
+from pydantic import BaseModel
+from shepherd_core.config import core_config
+from shepherd_core.reader import Reader as CoreReader
+
+from shepherd_server.config import server_config
+from shepherd_server.logger import log
+
+CHUNK_SAMPLES_MAX = 2**22  # ~ 40 s @ 100 kHz, bounds RAM use to ~ 100 MB per process
+
+
+class ObserverSummary(BaseModel):
+    readable: bool = True
+    samples_n: int = 0
+    runtime_s: float = 0
+    time_jumps_n: int = 0
+    """Chunks that do not follow their predecessor with the nominal interval."""
+    energy_ws: float = 0
+    voltage_mean_v: float = 0
+    current_mean_a: float = 0
+    gpio_edges_n: int = 0
+    uart_lines_n: int = 0
+    errors_n: int = 0
+    """Errors logged by the sheep-software."""
+
+    @property
+    def is_plausible(self) -> bool:
+        return self.readable and self.samples_n > 0 and self.time_jumps_n == 0
+
+    def __str__(self) -> str:
+        if not self.readable:
+            return "file could not be read"
+        return (
+            f"{self.runtime_s:.1f} s, {self.samples_n} samples, "
+            f"{self.time_jumps_n} time-jumps, {1e3 * self.energy_ws:.3f} mWs, "
+            f"{self.gpio_edges_n} gpio-edges, {self.uart_lines_n} uart-lines, "
+            f"{self.errors_n} logged errors"
+        )
+
+
+def _count_entries(h5file: h5py.File, group: str) -> int:
+    if group not in h5file or "time" not in h5file[group]:
+        return 0
+    return h5file[group]["time"].shape[0]
+
+
+def _count_time_jumps(reader: CoreReader) -> int:
+    # only the start of each chunk is considered (like the reader does)
+    timestamps = reader.get_calibration_data().time.raw_to_si(
+        reader.ds_time[: reader.samples_n : reader.CHUNK_SAMPLES_N].astype(np.int64)
+    )
+    if timestamps.size < 2:
+        return 0
+    interval_s = reader.CHUNK_SAMPLES_N / core_config.SAMPLERATE_SPS
+    deviations = np.abs(np.diff(timestamps) - interval_s)
+    return int(np.count_nonzero(deviations > 0.01 * interval_s))
+
+
+def summarize_result(path: Path) -> ObserverSummary:
+    """Analyze a single result-file - runs in a worker-process."""
+    try:
+        with CoreReader(path, verbose=False) as reader:
+            cal = reader.get_calibration_data()
+            energy_ws = 0.0
+            voltage_sum = 0.0
+            current_sum = 0.0
+            for idx in range(0, reader.samples_n, CHUNK_SAMPLES_MAX):
+                idx_end = min(idx + CHUNK_SAMPLES_MAX, reader.samples_n)
+                voltage = cal.voltage.raw_to_si(reader.ds_voltage[idx:idx_end])
+                current = cal.current.raw_to_si(reader.ds_current[idx:idx_end])
+                energy_ws += float(np.dot(voltage, current)) * reader.sample_interval_s
+                voltage_sum += float(voltage.sum())
+                current_sum += float(current.sum())
+            samples_n = max(reader.samples_n, 1)
+            return ObserverSummary(
+                samples_n=reader.samples_n,
+                runtime_s=reader.runtime_s,
+                time_jumps_n=_count_time_jumps(reader),
+                energy_ws=energy_ws,
+                voltage_mean_v=voltage_sum / samples_n,
+                current_mean_a=current_sum / samples_n,
+                gpio_edges_n=_count_entries(reader.h5file, "gpio"),
+                uart_lines_n=_count_entries(reader.h5file, "uart"),
+                errors_n=reader.count_errors_in_log(),
+            )
+    except (OSError, TypeError, KeyError, ValueError):
+        log.warning("Could not summarize %s", path.as_posix())
+        return ObserverSummary(readable=False)
+
+
+async def summarize_results(paths: dict[str, Path]) -> dict[str, ObserverSummary]:
+    """Analyze all result-files of an experiment in a process-pool."""
+    if len(paths) == 0:
+        return {}
+    loop = asyncio.get_running_loop()
+    workers = min(len(paths), server_config.summary_workers)
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        # ⤷ forking the scheduler would copy its event-loop, threads & db-client
+        summaries = await asyncio.gather(
+            *[loop.run_in_executor(pool, summarize_result, path) for path in paths.values()]
+        )
+    result = dict(zip(paths.keys(), summaries, strict=True))
+    for observer, summary in result.items():
+        log.debug("      .. %s: %s", observer, summary)
+    return result
@@ -0,0 +1,48 @@
+"""Feasibility-checks of submitted experiments (shared by single, campaign & batch-submission)."""
+
+from shepherd_core.data_models.experiment import Experiment
+from shepherd_core.data_models.task import TestbedTasks
+from shepherd_core.data_models.testbed import Testbed
+
+from shepherd_server.api_accounts.models import User
+from shepherd_server.config import server_config
+
+from .utils_calendar import validate_time_start
+
+
+def check_experiment(
+    experiment: Experiment, user: User, testbed: Testbed | None = None
+) -> str | None:
+    """Reason why the experiment is rejected (None if feasible) - blocking, CPU-bound."""
+    if experiment.time_start is not None:
+        # reservation - otherwise the FIFO-scheduler picks the start time
+        reason = validate_time_start(experiment.time_start)
+        if reason is not None:
+            return reason
+    if (experiment.duration is None) or (experiment.duration > user.quota_duration):
+        return f"xp.duration must be set to value <= {user.quota_duration} s (user-quota)"
+
+    tb = testbed or Testbed(name=server_config.testbed_name)
+    tb_tasks = TestbedTasks.from_xp(experiment, tb)
+    try:
+        contained = tb_tasks.is_contained()
+    except AttributeError:
+        contained = True
+    if not contained:
+        return "Experiment was assessed as potentially hazardous."
+
+    for tgt_cfg in experiment.target_configs:
+        # TODO: only temporary until numpy is updated
+        if tgt_cfg.power_tracing is not None and tgt_cfg.power_tracing.samplerate != 100_000:
+            return "power_tracing.samplerate must be 100 kHz (unstable)"
+    return None
+
+
+def projected_size(experiment: Experiment) -> int:
+    """Estimated size of the results in bytes (see server_config.storage_rate_estimate)."""
+    if experiment.duration is None:
+        return 0
+    observers = sum(len(tgt_cfg.target_IDs) for tgt_cfg in experiment.target_configs)
+    return int(
+        experiment.duration.total_seconds() * observers * server_config.storage_rate_estimate
+    )
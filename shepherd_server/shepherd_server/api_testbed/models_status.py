@@ -54,3 +54,12 @@ class TestbedDB(TestbedStatus, Document):
             wtb = cls()
             await wtb.save()
         return wtb
+
+
+class SchedulerLease(Document):
+    """Only the holder of the lease is the active scheduler (see scheduler_lease.py)."""
+
+    id: str = "scheduler"
+    holder: str
+    expires_at: datetime
+    acquired_at: datetime | None = None
@@ -0,0 +1,257 @@
+"""Benchmark the hot paths of the API against a seeded database.
+
+A separate database gets filled with N users and M experiments.
+Finished experiments carry 1 - 10 MiB of inline observer-logs
+(like legacy documents), so a query that loads whole documents where
+a projection would do (i.e. an added fetch_links) shows up in the latency.
+Requests go through the ASGI-app in-process, so network-jitter is excluded.
+The report can be stored as baseline and later runs are compared against it.
+
+Needs a running mongod (mongomock does not support the async driver used by beanie).
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from uuid import UUID
+
+import numpy as np
+import shepherd_core.data_models as sdm
+from fastapi.testclient import TestClient
+from httpx import Response
+from pydantic import BaseModel
+from shepherd_core.data_models.base.timezone import local_now
+
+from .api_accounts.models import User
+from .api_accounts.utils_misc import calculate_password_hash
+from .api_experiments.models import ExperimentStats
+from .api_experiments.models import ReplyData
+from .api_experiments.models import WebExperiment
+from .config import ServerConfigDefault
+from .config import server_config
+from .instance_api import app
+from .instance_db import db_client
+from .logger import log
+
+DB_NAME_DEFAULT = "shp_benchmark"
+PASSWORD = "benchmark-password"  # noqa: S105, only valid in the benchmark-database
+OBSERVERS_N = 5
+OUTPUT_MIB_RANGE = (1, 10)
+LOG_LINE = "2026-01-01 12:00:00,000 INFO - shepherd-sheep: buffer 1234 received, ok\n"
+
+
+class EndpointStats(BaseModel):
+    requests: int
+    p50_ms: float
+    p99_ms: float
+    rps: float
+
+    def __str__(self) -> str:
+        return f"p50 = {self.p50_ms:.2f} ms, p99 = {self.p99_ms:.2f} ms, {self.rps:.1f} req/s"
+
+
+class BenchmarkReport(BaseModel):
+    users_n: int
+    experiments_n: int
+    output_mib: int
+    """Total size of the seeded observer-logs."""
+    created_at: datetime
+    endpoints: dict[str, EndpointStats] = {}
+
+
+def evaluate(durations_s: list[float]) -> EndpointStats:
+    durations_ms = 1e3 * np.asarray(durations_s)
+    return EndpointStats(
+        requests=len(durations_s),
+        p50_ms=float(np.percentile(durations_ms, 50)),
+        p99_ms=float(np.percentile(durations_ms, 99)),
+        rps=len(durations_s) / max(sum(durations_s), 1e-9),
+    )
+
+
+def compare_to_baseline(
+    report: BenchmarkReport,
+    baseline: BenchmarkReport,
+    tolerance: float = 0.25,
+    slack_ms: float = 1.0,
+) -> list[str]:
+    """Return a message for each latency that exceeds the baseline.
+
+    A regression needs to exceed the relative tolerance AND the absolute slack,
+    so sub-millisecond noise of fast endpoints is ignored.
+    """
+    if (report.users_n, report.experiments_n) != (baseline.users_n, baseline.experiments_n):
+        log.warning("Baseline was recorded with another database-size -> not comparable")
+    regressions = []
+    for name, stats in report.endpoints.items():
+        reference = baseline.endpoints.get(name)
+        if reference is None:
+            continue
+        for metric in ["p50_ms", "p99_ms"]:
+            value = getattr(stats, metric)
+            limit = getattr(reference, metric)
+            if value > limit * (1 + tolerance) and value > limit + slack_ms:
+                regressions.append(f"{name}.{metric}: {value:.2f} > {limit:.2f} (baseline)")
+    return regressions
+
+
+def _fake_log(size: int) -> str:
+    return (LOG_LINE * (size // len(LOG_LINE) + 1))[:size]
+
+
+def _fake_experiment(index: int) -> sdm.Experiment:
+    return sdm.Experiment(
+        name=f"benchmark_{index}",
+        duration=10 * 60,
+        target_configs=[
+            sdm.TargetConfig(
+                target_IDs=range(1, OBSERVERS_N + 1),
+                energy_env=sdm.EnergyEnvironment(name="synthetic_static_3000mV_50mA"),
+                firmware1=sdm.Firmware(name="nrf52_rf_survey"),
+                uart_logging=sdm.UartLogging(),
+                gpio_tracing=sdm.GpioTracing(),
+            ),
+        ],
+    )
+
+
+class SeedData(BaseModel):
+    xp_ids: dict[str, list[UUID]] = {}
+    finished_ids: dict[str, list[UUID]] = {}
+    output_size: int = 0
+
+
+async def seed(users_n: int, experiments_n: int, random_seed: int = 0) -> SeedData:
+    """Fill the benchmark-database (gets emptied first).
+
+    Experiments are distributed round-robin, so every user gets the same mix:
+    80 % finished, 10 % running and 10 % not scheduled.
+    """
+    await db_client()
+    await User.delete_all()
+    await WebExperiment.delete_all()
+    await ExperimentStats.delete_all()
+    rng = random.Random(random_seed)  # noqa: S311, no cryptography
+    password_hash = calculate_password_hash(PASSWORD)
+    users = [
+        User(
+            email=f"user{index}@benchmark.org",
+            password_hash=password_hash,
+            first_name="bench",
+            last_name=f"user{index}",
+            disabled=False,
+            email_confirmed_at=local_now(),
+        )
+        for index in range(users_n)
+    ]
+    for user in users:
+        await User.insert_one(user)
+    data = SeedData(
+        xp_ids={user.email: [] for user in users},
+        finished_ids={user.email: [] for user in users},
+    )
+    observers = [f"sheep{index}" for index in range(OBSERVERS_N)]
+    for index in range(experiments_n):
+        user = users[index % users_n]
+        position = index // users_n
+        wxp = WebExperiment(experiment=_fake_experiment(index), owner=user)
+        if position % 10 != 0:
+            wxp.requested_execution_at = wxp.started_at = wxp.executed_at = local_now()
+        if position % 10 > 1:
+            wxp.finished_at = local_now()
+            size = rng.randint(*OUTPUT_MIB_RANGE) * 2**20 // OBSERVERS_N
+            wxp.observers_requested = observers
+            wxp.observers_online = observers
+            wxp.observers_output = {
+                name: ReplyData(exited=0, stdout=_fake_log(size)) for name in observers
+            }
+            wxp.observers_had_data = dict.fromkeys(observers, True)
+            wxp.result_paths = {
+                name: Path(f"/tmp/{wxp.id}/{name}.h5")  # noqa: S108, never accessed
+                for name in observers
+            }
+            data.finished_ids[user.email].append(wxp.id)
+            data.output_size += size * OBSERVERS_N
+        await WebExperiment.insert_one(wxp)
+        data.xp_ids[user.email].append(wxp.id)
+    return data
+
+
+async def _drop_database() -> None:
+    database = await db_client()
+    await database.client.drop_database(server_config.db_name)
+
+
+def _measure(request: Callable[[int], Response], rounds: int, warmup: int = 3) -> EndpointStats:
+    for index in range(warmup):
+        request(index)
+    durations_s = []
+    for index in range(rounds):
+        ts_start = time.perf_counter()
+        response = request(index)
+        durations_s.append(time.perf_counter() - ts_start)
+        if response.status_code != 200:
+            msg = f"Request failed with {response.status_code}: {response.text}"
+            raise RuntimeError(msg)
+    return evaluate(durations_s)
+
+
+def run(
+    users_n: int = 10,
+    experiments_n: int = 100,
+    rounds: int = 200,
+    db_name: str = DB_NAME_DEFAULT,
+    *,
+    keep: bool = False,
+) -> BenchmarkReport:
+    """Seed the database, measure each endpoint and drop the database afterward."""
+    if db_name == ServerConfigDefault.model_fields["db_name"].default:
+        raise ValueError("Benchmark refuses to overwrite the database of the server")
+    if experiments_n < 3 * users_n:
+        raise ValueError("Benchmark needs at least 3 experiments per user")
+    server_config.db_name = db_name
+    log.info("Seeding %d users & %d experiments into '%s'", users_n, experiments_n, db_name)
+    try:
+        data = asyncio.run(seed(users_n, experiments_n))
+        email = next(iter(data.xp_ids))
+        ids = data.xp_ids[email]
+        ids_finished = data.finished_ids[email]
+        report = BenchmarkReport(
+            users_n=users_n,
+            experiments_n=experiments_n,
+            output_mib=data.output_size >> 20,
+            created_at=local_now(),
+        )
+        with TestClient(app) as client:
+
+            def login(_index: int) -> Response:
+                return client.post(
+                    "/auth/token",
+                    data={"username": email, "password": PASSWORD},
+                    headers={"Content-Type": "application/x-www-form-urlencoded"},
+                )
+
+            token = login(0).json()["access_token"]
+            client.headers["Authorization"] = f"Bearer {token}"
+            requests: dict[str, Callable[[int], Response]] = {
+                "login": login,
+                "list": lambda _: client.get("/experiments/"),
+                "state": lambda idx: client.get(f"/experiments/{ids[idx % len(ids)]}/state"),
+                "statistics": lambda idx: client.get(
+                    f"/experiments/{ids[idx % len(ids)]}/statistics"
+                ),
+                "download": lambda idx: client.get(
+                    f"/experiments/{ids_finished[idx % len(ids_finished)]}/download"
+                ),
+                "resources": lambda _: client.get("/resources/observer"),
+            }
+            for name, request in requests.items():
+                report.endpoints[name] = _measure(request, rounds)
+                log.info("  %s: %s", name, report.endpoints[name])
+    finally:
+        if not keep:
+            asyncio.run(_drop_database())
+    return report
@@ -1,6 +1,7 @@
 import asyncio
 import signal
 import sys
+from datetime import timedelta
 from pathlib import Path
 from types import FrameType
 
@@ -112,6 +113,63 @@ def run(inventory: Path | None = None, *, dry_run: bool = False) -> None:
         ppe.submit(run_redirect_server)
 
 
+@cli.command(short_help="Compare scheduling-policies by simulating a workload.")
+def simulate_scheduler(
+    workload: Path | None = None,
+    *,
+    policy: list[str] | None = None,
+    jobs: int = 200,
+    interval_min: float = 30,
+    failure_rate: float = 0.05,
+    seed: int = 0,
+) -> None:
+    """Replay a workload on a virtual clock - reports makespan, utilization & wait-times.
+
+    The workload is either a recorded json-file (see record-workload)
+    or synthetic (jobs arrive every interval on average).
+    """
+    from .scheduler_simulation import POLICIES
+    from .scheduler_simulation import WorkloadConfig
+    from .scheduler_simulation import compare_policies
+    from .scheduler_simulation import load_workload
+    from .scheduler_simulation import synthetic_workload
+
+    if policy is not None and not set(policy).issubset(POLICIES):
+        log.error("Policies must be from: %s", ", ".join(POLICIES))
+        raise typer.Exit(1)
+    if workload is not None:
+        sim_jobs = load_workload(workload)
+    else:
+        config = WorkloadConfig(
+            jobs_n=jobs,
+            arrival_interval_s=60 * interval_min,
+            failure_rate=failure_rate,
+            seed=seed,
+        )
+        sim_jobs = synthetic_workload(config)
+    compare_policies(sim_jobs, policy)
+
+
+@cli.command(short_help="Store finished experiments as workload for the simulation.")
+def record_workload(output: Path = Path("./workload.json"), days: int = 30) -> None:
+    from shepherd_core.data_models.base.timezone import local_now
+
+    from .instance_db import db_available
+    from .instance_db import db_client
+    from .scheduler_simulation import record_workload as record
+    from .scheduler_simulation import save_workload
+
+    if not db_available(timeout=5):
+        log.error("No connection to database!")
+        raise typer.Exit(1)
+
+    async def _record() -> None:
+        await db_client()
+        save_workload(await record(local_now() - timedelta(days=days)), output)
+
+    asyncio.run(_record())
+
+
 # #######################################################################
 # Data Management #######################################################
 # #######################################################################
@@ -136,6 +194,98 @@ def prune(*, delete: bool = False) -> None:
     asyncio.run(prune_db(dry_run=not delete))
 
 
+@cli.command(short_help="Recompress results of finished experiments to save storage.")
+def repack(*, follow: bool = False) -> None:
+    """Rewrite result-files with stronger lossless compression.
+
+    The worker is throttled & pauses while experiments run.
+    With --follow it keeps running and repacks new results.
+    """
+    from .results_repack import repack_results
+
+    asyncio.run(repack_results(follow=follow))
+
+
+@cli.command(short_help="Convert result-files to parquet (partitioned by observer).")
+def export_parquet(files: list[Path], output: Path = Path("./export")) -> None:
+    """Convert HDF5-results into a parquet-dataset that analysis-tools can load directly.
+
+    Observer-names are taken from the hostname stored in each file.
+    """
+    from .api_experiments.utils_export import export_parquet as export_file
+
+    for file in files:
+        path_file = export_file(file, output)
+        log.info("Exported %s -> %s", file.as_posix(), path_file.as_posix())
+
+
+@cli.command(short_help="Load result-files into a local time-series database.")
+def ingest(
+    files: list[Path],
+    target: Path = Path("./results.sqlite"),
+    sink: str = "sqlite",
+    workers: int = 4,
+) -> None:
+    """Bulk-load HDF5-results (one reader-process per file) into a database.
+
+    Sinks: sqlite (default) or duckdb (needs shepherd-server[ingest]).
+    Interrupted runs resume from their checkpoint when called again with the same target.
+    """
+    from .ingest_pipeline import ingest as ingest_files
+    from .ingest_sinks import SINKS
+
+    if sink not in SINKS:
+        log.error("Sink must be one of: %s", ", ".join(SINKS))
+        raise typer.Exit(1)
+    with SINKS[sink](target) as sink_db:
+        ingest_files(files, sink_db, workers=workers)
+
+
+@cli.command(short_help="Compare ingestion-rates (rows/s) of all available sinks.")
+def ingest_benchmark(files: list[Path], workers: int = 4) -> None:
+    from .ingest_pipeline import benchmark
+
+    benchmark(files, workers=workers)
+
+
+@cli.command(short_help="Measure latency of the API hot paths with a seeded database.")
+def benchmark_api(
+    users: int = 10,
+    experiments: int = 100,
+    rounds: int = 200,
+    baseline: Path = Path("./benchmark_api.json"),
+    *,
+    update_baseline: bool = False,
+    keep: bool = False,
+) -> None:
+    """Seed a separate database (shp_benchmark) and compare against a stored baseline.
+
+    Exits with 1 if p50 or p99 of an endpoint got worse than 25 % (and 1 ms).
+    Needs a running mongod.
+    """
+    from .benchmark_api import BenchmarkReport
+    from .benchmark_api import compare_to_baseline
+    from .benchmark_api import run as run_benchmark
+    from .instance_db import db_available
+
+    if not db_available(timeout=5):
+        log.error("No connection to database!")
+        raise typer.Exit(1)
+    report = run_benchmark(users, experiments, rounds, keep=keep)
+    if update_baseline or not baseline.exists():
+        baseline.write_text(report.model_dump_json(indent=2))
+        log.info("Stored baseline in %s", baseline.as_posix())
+        return
+    regressions = compare_to_baseline(
+        report, BenchmarkReport.model_validate_json(baseline.read_text())
+    )
+    for regression in regressions:
+        log.error("Regression of %s", regression)
+    if len(regressions) > 0:
+        raise typer.Exit(1)
+    log.info("No regressions compared to %s", baseline.as_posix())
+
+
 @cli.command()
 def reset(
     *,
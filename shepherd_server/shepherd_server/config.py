@@ -41,6 +41,10 @@ class ServerConfigDefault(BaseModel):
     # -> this can and should contain the cert and the full chain
     #    if missing visit API in browser - view cert - download `PEM (chain)`
 
+    # database
+    db_name: str = dcoup_cfg("DB_NAME", default="shp")
+    # ⤷ the api-benchmark seeds its own database (see cli-command benchmark-api)
+
     # account auth
     auth_salt: bytes = dcoup_cfg("AUTH_SALT").encode("UTF-8")
     secret_key: str = dcoup_cfg("SECRET_KEY", default="replace me")
@@ -63,12 +67,88 @@ class ServerConfigDefault(BaseModel):
     quota_default_storage: PositiveInt = 200 * (10**9)
     # 20 nodes @  4 h are ~  290 GB
     # 30 nodes @ 10 h are ~ 1080 GB
+    storage_rate_estimate: PositiveInt = 1_000_000
+    # ⤷ bytes per second & observer, projects the size of submitted batches (see above)
+    batch_size_max: PositiveInt = 500
+    # ⤷ experiments per batch-submission
 
     # Lifetime of Objects
     age_max_account: timedelta = timedelta(days=18 * 31)
     age_max_experiment: timedelta = timedelta(days=6 * 31)
     age_min_experiment: timedelta = timedelta(days=15)
 
+    # Logs of observers (compressed, one directory per experiment)
+    path_logs: Path = dcoup_cfg("PATH_LOGS", cast=Path, default=Path("/var/shepherd/logs"))
+    log_fetch_interval: timedelta = timedelta(minutes=2)
+    # ⤷ incremental journal-reads during execution, keep sheep-disturbance low
+
+    # Recovery from failures (see herd_recovery.py)
+    herd_retries: int = 2
+    # ⤷ repetitions of sub-tasks (resync, mount) on failing observers before excluding them
+    herd_retry_delay: timedelta = timedelta(seconds=10)
+    scheduler_retries_max: int = 2
+    # ⤷ experiments that failed transiently before execution get rescheduled
+    recovery_timeout: timedelta = timedelta(minutes=10)
+    # ⤷ rebooted observers have to be reachable & synced within this time
+
+    # Skipping redundant preparation (see herd_cache.py)
+    firmware_cache_age_max: timedelta = timedelta(hours=6)
+    # ⤷ targets holding the identical firmware are not programmed again, 0 disables;
+    #   note: targets keep the state of the previous run (i.e. data the firmware wrote to flash)
+    herd_check_interval: timedelta = timedelta(minutes=10)
+    # ⤷ resync & mount are skipped on observers that passed them within this time, 0 disables
+
+    # Health of running experiments (see herd_health.py)
+    health_abort_fraction: float = 1.0
+    # ⤷ abort once this share of observers failed (stopped early or no data), > 1 disables
+    health_stall_time: timedelta = timedelta(minutes=5)
+    # ⤷ observers whose result-file did not grow for this time count as failed
+    cancel_check_interval: timedelta = timedelta(seconds=10)
+    # ⤷ how often a running experiment is checked for cancellation by its owner
+
+    # Queue (see instance_scheduler.claim_runnable())
+    deferral_max: timedelta = timedelta(hours=2)
+    # ⤷ experiments waiting for offline observers run without them after this time
+
+    # Measurement-campaigns (see api_campaigns/models.py)
+    campaign_variants_max: PositiveInt = 100
+    # ⤷ limits the expansion of the parameter-grid
+
+    # Reservations of experiments with time_start (see api_experiments/utils_calendar.py)
+    reservation_prep_time: timedelta = timedelta(minutes=10)
+    # ⤷ booked before time_start, covers preparation & programming of the targets
+    reservation_collect_time: timedelta = timedelta(minutes=5)
+    # ⤷ booked after the end, covers collecting logs & results
+    reservation_horizon: timedelta = timedelta(days=14)
+    # ⤷ reservations can only be made this far ahead
+    reservation_share_max: float = 0.1
+    # ⤷ share of the horizon a user may have reserved at once, admins are exempt
+
+    # Leader-election between schedulers (see scheduler_lease.py)
+    scheduler_lease_ttl: timedelta = timedelta(seconds=30)
+    # ⤷ a standby takes over once the active scheduler missed renewing for this time
+
+    # Start of experiments (see herd_start_delay.py)
+    start_delay_max: timedelta = timedelta(seconds=50)
+    # ⤷ used until enough dispatch-latencies are measured
+    start_delay_margin: timedelta = timedelta(seconds=25)
+    # ⤷ added to the measured dispatch-latency, covers startup of the sheep (~21 s)
+    start_delay_window: PositiveInt = 50
+    # ⤷ amount of recent runs the latency-distribution is derived from
+
+    # Post-processing of results
+    summary_workers: PositiveInt = dcoup_cfg("SUMMARY_WORKERS", default=4, cast=int)
+    # ⤷ processes that analyze result-files in parallel (one file each)
+
+    # Recompression of results (background-worker, see cli-command repack)
+    repack_workers: PositiveInt = dcoup_cfg("REPACK_WORKERS", default=2, cast=int)
+    repack_compression_level: PositiveInt = 1
+    # ⤷ gzip + shuffle, levels > 1 trigger warnings in the core-reader
+    repack_rate_max: PositiveInt = 40 * 2**20
+    # ⤷ byte/s per worker, leaves IO-bandwidth for running experiments
+    repack_age_min: timedelta = timedelta(days=1)
+    # ⤷ fresh results stay untouched while they are likely downloaded
+
     def ssl_available(self) -> bool:
         _files = (self.ssl_keyfile, self.ssl_certfile)
         try:
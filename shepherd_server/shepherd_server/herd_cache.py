@@ -0,0 +1,130 @@
+"""Remember the state of the herd to skip redundant preparation-steps.
+
+Back-to-back experiments often use the same firmware on the same targets.
+The cache tracks what each target was last programmed with (fingerprint of
+firmware, modifications & programmer-settings) and when resync & mount
+last succeeded per observer. Matching targets are neither modified nor programmed again.
+
+The state lives in memory of the scheduler - after a restart everything is prepared again.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import BaseModel
+from shepherd_core.data_models.base.timezone import local_now
+from shepherd_core.data_models.task import TestbedTasks
+from shepherd_core.data_models.task.firmware_mod import FirmwareModTask
+from shepherd_core.data_models.task.programming import ProgrammingTask
+
+from .config import server_config
+from .logger import log
+
+MCU_PORTS = (1, 2)
+FIRMWARE_TASKS = ("fw1_mod", "fw1_prog", "fw2_mod", "fw2_prog")
+
+
+class ProgrammedFirmware(BaseModel):
+    fingerprint: str
+    programmed_at: datetime
+
+
+def firmware_fingerprint(mod: FirmwareModTask | None, prog: ProgrammingTask | None) -> str | None:
+    """Hash everything that ends up on the target - None if it can't be determined."""
+    if mod is None or prog is None:
+        return None
+    if isinstance(mod.data, Path):
+        # firmware from the content-library -> same path on the shared storage of the server
+        if not mod.data.is_file():
+            return None
+        data = hashlib.sha256(mod.data.read_bytes()).hexdigest()
+    else:
+        data = mod.data
+    payload = {
+        "data": data,
+        **mod.model_dump(mode="json", include={"data_type", "custom_id"}),
+        **prog.model_dump(mode="json", exclude={"firmware_file", "verbose"}),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class HerdCache:
+    def __init__(self) -> None:
+        self.firmware: dict[tuple[str, int], ProgrammedFirmware] = {}
+        """Last programming per (observer, mcu-port)."""
+        self.checked_at: dict[str, datetime] = {}
+        """Last successful resync & mount per observer."""
+
+    def is_programmed(self, observer: str, port: int, fingerprint: str | None) -> bool:
+        entry = self.firmware.get((observer, port))
+        return (
+            fingerprint is not None
+            and entry is not None
+            and entry.fingerprint == fingerprint
+            and local_now() - entry.programmed_at < server_config.firmware_cache_age_max
+        )
+
+    def strip_programmed(
+        self, tb_tasks: TestbedTasks
+    ) -> tuple[TestbedTasks, dict[tuple[str, int], str]]:
+        """Remove firmware-tasks of targets that already hold the firmware.
+
+        Returns the reduced tasks & the fingerprints to remember after programming succeeded.
+        """
+        tasks = tb_tasks.model_dump()
+        pending: dict[tuple[str, int], str] = {}
+        skipped = []
+        for ots_dict, ots in zip(tasks["observer_tasks"], tb_tasks.observer_tasks, strict=True):
+            for port in MCU_PORTS:
+                fingerprint = firmware_fingerprint(
+                    getattr(ots, f"fw{port}_mod"), getattr(ots, f"fw{port}_prog")
+                )
+                if self.is_programmed(ots.observer, port, fingerprint):
+                    ots_dict[f"fw{port}_mod"] = None
+                    ots_dict[f"fw{port}_prog"] = None
+                    skipped.append(f"{ots.observer}:{port}")
+                else:
+                    # target-state is unknown until programming succeeds
+                    self.firmware.pop((ots.observer, port), None)
+                    if fingerprint is not None:
+                        pending[(ots.observer, port)] = fingerprint
+        if len(skipped) > 0:
+            log.info("  .. targets already hold firmware -> skip programming %s", skipped)
+        return TestbedTasks(**tasks), pending
+
+    def store_programmed(self, pending: dict[tuple[str, int], str], programmed: set[str]) -> None:
+        """Remember firmware of observers that ran the preparation successfully.
+
+        Other observers (offline, excluded or failed) keep an unknown target-state.
+        """
+        for (observer, port), fingerprint in pending.items():
+            if observer in programmed:
+                self.firmware[(observer, port)] = ProgrammedFirmware(
+                    fingerprint=fingerprint, programmed_at=local_now()
+                )
+
+    def needs_check(self, observer: str) -> bool:
+        checked_at = self.checked_at.get(observer)
+        return checked_at is None or local_now() - checked_at > server_config.herd_check_interval
+
+    def store_checked(self, observers: set[str]) -> None:
+        ts_now = local_now()
+        for observer in observers:
+            self.checked_at[observer] = ts_now
+
+    def forget(self, observers: set[str] | None = None) -> None:
+        """Invalidate the state of observers (default: all), i.e. after a reboot or failure."""
+        if observers is None:
+            self.firmware.clear()
+            self.checked_at.clear()
+            return
+        self.firmware = {
+            key: value for key, value in self.firmware.items() if key[0] not in observers
+        }
+        for observer in observers:
+            self.checked_at.pop(observer, None)
+
+
+herd_cache = HerdCache()
@@ -0,0 +1,110 @@
+"""Detect the end of experiments without polling the herd.
+
+Each observer gets one long-lived command over its own connection that returns
+as soon as the sheep-service stops. The wait-loop runs on the sheep, so
+the SSH-channel stays silent during hours-long experiments and completion is
+noticed within a second. Observers that finish early are reported individually
+(i.e. to fetch their logs right away).
+Lost watches are verified by a regular status-query and restarted if needed.
+"""
+
+import asyncio
+import contextlib
+from datetime import timedelta
+
+from fabric import Connection
+from invoke.exceptions import CommandTimedOut
+from paramiko.ssh_exception import NoValidConnectionsError
+from paramiko.ssh_exception import SSHException
+from shepherd_herd.herd import Herd
+
+from .herd_readiness import CMD_IS_ACTIVE
+from .herd_readiness import CMD_WAIT_INACTIVE
+from .herd_readiness import STATES_INACTIVE
+from .herd_recovery import connection_clone
+from .herd_recovery import herd_restricted
+from .logger import log
+
+
+def _wait_inactive(cnx: Connection, timeout: float) -> bool:
+    """Block until the service stopped - False if the watch got lost."""
+    try:
+        return cnx.run(CMD_WAIT_INACTIVE, hide=True, warn=True, timeout=timeout).exited == 0
+    except (SSHException, NoValidConnectionsError, CommandTimedOut, OSError, EOFError):
+        return False
+    finally:
+        cnx.close()
+
+
+class CompletionWatcher:
+    """One watch per observer, completions are collected via wait()."""
+
+    def __init__(self, herd: Herd, timeout: timedelta) -> None:
+        self.herd = herd
+        self.timeout = timeout
+        self.tasks: dict[str, asyncio.Task] = {}
+        self.connections: dict[str, Connection] = {}
+
+    @property
+    def pending(self) -> set[str]:
+        return set(self.tasks)
+
+    def start(self, hostnames: set[str] | None = None) -> None:
+        for cnx in self.herd.group_online:
+            hostname = self.herd.hostnames.get(cnx.host)
+            if (hostnames is not None and hostname not in hostnames) or hostname in self.tasks:
+                continue
+            cnx_own = connection_clone(cnx)
+            self.connections[hostname] = cnx_own
+            self.tasks[hostname] = asyncio.create_task(
+                asyncio.to_thread(_wait_inactive, cnx_own, self.timeout.total_seconds())
+            )
+
+    async def wait(self, timeout: float) -> set[str]:
+        """Return observers that finished within the timeout.
+
+        Lost watches get checked by querying the service-state once,
+        observers without a definite answer count as still active.
+        """
+        if len(self.tasks) == 0:
+            return set()
+        done, _ = await asyncio.wait(
+            self.tasks.values(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+        finished = set()
+        lost = set()
+        for hostname, task in list(self.tasks.items()):
+            if task not in done:
+                continue
+            self.tasks.pop(hostname)
+            self.connections.pop(hostname, None)
+            if task.result():
+                finished.add(hostname)
+            else:
+                lost.add(hostname)
+        if len(lost) > 0:
+            with herd_restricted(self.herd, lost):
+                # no timeout here: the herd may only be restored once the thread returned,
+                # run_cmd() gives up after 30 s
+                replies = await asyncio.to_thread(
+                    self.herd.run_cmd, sudo=False, cmd=CMD_IS_ACTIVE, timeout=30, verbose=False
+                )
+            stopped = {
+                hostname
+                for hostname in lost
+                if hostname in replies and replies[hostname].stdout.strip() in STATES_INACTIVE
+            }
+            finished |= stopped
+            if len(lost - stopped) > 0:
+                log.debug("  .. watch lost on %s -> restart", ", ".join(sorted(lost - stopped)))
+                await asyncio.sleep(5)
+                self.start(lost - stopped)
+        return finished
+
+    def stop(self) -> None:
+        """Abort remaining watches - closing the connections ends the threads."""
+        for cnx in self.connections.values():
+            with contextlib.suppress(SSHException, OSError):
+                cnx.close()
+        self.connections.clear()
+        self.tasks.clear()
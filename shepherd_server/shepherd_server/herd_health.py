@@ -0,0 +1,109 @@
+"""Monitor the health of a running experiment to abort it early.
+
+Per observer the state of the sheep-service, error-lines in the service-log
+and the growth of the result-file (on the shared storage) are tracked.
+An observer counts as failed if its service stopped before the planned end
+or its result-file stopped growing. Once the configured share of
+observers failed, the experiment is aborted and the testbed reclaimed -
+instead of waiting for the timeout (duration + 10 min).
+"""
+
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+
+from fabric import Result
+from pydantic import BaseModel
+from shepherd_core.data_models.base.timezone import local_now
+
+from .config import server_config
+from .herd_readiness import server_paths
+from .logger import log
+
+ERROR_MARKERS = (" ERROR ", " CRITICAL ", "Traceback")
+ERRORS_KEPT = 3
+
+
+class ObserverHealth(BaseModel):
+    path: Path | None = None
+    size: int | None = None
+    grown_at: datetime | None = None
+    finished_at: datetime | None = None
+    errors: list[str] = []
+
+
+class HealthMonitor:
+    def __init__(
+        self, paths: dict[str, Path], ts_start: datetime, duration: timedelta | None
+    ) -> None:
+        self.ts_start = ts_start
+        self.ts_end = ts_start + duration if duration is not None else None
+        self.observers: dict[str, ObserverHealth] = {
+            observer: ObserverHealth(path=next(iter(server_paths({observer: path})), None))
+            for observer, path in paths.items()
+        }
+
+    def update_finished(self, hostnames: set[str]) -> None:
+        for hostname in hostnames & set(self.observers):
+            self.observers[hostname].finished_at = local_now()
+
+    def update_logs(self, replies: dict[str, Result]) -> None:
+        for hostname, reply in replies.items():
+            if hostname not in self.observers or not isinstance(reply, Result):
+                continue
+            lines = [
+                line
+                for line in reply.stdout.splitlines()
+                if any(marker in line for marker in ERROR_MARKERS)
+            ]
+            if len(lines) > 0:
+                health = self.observers[hostname]
+                health.errors = (health.errors + lines)[-ERRORS_KEPT:]
+
+    def update_files(self) -> None:
+        """Stat the result-files (blocking, NFS)."""
+        ts_now = local_now()
+        for health in self.observers.values():
+            try:
+                size = health.path.stat().st_size if health.path is not None else None
+            except OSError:
+                size = None
+            if size is not None and size != health.size:
+                health.grown_at = ts_now
+            health.size = size
+
+    def failed(self) -> dict[str, str]:
+        """Failed observers with the reason."""
+        ts_now = local_now()
+        stall = server_config.health_stall_time
+        reasons = {}
+        for hostname, health in self.observers.items():
+            if health.finished_at is not None:
+                if self.ts_end is not None and health.finished_at < self.ts_end - stall:
+                    reasons[hostname] = "service stopped early"
+            elif (
+                ts_now > self.ts_start + stall
+                and ts_now - (health.grown_at or self.ts_start) > stall
+            ):
+                reasons[hostname] = "no data"
+        return reasons
+
+    def abort_reason(self) -> str | None:
+        """Message if the share of failed observers reached the threshold."""
+        if len(self.observers) == 0:
+            return None
+        failed = self.failed()
+        if (
+            len(failed) == 0
+            or len(failed) / len(self.observers) < server_config.health_abort_fraction
+        ):
+            return None
+        details = []
+        for hostname, reason in sorted(failed.items()):
+            errors = self.observers[hostname].errors
+            error = f" ({errors[-1].strip()})" if len(errors) > 0 else ""
+            details.append(f"{hostname}: {reason}{error}")
+        log.warning("  .. unhealthy: %s", "; ".join(details))
+        return f"Aborted early, {len(failed)} of {len(self.observers)} observers failed: " + (
+            ", ".join(f"{hostname} ({reason})" for hostname, reason in sorted(failed.items()))
+        )
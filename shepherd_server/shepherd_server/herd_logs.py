@@ -0,0 +1,56 @@
+"""Incremental collection of the sheep-service logs.
+
+The journal of each observer is read in increments. journalctl keeps track
+of the last entry read by storing its cursor in a file on the sheep,
+so the same command can be issued to the whole herd.
+The increments get appended to one compressed log-file per observer on the server.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from uuid import UUID
+
+from fabric import Result
+from shepherd_herd.herd import Herd
+
+from .api_experiments.utils_storage import blob_path
+from .api_experiments.utils_storage import blob_write
+from .logger import log
+
+
+class ObserverLogStream:
+    """Stream the service-logs of all observers into compressed files."""
+
+    def __init__(self, xp_id: UUID, since: datetime | None = None) -> None:
+        self.xp_id: UUID = xp_id
+        self.since: datetime | None = since
+        self.path_cursor: str = f"/tmp/shepherd-server-{xp_id}.cursor"  # noqa: S108 (on sheep)
+
+    def file_path(self, hostname: str) -> Path:
+        return blob_path(self.xp_id, f"{hostname}.log")
+
+    def fetch(self, herd: Herd, *, final: bool = False) -> dict[str, Result]:
+        """Append new journal entries of all observers to their log-files.
+
+        Only entries after the last fetch are transmitted (journalctl --cursor-file).
+        The final fetch removes the cursor-file on the sheep.
+        Returns the replies of the observers with stdout already stored in the files.
+        """
+        addition = f" --since='{self.since.isoformat(sep=' ')[:19]}'" if self.since else ""
+        cleanup = f"; /usr/bin/rm -f {self.path_cursor}" if final else ""
+        replies = herd.run_cmd(
+            sudo=True,
+            cmd="/usr/bin/journalctl --unit=shepherd.service "
+            "--no-pager --output=short-iso-precise "
+            f"--utc --boot --all --cursor-file={self.path_cursor}" + addition + cleanup,
+            timeout=40,
+            verbose=False,
+        )
+        size = 0
+        for hostname, result in replies.items():
+            if not isinstance(result, Result):
+                continue
+            blob_write(self.file_path(hostname), result.stdout, append=True)
+            size += len(result.stdout)
+        log.debug("      .. streamed %d chars of service-logs (xp %s)", size, self.xp_id)
+        return replies
@@ -0,0 +1,160 @@
+"""Readiness-probes that replace fixed waits in the lifecycle of experiments.
+
+Each probe polls a cheap condition until it holds or the timeout (the former
+fixed wait) expires. The time it actually took is kept per probe,
+so the remaining slack becomes visible (see probe_summary()).
+"""
+
+import socket
+import time
+from collections import deque
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+from shepherd_herd.herd import Herd
+
+from .logger import log
+
+PATH_XP = Path("/var/shepherd/experiments")
+CMD_WAIT_INACTIVE = "while /usr/bin/systemctl is-active --quiet shepherd; do sleep 1; done"
+# ⤷ the loop runs on the sheep, the SSH-channel stays silent till the service stopped
+CMD_IS_ACTIVE = "/usr/bin/systemctl is-active shepherd"
+CMD_REPORT_INACTIVE = f"{CMD_WAIT_INACTIVE}; {CMD_IS_ACTIVE}"
+# ⤷ reports the final state ("inactive" or "failed"), exits non-zero as it is not active
+STATES_INACTIVE = {"inactive", "failed"}
+CMD_SHEEP_IDLE = "! /usr/bin/pgrep --full 'bin/[s]hepherd-sheep'"
+# ⤷ brackets avoid matching the calling shell
+
+probe_durations: dict[str, deque[float]] = {}
+
+
+def probe_until(
+    name: str, check: Callable[[], bool], timeout: float, interval: float = 1.0
+) -> bool:
+    """Poll the check until it succeeds - blocking. Returns False on timeout."""
+    ts_start = time.monotonic()
+    ready = False
+    while True:
+        ready = check()
+        duration = time.monotonic() - ts_start
+        if ready or duration + interval > timeout:
+            break
+        time.sleep(interval)
+    probe_durations.setdefault(name, deque(maxlen=100)).append(duration)
+    if ready:
+        log.debug("  .. %s after %.1f s", name, duration)
+    else:
+        log.warning("  .. %s not reached within %.0f s", name, timeout)
+    return ready
+
+
+def probe_summary() -> str:
+    return ", ".join(
+        f"{name} p50 / max = {np.median(values):.1f} / {max(values):.1f} s"
+        for name, values in probe_durations.items()
+    )
+
+
+def port_open(host: str, port: int = 22, timeout: float = 2.0) -> bool:
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def herd_wait_inactive(herd: Herd, timeout: float) -> bool:
+    """Block until the sheep-service stopped on all online observers.
+
+    The wait-loop runs on the sheep, so only one command per observer is needed.
+    Observers that report another state are polled again, unreachable ones are ignored
+    (like in service_is_active()) - herd_failed_observers() takes care of them.
+    """
+    ts_end = time.monotonic() + timeout
+
+    def check() -> bool:
+        replies = herd.run_cmd(
+            sudo=False,
+            cmd=CMD_REPORT_INACTIVE,
+            timeout=max(ts_end - time.monotonic(), 1),
+            verbose=False,
+        )
+        return all(
+            reply.exited != 0 and reply.stdout.strip() in STATES_INACTIVE
+            for reply in replies.values()
+        )
+
+    return probe_until("service inactive", check, timeout=timeout)
+
+
+def herd_wait_idle(herd: Herd, timeout: float) -> bool:
+    """Wait till no sheep-process is left (i.e. after programming)."""
+
+    def check() -> bool:
+        replies = herd.run_cmd(sudo=False, cmd=CMD_SHEEP_IDLE, timeout=10, verbose=False)
+        return all(reply.exited == 0 for reply in replies.values())
+
+    return probe_until("sheep idle", check, timeout=timeout)
+
+
+def wait_down(hosts: set[str], port: int = 22) -> bool:
+    """Wait till rebooting hosts stopped answering - avoids connecting to a dying system."""
+    return probe_until(
+        "observers down",
+        lambda: not any(port_open(host, port) for host in hosts),
+        timeout=60,
+        interval=2,
+    )
+
+
+def wait_reachable(hosts: set[str], timeout: float, port: int = 22) -> bool:
+    return probe_until(
+        "observers reachable",
+        lambda: all(port_open(host, port) for host in hosts),
+        timeout=timeout,
+        interval=5,
+    )
+
+
+def server_paths(paths: dict[str, Path]) -> list[Path]:
+    """Observer-paths as seen by the server: below a folder per observer.
+
+    Same bending as in ResultData.update_result().
+    """
+    return [
+        PATH_XP / observer / path.relative_to(PATH_XP)
+        for observer, path in paths.items()
+        if path.is_relative_to(PATH_XP)
+    ]
+
+
+def results_exist(paths: dict[str, Path]) -> bool:
+    try:
+        return any(path.exists() for path in server_paths(paths))
+    except PermissionError:
+        return False
+
+
+def results_stable(paths: dict[str, Path], timeout: float) -> bool:
+    """Wait till the result-files on the shared storage stop growing.
+
+    Paths are given from the observer-perspective (see server_paths()).
+    """
+    paths_srv = server_paths(paths)
+    sizes_prev: list[int | None] = []
+
+    def size(path: Path) -> int | None:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return None
+
+    def check() -> bool:
+        nonlocal sizes_prev
+        sizes = [size(path) for path in paths_srv]
+        stable = sizes == sizes_prev and None not in sizes
+        sizes_prev = sizes
+        return stable
+
+    return probe_until("results stable", check, timeout=timeout, interval=2)
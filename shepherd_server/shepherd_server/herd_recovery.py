@@ -0,0 +1,240 @@
+"""Classify failures of experiments and recover the herd selectively.
+
+Most failures are caused by single observers (lost SSH-connection, failed mount,
+unsynced clock) or are transient. Instead of rebooting the whole herd
+and restarting the scheduler, sub-tasks are retried on the failing observers only,
+persistently failing observers are excluded from the experiment and
+only they get rebooted afterward - in the background, so the next experiment
+proceeds on the remaining observers. Recovered observers rejoin the online-pool.
+"""
+
+import asyncio
+import contextlib
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from enum import Enum
+
+from fabric import Connection
+from fabric import Result
+from invoke.exceptions import CommandTimedOut
+from paramiko.ssh_exception import NoValidConnectionsError
+from paramiko.ssh_exception import SSHException
+from pydantic import BaseModel
+from shepherd_herd.herd import Herd
+
+from .api_accounts.utils_mail import get_mail_engine
+from .api_experiments.models import StateData
+from .config import server_config
+from .herd_readiness import wait_down
+from .logger import log
+
+# same commands as Herd.resync() & Herd.mount(), but evaluated per observer
+CMD_RESYNC = "shepherd-sheep --verbose resync --timeout=120"
+CMD_MOUNT = "shepherd-sheep mount"
+CMD_IS_FAILED = "/usr/bin/systemctl is-failed shepherd"
+
+TRANSIENT_ERRORS = ("Resync", "network-drives", "Timeout", "general exception")
+# ⤷ fragments of scheduler-errors that are worth another try
+
+
+class FailureKind(str, Enum):
+    transient = "transient"
+    """Infrastructure-hiccup before execution -> experiment is retried."""
+    observer = "observer"
+    """Attributable to specific observers -> only these get rebooted."""
+    experiment = "experiment"
+    """Failed on all observers during preparation (i.e. firmware) -> nothing to recover."""
+    unknown = "unknown"
+    """Not attributable -> whole herd gets rebooted."""
+
+
+class Failure(BaseModel):
+    kind: FailureKind
+    message: str = ""
+    observers: list[str] = []
+    """Observers to blame (reachable ones only)."""
+
+    @property
+    def retryable(self) -> bool:
+        return self.kind == FailureKind.transient
+
+
+def classify_failure(state: StateData) -> Failure | None:
+    """Derive kind of failure and affected observers from a finished run."""
+    if not state.had_execution_errors:
+        return None
+    message = state.scheduler_error or ""
+    executed = state.executed_at is not None
+    faulty = []
+    for observer in state.observers_requested:
+        if observer not in state.observers_online:
+            continue  # offline from the start -> unreachable anyway
+        reply = state.observers_output.get(observer)
+        exit_failed = reply is not None and abs(reply.exited) != 0
+        if exit_failed or (executed and not state.observers_had_data.get(observer, False)):
+            faulty.append(observer)
+    if not executed:
+        if any(fragment in message for fragment in TRANSIENT_ERRORS):
+            return Failure(kind=FailureKind.transient, message=message, observers=faulty)
+        if "Preparation of targets failed" in message:
+            return Failure(kind=FailureKind.experiment, message=message)
+        return Failure(kind=FailureKind.unknown, message=message)
+    if len(faulty) > 0:
+        return Failure(kind=FailureKind.observer, message=message, observers=faulty)
+    if len(message) > 0:
+        return Failure(kind=FailureKind.unknown, message=message)
+    return Failure(kind=FailureKind.observer, message="Requested observers were offline")
+
+
+def hostnames_online(herd: Herd) -> set[str]:
+    return {herd.hostnames.get(cnx.host) for cnx in herd.group_online}
+
+
+def herd_select(herd: Herd, hostnames: set[str]) -> None:
+    """Limit the online-pool to a subset (i.e. observers of the experiment)."""
+    herd.group_online = [
+        cnx
+        for cnx in herd.group_all
+        if cnx.is_connected and herd.hostnames.get(cnx.host) in hostnames
+    ]
+
+
+@contextmanager
+def herd_restricted(herd: Herd, hostnames: set[str]) -> Generator[Herd, None, None]:
+    """Temporarily address only a subset of the online observers."""
+    group_prev = herd.group_online
+    herd.group_online = [cnx for cnx in group_prev if herd.hostnames.get(cnx.host) in hostnames]
+    try:
+        yield herd
+    finally:
+        herd.group_online = group_prev
+
+
+def _succeeded(result: Result | None) -> bool:
+    return isinstance(result, Result) and result.exited == 0
+
+
+def herd_run_with_retry(herd: Herd, cmd: str, timeout: float) -> set[str]:
+    """Run a command on all online observers and retry it on the failing ones.
+
+    Lost connections get reopened before each retry.
+    Returns the observers that still fail.
+    """
+    selection = hostnames_online(herd)
+    pending = set(selection)
+    for attempt in range(server_config.herd_retries + 1):
+        with herd_restricted(herd, pending):
+            replies = herd.run_cmd(sudo=True, cmd=cmd, timeout=timeout, verbose=False)
+        pending = {host for host in pending if not _succeeded(replies.get(host))}
+        if len(pending) == 0 or attempt >= server_config.herd_retries:
+            break
+        log.warning("  .. retry '%s' on %s", cmd, ", ".join(sorted(pending)))
+        time.sleep(server_config.herd_retry_delay.total_seconds())
+        herd.open()  # reconnect, but keep the selection
+        herd_select(herd, selection)
+    return pending
+
+
+def herd_failed_observers(herd: Herd) -> set[str]:
+    """Observers with a failed sheep-service (or without answer)."""
+    replies = herd.run_cmd(sudo=True, cmd=CMD_IS_FAILED, timeout=30, verbose=False)
+    # is-failed exits with 0 if the service failed
+    return {
+        host for host in hostnames_online(herd) if host not in replies or _succeeded(replies[host])
+    }
+
+
+def herd_exclude(herd: Herd, hostnames: set[str], reason: str) -> None:
+    if len(hostnames) == 0:
+        return
+    log.warning("  .. excluding %s from experiment (%s)", ", ".join(sorted(hostnames)), reason)
+    herd_select(herd, hostnames_online(herd) - hostnames)
+
+
+def connection_clone(cnx: Connection) -> Connection:
+    """Independent connection to the same observer - for use in another thread."""
+    return Connection(
+        host=cnx.host,
+        user=cnx.user,
+        port=cnx.port,
+        config=cnx.config,
+        connect_timeout=cnx.connect_timeout,
+        connect_kwargs=cnx.connect_kwargs,
+    )
+
+
+def _reboot_and_resync(cnx: Connection, timeout: float) -> bool:
+    """Reboot a single observer and wait till it is reachable and synced - blocking."""
+    # connection might drop before the reply
+    with contextlib.suppress(SSHException, NoValidConnectionsError, CommandTimedOut, OSError):
+        cnx.sudo("reboot", warn=True, hide=True, timeout=20)
+    cnx.close()
+    wait_down({cnx.host}, port=cnx.port)
+    ts_end = time.monotonic() + timeout
+    while time.monotonic() < ts_end:
+        try:
+            cnx.open()
+            if cnx.sudo(CMD_RESYNC, warn=True, hide=True, timeout=4 * 60).exited == 0:
+                return True
+        except (SSHException, NoValidConnectionsError, CommandTimedOut, OSError):
+            cnx.close()
+        time.sleep(15)
+    return False
+
+
+class ObserverRecovery:
+    """Reboot observers in the background and re-admit them once they are healthy.
+
+    Each observer gets its own connection, so the herd is not touched
+    while it serves the next experiment. Observers in recovery are quarantined,
+    i.e. excluded from experiments and reported offline.
+    """
+
+    def __init__(self) -> None:
+        self.tasks: dict[str, asyncio.Task] = {}
+
+    @property
+    def quarantined(self) -> set[str]:
+        return set(self.tasks)
+
+    def start(self, herd: Herd, hostnames: set[str]) -> None:
+        hostnames_all = set(herd.hostnames.values())
+        for cnx in herd.group_all:
+            hostname = herd.hostnames.get(cnx.host)
+            if hostname not in hostnames or hostname in self.tasks:
+                continue
+            task = asyncio.create_task(
+                self._recover(hostname, connection_clone(cnx), hostnames_all)
+            )
+            self.tasks[hostname] = task
+            task.add_done_callback(lambda _, name=hostname: self.tasks.pop(name, None))
+        log.info("  .. recovering %s in background", ", ".join(sorted(self.quarantined)))
+
+    @staticmethod
+    async def _recover(hostname: str, cnx: Connection, hostnames_all: set[str]) -> None:
+        ts_start = time.monotonic()
+        recovered = await asyncio.to_thread(
+            _reboot_and_resync, cnx, server_config.recovery_timeout.total_seconds()
+        )
+        cnx.close()
+        if recovered:
+            log.info(
+                "Observer %s recovered after %d s -> rejoins pool",
+                hostname,
+                time.monotonic() - ts_start,
+            )
+        else:
+            log.error("Observer %s did not recover from reboot", hostname)
+        composition = {
+            "all": hostnames_all,
+            "pre": hostnames_all,
+            "rebooted": {hostname},
+            "post": hostnames_all if recovered else hostnames_all - {hostname},
+        }
+        await get_mail_engine().send_herd_reboot_email(composition)
+
+    async def finish(self) -> None:
+        if len(self.tasks) > 0:
+            log.info("Waiting for recovery of %s", ", ".join(sorted(self.quarantined)))
+            await asyncio.gather(*self.tasks.values(), return_exceptions=True)
@@ -0,0 +1,95 @@
+"""Derive the start-delay of experiments from the measured dispatch-latency.
+
+The herd agrees on a start-time in the future (consensus) and then transfers the tasks.
+The delay has to cover consensus & dispatch (measured per run) and the startup
+of the sheep itself (static margin). The delay is a high percentile of the recent
+dispatch-latencies plus the margin. Observers that start late (result-files begin after
+the agreed time) are reported as misses and increase the margin for following runs.
+Punctual starts let the added margin decay again.
+Until enough samples are collected the maximum is used.
+"""
+
+import math
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from shepherd_core.reader import Reader as CoreReader
+
+from .config import server_config
+from .logger import log
+
+SAMPLES_MIN = 5
+PERCENTILE = 95
+MISS_TOLERANCE_S = 1.0
+MISS_PENALTY_S = 5.0
+PENALTY_DECAY_S = 1.0  # per punctual start -> a miss is forgiven after 5 good runs
+
+
+class StartDelay:
+    def __init__(self) -> None:
+        self.dispatch_s: deque[float] = deque(maxlen=server_config.start_delay_window)
+        self.penalty_s: float = 0.0
+        self.misses: int = 0
+
+    @property
+    def delay_s(self) -> int:
+        delay_max = server_config.start_delay_max.total_seconds()
+        if len(self.dispatch_s) < SAMPLES_MIN:
+            return math.ceil(delay_max)
+        delay = (
+            float(np.percentile(self.dispatch_s, PERCENTILE))
+            + server_config.start_delay_margin.total_seconds()
+            + self.penalty_s
+        )
+        return math.ceil(min(delay, delay_max))
+
+    def record_dispatch(self, latency_s: float) -> None:
+        """Duration from consensus to the last observer receiving its task."""
+        self.dispatch_s.append(latency_s)
+        if latency_s > self.delay_s - server_config.start_delay_margin.total_seconds():
+            log.warning("  .. dispatch took %.1f s, close to start-delay", latency_s)
+
+    def record_start(self, planned: datetime, observed: datetime | None) -> bool:
+        """Compare the agreed start with the start of the results - True on a miss."""
+        if observed is None:
+            return False
+        late_s = (observed - planned).total_seconds()
+        if late_s <= MISS_TOLERANCE_S:
+            self.penalty_s = max(self.penalty_s - PENALTY_DECAY_S, 0.0)
+            return False
+        self.misses += 1
+        self.penalty_s += MISS_PENALTY_S
+        log.warning(
+            "  .. observers started %.1f s late (miss #%d) -> start-delay is now %d s",
+            late_s,
+            self.misses,
+            self.delay_s,
+        )
+        return True
+
+    def __str__(self) -> str:
+        if len(self.dispatch_s) == 0:
+            return f"start-delay {self.delay_s} s (no samples)"
+        return (
+            f"start-delay {self.delay_s} s, dispatch p50 / p{PERCENTILE} = "
+            f"{np.percentile(self.dispatch_s, 50):.1f} / "
+            f"{np.percentile(self.dispatch_s, PERCENTILE):.1f} s "
+            f"({len(self.dispatch_s)} runs, {self.misses} misses)"
+        )
+
+
+def observed_start(paths: dict[str, Path]) -> datetime | None:
+    """Latest start among the result-files (blocking)."""
+    starts = []
+    for path in paths.values():
+        if path.suffix != ".h5" or not path.is_file():
+            continue
+        try:
+            with CoreReader(path, verbose=False) as shp_rd:
+                starts.append(shp_rd.get_time_start())
+        except (OSError, ValueError):
+            log.warning("  .. could not read start of %s", path.name)
+    starts = [start for start in starts if start is not None]
+    return max(starts) if len(starts) > 0 else None
@@ -0,0 +1,156 @@
+"""Ingest result-files into a local time-series database.
+
+Replaces the prototypes in playground/db_benchmarks.
+One reader-process per observer streams its file in fixed-size chunks,
+calibrates vectorized and hands the batches over via a bounded queue (backpressure).
+A single writer bulk-loads each batch into the sink - most local databases
+only allow one writer anyway. Checkpoints allow resuming interrupted runs.
+"""
+
+import contextlib
+import multiprocessing
+import queue
+import tempfile
+import time
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.queues import Queue
+from multiprocessing.synchronize import Event
+from pathlib import Path
+
+from pydantic import BaseModel
+from shepherd_core.reader import Reader as CoreReader
+
+from .api_experiments.utils_export import time_to_ns
+from .ingest_sinks import SINKS
+from .ingest_sinks import IngestBatch
+from .ingest_sinks import IngestSink
+from .ingest_sinks import sinks_available
+from .logger import log
+
+CHUNK_SAMPLES = 2**18  # per batch, ~ 6 MiB
+QUEUE_SIZE = 8  # batches in flight -> bounds RAM use while the sink is slower than readers
+
+_queue: Queue | None = None
+_stop: Event | None = None
+
+
+class IngestStats(BaseModel):
+    sink: str
+    rows: int = 0
+    duration_s: float = 0
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.duration_s if self.duration_s > 0 else 0
+
+
+def _init_reader(batches: Queue, stop: Event) -> None:
+    global _queue, _stop  # noqa: PLW0603 (one queue per worker-process)
+    _queue = batches
+    _stop = stop
+
+
+def _read_file(path: Path, source: str, offset: int) -> int:
+    """Runs in a worker-process, blocks while the queue is full.
+
+    The source is sent as end-marker (also on errors or when stopped).
+    """
+    try:
+        with CoreReader(path, verbose=False) as reader:
+            hostname = reader.get_hostname()
+            observer = path.stem if hostname == "unknown" else hostname
+            cal = reader.get_calibration_data()
+            for idx in range(offset, reader.samples_n, CHUNK_SAMPLES):
+                if _stop.is_set():
+                    break
+                idx_end = min(idx + CHUNK_SAMPLES, reader.samples_n)
+                _queue.put(
+                    IngestBatch(
+                        observer=observer,
+                        source=source,
+                        offset_end=idx_end,
+                        time_ns=time_to_ns(reader.ds_time[idx:idx_end], cal.time),
+                        voltage=cal.voltage.raw_to_si(reader.ds_voltage[idx:idx_end]),
+                        current=cal.current.raw_to_si(reader.ds_current[idx:idx_end]),
+                    )
+                )
+            return max(reader.samples_n - offset, 0)
+    finally:
+        _queue.put(source)
+
+
+def _abort(batches: Queue, stop: Event, futures: list[Future]) -> None:
+    """Stop the readers - those blocked on the full queue are released by draining it."""
+    stop.set()
+    for future in futures:
+        future.cancel()
+    while not all(future.done() for future in futures):
+        with contextlib.suppress(queue.Empty):
+            batches.get(timeout=0.1)
+
+
+def ingest(paths: list[Path], sink: IngestSink, workers: int = 4) -> IngestStats:
+    """Load result-files into an opened sink - files that were (partly) ingested are resumed."""
+    stats = IngestStats(sink=sink.name)
+    ts_start = time.monotonic()
+    context = multiprocessing.get_context("spawn")
+    batches = context.Queue(maxsize=QUEUE_SIZE)
+    stop = context.Event()
+    pool = ProcessPoolExecutor(
+        max_workers=max(min(workers, len(paths)), 1),
+        mp_context=context,
+        initializer=_init_reader,
+        initargs=(batches, stop),
+    )
+    futures: list[Future] = []
+    try:
+        for path in paths:
+            source = path.resolve().as_posix()
+            offset = sink.get_checkpoint(source)
+            if offset > 0:
+                log.info("Resuming %s at sample %d", path.name, offset)
+            futures.append(pool.submit(_read_file, path, source, offset))
+        pending = len(futures)
+        while pending > 0:
+            try:
+                item: IngestBatch | str = batches.get(timeout=1)
+            except queue.Empty:
+                if all(future.done() for future in futures):
+                    break  # a reader-process crashed before sending its end-marker
+                continue
+            if isinstance(item, str):
+                pending -= 1
+                continue
+            sink.write(item)
+            stats.rows += item.rows
+    except BaseException:
+        # i.e. the sink failed - otherwise the shutdown waits for readers stuck on the queue
+        _abort(batches, stop, futures)
+        raise
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    for path, future in zip(paths, futures, strict=True):
+        if future.exception() is not None:
+            log.error("Ingesting %s failed: %s", path.as_posix(), future.exception())
+    stats.duration_s = time.monotonic() - ts_start
+    log.info(
+        "Ingested %d rows into %s in %.1f s (%.0f rows/s)",
+        stats.rows,
+        sink.name,
+        stats.duration_s,
+        stats.rows_per_s,
+    )
+    return stats
+
+
+def benchmark(paths: list[Path], workers: int = 4) -> list[IngestStats]:
+    """Ingest the files into every available sink (temporary targets) and compare rows/s."""
+    results = []
+    with tempfile.TemporaryDirectory(prefix="shp_ingest_") as path_temp:
+        for name in sinks_available():
+            with SINKS[name](Path(path_temp) / f"benchmark.{name}") as sink:
+                results.append(ingest(paths, sink, workers=workers))
+    for stats in sorted(results, key=lambda item: item.rows_per_s, reverse=True):
+        log.info("  %s: %.0f rows/s", stats.sink, stats.rows_per_s)
+    return results
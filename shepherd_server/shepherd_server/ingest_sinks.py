@@ -0,0 +1,216 @@
+"""Destinations for the ingestion of results into a time-series database.
+
+A sink receives calibrated batches and loads each one in bulk (one transaction).
+The checkpoint (samples already ingested per source-file) is stored
+in the same transaction, so an interrupted ingestion resumes without duplicates.
+
+Available sinks:
+
+- sqlite (default, no extra dependency)
+- duckdb (needs shepherd-server[ingest])
+"""
+
+import sqlite3
+from abc import ABC
+from abc import abstractmethod
+from itertools import repeat
+from pathlib import Path
+from types import TracebackType
+from typing import ClassVar
+
+import numpy as np
+from pydantic import BaseModel
+from pydantic import ConfigDict
+from typing_extensions import Self
+
+try:
+    import duckdb
+    import pyarrow as pa
+except ImportError:
+    duckdb = None
+    pa = None
+
+
+class IngestBatch(BaseModel):
+    """Calibrated samples of one observer."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    observer: str
+    source: str
+    """Identifies the result-file (for checkpoints)."""
+    offset_end: int
+    """Index of the sample after this batch -> new checkpoint."""
+    time_ns: np.ndarray
+    voltage: np.ndarray
+    current: np.ndarray
+
+    @property
+    def rows(self) -> int:
+        return self.time_ns.shape[0]
+
+
+class IngestSink(ABC):
+    name: ClassVar[str]
+
+    def __init__(self, target: Path) -> None:
+        self.target = target
+
+    @abstractmethod
+    def open(self) -> None:
+        """Connect and create tables if needed."""
+
+    @abstractmethod
+    def close(self) -> None: ...
+
+    @abstractmethod
+    def get_checkpoint(self, source: str) -> int:
+        """Amount of samples of the source that are already ingested."""
+
+    @abstractmethod
+    def write(self, batch: IngestBatch) -> None:
+        """Bulk-load the batch and advance the checkpoint atomically."""
+
+    @abstractmethod
+    def count_rows(self, observer: str | None = None) -> int: ...
+
+    def __enter__(self) -> Self:
+        self.open()
+        return self
+
+    def __exit__(
+        self,
+        typ: type[BaseException] | None = None,
+        exc: BaseException | None = None,
+        tb: TracebackType | None = None,
+    ) -> None:
+        self.close()
+
+
+class SQLiteSink(IngestSink):
+    name = "sqlite"
+
+    def __init__(self, target: Path) -> None:
+        super().__init__(target)
+        self.con: sqlite3.Connection | None = None
+
+    def open(self) -> None:
+        self.con = sqlite3.connect(self.target)
+        self.con.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS samples (
+                observer TEXT NOT NULL,
+                time_ns INTEGER NOT NULL,
+                voltage REAL NOT NULL,
+                current REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                source TEXT PRIMARY KEY,
+                samples_done INTEGER NOT NULL
+            );
+            """
+        )
+
+    def close(self) -> None:
+        if self.con is not None:
+            self.con.close()
+            self.con = None
+
+    def get_checkpoint(self, source: str) -> int:
+        row = self.con.execute(
+            "SELECT samples_done FROM checkpoints WHERE source = ?", (source,)
+        ).fetchone()
+        return 0 if row is None else row[0]
+
+    def write(self, batch: IngestBatch) -> None:
+        with self.con:  # one transaction
+            self.con.executemany(
+                "INSERT INTO samples VALUES (?, ?, ?, ?)",
+                zip(
+                    repeat(batch.observer),
+                    batch.time_ns.tolist(),
+                    batch.voltage.tolist(),
+                    batch.current.tolist(),
+                ),
+            )
+            self.con.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?)",
+                (batch.source, batch.offset_end),
+            )
+
+    def count_rows(self, observer: str | None = None) -> int:
+        if observer is None:
+            return self.con.execute("SELECT COUNT(*) FROM samples").fetchone()[0]
+        return self.con.execute(
+            "SELECT COUNT(*) FROM samples WHERE observer = ?", (observer,)
+        ).fetchone()[0]
+
+
+class DuckDBSink(IngestSink):
+    """Columnar sink - batches are handed over as arrow-tables (zero-copy bulk insert)."""
+
+    name = "duckdb"
+
+    def __init__(self, target: Path) -> None:
+        super().__init__(target)
+        self.con = None
+
+    def open(self) -> None:
+        if duckdb is None or pa is None:
+            raise RuntimeError("DuckDB-Sink needs duckdb & pyarrow -> shepherd-server[ingest]")
+        self.con = duckdb.connect(self.target.as_posix())
+        self.con.execute(
+            "CREATE TABLE IF NOT EXISTS samples ("
+            "observer VARCHAR, time_ns BIGINT, voltage DOUBLE, current DOUBLE)"
+        )
+        self.con.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "source VARCHAR PRIMARY KEY, samples_done BIGINT)"
+        )
+
+    def close(self) -> None:
+        if self.con is not None:
+            self.con.close()
+            self.con = None
+
+    def get_checkpoint(self, source: str) -> int:
+        row = self.con.execute(
+            "SELECT samples_done FROM checkpoints WHERE source = ?", [source]
+        ).fetchone()
+        return 0 if row is None else row[0]
+
+    def write(self, batch: IngestBatch) -> None:
+        table = pa.table(
+            {
+                "observer": pa.repeat(batch.observer, batch.rows),
+                "time_ns": batch.time_ns,
+                "voltage": batch.voltage,
+                "current": batch.current,
+            }
+        )
+        self.con.begin()
+        self.con.register("batch", table)
+        self.con.execute("INSERT INTO samples SELECT * FROM batch")
+        self.con.unregister("batch")
+        self.con.execute(
+            "INSERT OR REPLACE INTO checkpoints VALUES (?, ?)", [batch.source, batch.offset_end]
+        )
+        self.con.commit()
+
+    def count_rows(self, observer: str | None = None) -> int:
+        if observer is None:
+            return self.con.execute("SELECT COUNT(*) FROM samples").fetchone()[0]
+        return self.con.execute(
+            "SELECT COUNT(*) FROM samples WHERE observer = ?", [observer]
+        ).fetchone()[0]
+
+
+SINKS: dict[str, type[IngestSink]] = {sink.name: sink for sink in [SQLiteSink, DuckDBSink]}
+
+
+def sinks_available() -> list[str]:
+    if duckdb is None or pa is None:
+        return [SQLiteSink.name]
+    return list(SINKS)
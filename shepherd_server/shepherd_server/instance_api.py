@@ -25,6 +25,7 @@ from starlette.responses import FileResponse
 
 from .api_accounts.router import router as accounts_router
 from .api_auth.router import router as auth_router
+from .api_campaigns.router import router as campaigns_router
 from .api_experiments.router import router as experiments_router
 from .api_resources.router import router as resources_router
 from .api_testbed.models_status import TestbedDB
@@ -80,6 +81,7 @@ app.add_middleware(
 app.include_router(auth_router)
 app.include_router(accounts_router)
 app.include_router(experiments_router)
+app.include_router(campaigns_router)
 app.include_router(testbed_router)
 app.include_router(resources_router)
 
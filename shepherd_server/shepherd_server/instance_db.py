@@ -16,8 +16,10 @@ from .api_accounts.models import UserRole
 from .api_accounts.utils_mail import get_mail_engine
 from .api_accounts.utils_misc import calculate_hash
 from .api_accounts.utils_misc import calculate_password_hash
+from .api_campaigns.models import Campaign
 from .api_experiments.models import ExperimentStats
 from .api_experiments.models import WebExperiment
+from .api_testbed.models_status import SchedulerLease
 from .api_testbed.models_status import TestbedDB
 from .config import server_config
 from .logger import log
@@ -29,12 +31,19 @@ async def db_client() -> AsyncDatabase:
     # above we want 'tz_aware=True' for offset-aware timestamps
     # BUT then Observers need "bson"-package to unpickle tasks
 
-    # Note: if ".shp" does not exist, it will be created
+    # Note: if the database (default ".shp") does not exist, it will be created
     await init_beanie(
-        database=client.shp,
-        document_models=[User, WebExperiment, TestbedDB, ExperimentStats],
+        database=client[server_config.db_name],
+        document_models=[
+            User,
+            WebExperiment,
+            TestbedDB,
+            ExperimentStats,
+            SchedulerLease,
+            Campaign,
+        ],
     )
-    return client.shp
+    return client[server_config.db_name]
 
 
 def db_available(timeout: float = 2) -> bool:
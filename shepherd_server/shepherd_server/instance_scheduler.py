@@ -23,26 +23,70 @@ from typing_extensions import deprecated
 from shepherd_server.instance_fixtures import prepare_fixture_client
 
 from .api_accounts.models import User
+from .api_accounts.models import UserRole
 from .api_accounts.utils_mail import get_mail_engine
 from .api_experiments.models import ReplyData
+from .api_experiments.models import SchedulerPhase
 from .api_experiments.models import WebExperiment
+from .api_experiments.utils_calendar import as_aware
+from .api_experiments.utils_calendar import reservation_slot
 from .api_testbed.models_status import SchedulerStatus
 from .api_testbed.models_status import TestbedDB
 from .async_wrapper import async_wrap
 from .config import server_config
+from .herd_cache import FIRMWARE_TASKS
+from .herd_cache import herd_cache
+from .herd_completion import CompletionWatcher
+from .herd_health import HealthMonitor
+from .herd_logs import ObserverLogStream
+from .herd_readiness import herd_wait_idle
+from .herd_readiness import herd_wait_inactive
+from .herd_readiness import probe_summary
+from .herd_readiness import results_exist
+from .herd_readiness import results_stable
+from .herd_readiness import wait_down
+from .herd_readiness import wait_reachable
+from .herd_recovery import CMD_MOUNT
+from .herd_recovery import CMD_RESYNC
+from .herd_recovery import Failure
+from .herd_recovery import FailureKind
+from .herd_recovery import ObserverRecovery
+from .herd_recovery import classify_failure
+from .herd_recovery import herd_exclude
+from .herd_recovery import herd_failed_observers
+from .herd_recovery import herd_restricted
+from .herd_recovery import herd_run_with_retry
+from .herd_recovery import herd_select
+from .herd_recovery import hostnames_online
+from .herd_start_delay import StartDelay
+from .herd_start_delay import observed_start
 from .instance_db import db_available
 from .instance_db import db_client
 from .logger import log
+from .scheduler_lease import LeaderLease
 
 # TODO:
-#   - auto-retry sub-tasks or whole job after it failed
 #   - refactor complex herd-fn into sep file
 
+CANCEL_MESSAGE = "Cancelled by user"
+LEASE_MESSAGE = "Scheduler lost its lease"
+QUEUE_LOOKAHEAD = 20
 
-@async_wrap(timeout=80 + 60)
-def herd_fetch_logs_and_clean_up(herd: Herd, since: datetime | None = None) -> dict[str, ReplyData]:
+
+@async_wrap(timeout=5 + 2 * 30 + 30 + 60 + 40 + 2 * 30)  # sum of the steps below
+def herd_fetch_logs_and_clean_up(
+    herd: Herd,
+    since: datetime | None = None,
+    log_stream: ObserverLogStream | None = None,
+) -> dict[str, ReplyData]:
+    """Fetch remaining logs and reset the herd.
+
+    With a log-stream the logs are only referenced (as files) - otherwise embedded.
+    Quarantined observers are left alone, their recovery runs on own connections.
+    """
     log.info("      .. reconnect to all sheep (step 1/5)")
     herd.open()
+    herd_select(herd, hostnames_online(herd) - observer_recovery.quarantined)
 
     log.info("      .. determine state of processes (step 2/5)")
     obs_failed = herd.run_cmd(
@@ -54,19 +98,21 @@ def herd_fetch_logs_and_clean_up(herd: Herd, since: datetime | None = None) -> d
 
     log.info("      .. kill remaining processes (step 3/5)")
     herd.kill_sheep_process()
-    while herd.service_is_active():
-        time.sleep(5)
+    herd_wait_inactive(herd, timeout=60)
 
     log.info("      .. fetch service-logs (step 4/5)")
-    addition = f" --since='{since.isoformat(sep=' ')[:19]}'" if since is not None else ""
-    replies = herd.run_cmd(
-        sudo=True,
-        cmd="/usr/bin/journalctl --unit=shepherd.service "
-        "--no-pager --output=short-iso-precise "
-        "--utc --boot --all" + addition,
-        timeout=40,
-        verbose=False,
-    )
+    if log_stream is not None:
+        replies = log_stream.fetch(herd, final=True)
+    else:
+        addition = f" --since='{since.isoformat(sep=' ')[:19]}'" if since is not None else ""
+        replies = herd.run_cmd(
+            sudo=True,
+            cmd="/usr/bin/journalctl --unit=shepherd.service "
+            "--no-pager --output=short-iso-precise "
+            "--utc --boot --all" + addition,
+            timeout=40,
+            verbose=False,
+        )
     obs_logs: dict[str, ReplyData] = {}
     for hostname, result in replies.items():
         if not isinstance(result, Result):
@@ -81,7 +127,14 @@ def herd_fetch_logs_and_clean_up(herd: Herd, since: datetime | None = None) -> d
             exit_code = 1
         else:
             exit_code = 0
-        obs_logs[hostname] = ReplyData(exited=exit_code, stdout=result.stdout, stderr=result.stderr)
+        if log_stream is not None:
+            obs_logs[hostname] = ReplyData(
+                exited=exit_code, stderr=result.stderr, log_path=log_stream.file_path(hostname)
+            )
+        else:
+            obs_logs[hostname] = ReplyData(
+                exited=exit_code, stdout=result.stdout, stderr=result.stderr
+            )
 
     log.info("      .. erase service-logs (step 5/5)")
     herd.service_erase_log()
@@ -91,16 +144,37 @@ def herd_fetch_logs_and_clean_up(herd: Herd, since: datetime | None = None) -> d
     return obs_logs
 
 
-@async_wrap(timeout=5 * 60)
+def fence() -> None:
+    """Abort a blocking step once the scheduler lost its lease (another one takes over)."""
+    if not leader_lease.held:
+        raise RuntimeError(LEASE_MESSAGE)
+
+
+@async_wrap(timeout=10 * 60)
 def herd_prepare_experiment(herd: Herd, tb_tasks: TestbedTasks) -> None:
     """Mod and program firmware to targets.
 
+    Observers that keep failing (resync, mount, programming) are excluded,
+    the experiment continues on the remaining ones.
+    Steps that recently succeeded (see herd_cache) are skipped.
+    Between the steps the lease is checked, a running step is not interrupted.
     This makes one direct sheep-call: run preparation-tasks
     """
-    if herd.resync() != 0:
-        raise RuntimeError("Resync of observers failed")
-    if herd.mount() != 0:
-        raise RuntimeError("Checking availability of network-drives on observers failed")
+    due = {host for host in hostnames_online(herd) if herd_cache.needs_check(host)}
+    failed_resync: set[str] = set()
+    failed_mount: set[str] = set()
+    if len(due) > 0:
+        with herd_restricted(herd, due):
+            failed_resync = herd_run_with_retry(herd, CMD_RESYNC, timeout=40)
+            fence()
+            failed_mount = herd_run_with_retry(herd, CMD_MOUNT, timeout=70) - failed_resync
+            fence()
+    herd_exclude(herd, failed_resync, "resync failed")
+    herd_exclude(herd, failed_mount, "mount failed")
+    herd_cache.forget(failed_resync | failed_mount)
+    herd_cache.store_checked(due - failed_resync - failed_mount)
+    if len(herd.group_online) == 0:
+        raise RuntimeError("Resync or checking network-drives failed on all observers")
 
     def tbt_patch_pre(tb_ts: TestbedTasks) -> TestbedTasks:
         tb_ts_pre = tb_ts.model_dump()
@@ -111,21 +185,38 @@ def herd_prepare_experiment(herd: Herd, tb_tasks: TestbedTasks) -> None:
         tb_ts_pre["observer_tasks"] = ots_new
         return TestbedTasks(**tb_ts_pre)
 
-    pre_tasks = tbt_patch_pre(tb_tasks)
-    ret = herd.run_task(pre_tasks, attach=False, quiet=True)
-    if ret > 0:
-        raise RuntimeError("Starting preparation of targets failed")
-    while herd.service_is_active():
-        time.sleep(5)
-    if herd.service_is_failed():
+    pre_tasks, fingerprints = herd_cache.strip_programmed(tbt_patch_pre(tb_tasks))
+    needed = {
+        ots.observer
+        for ots in pre_tasks.observer_tasks
+        if any(getattr(ots, task) is not None for task in FIRMWARE_TASKS)
+    } & hostnames_online(herd)
+    if len(needed) == 0:
+        log.info("  .. all targets are already programmed")
+        return
+    fence()
+    with herd_restricted(herd, needed):
+        ret = herd.run_task(pre_tasks, attach=False, quiet=True)
+        if ret > 0:
+            raise RuntimeError("Starting preparation of targets failed")
+        herd_wait_inactive(herd, timeout=8 * 60)
+        fence()
+        failed = herd_failed_observers(herd)
+    herd_cache.store_programmed(fingerprints, needed - failed)
+    if failed == hostnames_online(herd):
         raise RuntimeError("Preparation of targets failed - will skip experiment")
+    herd_exclude(herd, failed, "preparation of target failed")
 
 
 @async_wrap(timeout=30)
-def herd_schedule_experiment(herd: Herd, tb_tasks: TestbedTasks) -> None:
+def herd_schedule_experiment(
+    herd: Herd, tb_tasks: TestbedTasks, time_reserved: datetime | None = None
+) -> tuple[datetime, float]:
     """Schedule the actual experiment of the user.
 
     This makes one direct sheep-call: run emulation-task
+    Reservations start at the reserved time, if the consensus allows it.
+    Returns the agreed start (observer-time) & the latency of consensus and dispatch.
     """
 
     def tbt_patch_emu(tb_ts: TestbedTasks, ts_start: datetime) -> TestbedTasks:
@@ -143,7 +234,15 @@ def herd_schedule_experiment(herd: Herd, tb_tasks: TestbedTasks) -> None:
         tb_ts_emu["observer_tasks"] = ots_new
         return TestbedTasks(**tb_ts_emu)
 
+    ts_consensus = time.monotonic()
     time_start, delay_s = herd.find_consensus_time()
+    if time_reserved is not None:
+        late_s = (time_start - time_reserved).total_seconds()
+        if late_s > 0:
+            log.warning("  .. reservation starts %d s late", int(late_s))
+        else:
+            time_start = time_reserved
+            delay_s -= late_s
     log.info(
         "  .. waiting %d seconds for start: %s (observer-time)",
         int(delay_s),
@@ -153,22 +252,73 @@ def herd_schedule_experiment(herd: Herd, tb_tasks: TestbedTasks) -> None:
     ret = herd.run_task(tasks_emu, attach=False, quiet=True)
     if ret > 0:
         raise RuntimeError("Starting Emulation failed")
-
-
-async def herd_wait_completion(herd: Herd, timeout: timedelta) -> str | None:
+    return time_start, time.monotonic() - ts_consensus
+
+
+async def herd_wait_completion(
+    herd: Herd,
+    timeout: timedelta,
+    log_stream: ObserverLogStream | None = None,
+    health: HealthMonitor | None = None,
+    xp_id: UUID | None = None,
+) -> str | None:
+    """Wait for all observers to finish - event-driven (see herd_completion).
+
+    Logs of observers that finish early are fetched right away.
+    With a health-monitor the experiment gets aborted once too many observers failed.
+    With an ID the measurement gets stopped once the owner cancelled the experiment.
+    Waiting ends without touching the herd once the scheduler lost its lease.
+    """
     # this fn can not be wrapped, because it has no fixed timeout
-    # TODO: add to main code?
     ts_timeout = local_now() + timeout
+    ts_check = local_now() + server_config.log_fetch_interval
+    ts_cancel = local_now() + server_config.cancel_check_interval
+    watcher = CompletionWatcher(herd, timeout)
+    watcher.start()
     error_msg = None
     try:
-        while await asyncio.wait_for(asyncio.to_thread(herd.service_is_active), timeout=30):
+        while len(watcher.pending) > 0:
             if local_now() > ts_timeout:
                 error_msg = f"Timeout ({timeout} hms) waiting for experiment to complete"
                 break
-            # we want to disturb the sheep as little as possible, so we wait
-            await asyncio.sleep(5)
+            ts_next = min(ts_timeout, ts_check, ts_cancel)
+            wait_s = max((ts_next - local_now()).total_seconds(), 1)
+            finished = await watcher.wait(timeout=wait_s)
+            if not leader_lease.held:
+                error_msg = LEASE_MESSAGE
+                break
+            if xp_id is not None and local_now() > ts_cancel:
+                ts_cancel = local_now() + server_config.cancel_check_interval
+                if await WebExperiment.cancel_requested(xp_id):
+                    log.info("  .. cancelled by user -> stop measurement")
+                    await asyncio.wait_for(asyncio.to_thread(herd.stop_measurement), timeout=45)
+                    error_msg = CANCEL_MESSAGE
+                    break
+            if len(finished) > 0:
+                log.info("  .. finished on %s", ", ".join(sorted(finished)))
+                if health is not None:
+                    health.update_finished(finished)
+            fetch_from = finished
+            periodic = local_now() > ts_check
+            if periodic:
+                ts_check = local_now() + server_config.log_fetch_interval
+                fetch_from = hostnames_online(herd)
+            if log_stream is not None and len(fetch_from) > 0:
+                with herd_restricted(herd, fetch_from):
+                    # no timeout here: the herd may only be restored once the thread returned,
+                    # run_cmd() gives up after 40 s and the next fetch continues at the cursor
+                    replies = await asyncio.to_thread(log_stream.fetch, herd)
+                if health is not None:
+                    health.update_logs(replies)
+            if health is not None and (periodic or len(finished) > 0):
+                await asyncio.to_thread(health.update_files)
+                error_msg = health.abort_reason()
+                if error_msg is not None:
+                    break
     except TimeoutError:
         error_msg = "Timeout waiting for experiment-status during execution"
+    finally:
+        watcher.stop()
     return error_msg
 
 
@@ -213,16 +363,23 @@ def fetch_scheduler_log(ts_start: datetime) -> str | None:
     return ret.stdout
 
 
-def herd_reboot_syn(herd: Herd) -> set:
+def herd_reboot_syn(herd: Herd, hostnames: set[str] | None = None) -> set[str]:
+    """Reboot observers (default: all online ones) and wait for them to come back."""
     herd.open()
-    _pre = set(herd.group_online)
+    _online = hostnames_online(herd)
+    _pre = _online if hostnames is None else _online & hostnames
+    if len(_pre) == 0:
+        return _pre
 
-    herd.reboot()  # TODO: add sysrq-reboot
-    time.sleep(120)
+    with herd_restricted(herd, _pre):
+        hosts = {cnx.host for cnx in herd.group_online}
+        herd.reboot()  # TODO: add sysrq-reboot
+    wait_down(hosts)
+    wait_reachable(hosts, timeout=120)
 
     herd.open()
     _try = 0
-    while _try < 6 and len(_pre) > len(herd.group_online):
+    while _try < 6 and not _pre.issubset(hostnames_online(herd)):
         time.sleep(10)
         _try += 1
         herd.open()
@@ -230,41 +387,279 @@ def herd_reboot_syn(herd: Herd) -> set:
     return _pre
 
 
-async def herd_reboot(herd: Herd) -> None:
+async def herd_reboot(herd: Herd, hostnames: set[str] | None = None) -> None:
+    """Reboot the whole herd or only the given observers - the others stay untouched."""
+    composition = {"all": set(herd.hostnames.values()), "pre": hostnames_online(herd)}
     group_pre = set()
     try:
-        log.info("Rebooting herd NOW!")
+        if hostnames is None:
+            log.info("Rebooting herd NOW!")
+        else:
+            log.info("Rebooting %s NOW!", ", ".join(sorted(hostnames)))
         group_pre = await asyncio.wait_for(
-            asyncio.to_thread(herd_reboot_syn, herd=herd),
+            asyncio.to_thread(herd_reboot_syn, herd=herd, hostnames=hostnames),
             timeout=200,
         )
         log.info("  .. give PTP time to stabilize")
-        await asyncio.wait_for(asyncio.to_thread(herd.resync), timeout=4 * 60)
-        log.info("  .. brought back %d of %d observers", len(herd.group_online), len(group_pre))
+        with herd_restricted(herd, group_pre):
+            await asyncio.wait_for(asyncio.to_thread(herd.resync), timeout=4 * 60)
+        log.info(
+            "  .. brought back %d of %d observers",
+            len(group_pre & hostnames_online(herd)),
+            len(group_pre),
+        )
     except TimeoutError:
         log.warning("Timeout waiting for reboot of herd")
-    composition = {
-        "all": {herd.hostnames.get(cnx.host) for cnx in herd.group_all},
-        "pre": {herd.hostnames.get(cnx.host) for cnx in group_pre},
-        "post": {herd.hostnames.get(cnx.host) for cnx in herd.group_online},
-    }
+    composition["rebooted"] = group_pre
+    composition["post"] = hostnames_online(herd)
     await get_mail_engine().send_herd_reboot_email(composition)
 
 
+async def set_phase(xp_id: UUID, phase: SchedulerPhase) -> None:
+    web_exp = await WebExperiment.get_by_id(xp_id)
+    if isinstance(web_exp, WebExperiment):
+        web_exp.scheduler_phase = phase
+        await web_exp.save_changes()
+
+
+async def complete_web_experiment(
+    xp_id: UUID,
+    herd: Herd,
+    testbed_tasks: TestbedTasks,
+    *,
+    exe_timeout: timedelta,
+    log_stream: ObserverLogStream,
+    error: str | None,
+    ts_start: datetime,
+    exe_timestamp: datetime | None,
+    exe_duration: timedelta | None = None,
+) -> Failure | None:
+    """Wait for completion, collect logs & results - also used to reattach after a restart."""
+    _err1 = error
+    if _err1 is None:
+        log.info("  .. waiting for completion")
+        health = None
+        if exe_timestamp is not None:
+            health = HealthMonitor(
+                {
+                    observer: path
+                    for observer, path in testbed_tasks.get_output_paths().items()
+                    if observer in hostnames_online(herd)
+                },
+                ts_start=exe_timestamp,
+                duration=exe_duration,
+            )
+        _err1 = await herd_wait_completion(
+            herd, exe_timeout, log_stream=log_stream, health=health, xp_id=xp_id
+        )
+    if _err1 == LEASE_MESSAGE:
+        log.error("  .. %s -> experiment is left to the next scheduler", _err1)
+        return None
+
+    if _err1 == CANCEL_MESSAGE:
+        log.info("  .. %s", _err1)
+    elif _err1 is not None:
+        log.warning(_err1)
+        await asyncio.wait_for(asyncio.to_thread(herd.check_status, warn=True), timeout=30 + 15)
+        # check_status() waits 30 s to finish cmd internally
+
+    log.info("  .. retrieve logs & clean up")
+    await set_phase(xp_id, SchedulerPhase.collecting)
+    paths = {
+        observer: path
+        for observer, path in testbed_tasks.get_output_paths().items()
+        if observer in hostnames_online(herd)
+    }
+    await asyncio.to_thread(results_stable, paths, timeout=20)  # finish IO
+    log_herd, _err2 = await herd_fetch_logs_and_clean_up(herd, log_stream=log_stream)
+    # will also re-add all online observers (except quarantined ones)
+    if _err2 is not None:
+        log.warning(_err2)
+        await asyncio.wait_for(asyncio.to_thread(herd.check_status, warn=True), timeout=30 + 15)
+        # check_status() waits 30 s to finish cmd internally
+
+    log.info("  .. finished - now collecting data")
+    # Reload XP to avoid race-condition / working on old data
+    web_exp = await WebExperiment.get_by_id(xp_id)
+    if web_exp is None:
+        log.warning("XP-dataset not found (deleted?) after running it (deleted?)")
+        if (_err1 or _err2) is None:
+            return None
+        return Failure(kind=FailureKind.unknown, message=_err1 or _err2)
+
+    if log_herd is not None:
+        web_exp.observers_output = log_herd
+    web_exp.finished_at = local_now()
+    web_exp.scheduler_phase = None
+    web_exp.scheduler_error = _err1 or _err2
+
+    if len(web_exp.observers_output) == 0:
+        log.error("Herd collected no logs from nodes")
+    if web_exp.max_exit_code > 0:
+        log.error("Herd failed on at least one Observer")
+
+    # update XP from result-files with observer-start-TS
+    # await web_exp.update_time_start()
+
+    # take from files if possible, BUT has time of observer
+    await web_exp.update_result()
+    if exe_timestamp is not None and _err1 is None:
+        start_delay.record_start(
+            exe_timestamp,
+            await asyncio.to_thread(observed_start, web_exp.result_paths or {}),
+        )
+    web_exp.scheduler_log, _ = await fetch_scheduler_log(ts_start=ts_start)
+    web_exp.offload_logs(web_exp.id)  # keep document small
+    await web_exp.save_changes()
+    if web_exp.cancel_requested_at is not None:
+        # partial results are kept, the herd is fine -> no retry or recovery
+        launch_post_processing(web_exp.id)
+        return None
+    failure = classify_failure(web_exp)
+    if (
+        failure is not None
+        and failure.retryable
+        and web_exp.scheduler_retries < server_config.scheduler_retries_max
+    ):
+        await reschedule(web_exp, failure)
+    else:
+        launch_post_processing(web_exp.id)
+    return failure
+
+
+async def resume_in_flight(herd: Herd) -> None:
+    """Reattach to experiments that kept running during a restart of the scheduler.
+
+    Executing experiments are reattached if the observers are still measuring
+    (within the deadline) or already produced results. The rest gets reset.
+    """
+    testbed = Testbed(name=server_config.testbed_name)
+    for web_exp in await WebExperiment.get_in_flight():
+        if not leader_lease.held:
+            return
+        if (
+            web_exp.scheduler_phase not in {SchedulerPhase.executing, SchedulerPhase.collecting}
+            or web_exp.executed_at is None
+            or web_exp.expected_end_at is None
+        ):
+            continue  # preparation is repeated -> reset
+        # beanie does not save TZ, so we adapt
+        remaining = web_exp.expected_end_at - datetime.now(tz=web_exp.expected_end_at.tzinfo)
+        elapsed = datetime.now(tz=web_exp.started_at.tzinfo) - web_exp.started_at
+        herd.open()
+        # same subset as in run_web_experiment()
+        herd_select(herd, set(web_exp.observers_requested) & set(web_exp.observers_online))
+        active = await asyncio.wait_for(asyncio.to_thread(herd.service_is_active), timeout=30)
+        if not (active and remaining > timedelta(0)) and not results_exist(
+            web_exp.observer_paths or {}
+        ):
+            log.info("Experiment %s is not recoverable -> reset", web_exp.id)
+            continue
+        log.info("Reattaching to experiment %s (%s)", web_exp.id, web_exp.scheduler_phase.value)
+        failure = await complete_web_experiment(
+            web_exp.id,
+            herd,
+            TestbedTasks.from_xp(web_exp.experiment, testbed),
+            exe_timeout=max(remaining, timedelta(minutes=1)),
+            log_stream=ObserverLogStream(web_exp.id, since=web_exp.herd_since),
+            error=None,
+            ts_start=datetime.now() - elapsed,  # noqa: DTZ005
+            exe_timestamp=web_exp.executed_at,
+            exe_duration=web_exp.experiment.duration,
+        )
+        if failure is not None:
+            await recover_herd(herd, failure)
+
+
+async def observers_available() -> set[str]:
+    tb_status = await TestbedDB.get_one()
+    return set(tb_status.scheduler.targets_online.values()) - observer_recovery.quarantined
+
+
+async def claim_runnable(
+    *, only_elevated: bool, available: set[str] | None
+) -> WebExperiment | None:
+    """Claim a due reservation or the oldest experiment whose requested observers are online.
+
+    Experiments waiting for offline observers are deferred (state "waiting"),
+    so runnable ones can go ahead. After the maximum deferral they run with what is there.
+    Without a set of available observers (dry run) this is plain FIFO.
+    FIFO-experiments only start if they end before the next reservation.
+    """
+    roles_allow = [UserRole.admin, UserRole.elevated] if only_elevated else list(UserRole)
+    ts_reserved = None  # start of the next reservation
+    for reservation in await WebExperiment.get_reservations():
+        if reservation.started_at is not None or (
+            isinstance(reservation.owner, User) and reservation.owner.role not in roles_allow
+        ):
+            continue
+        # beanie does not save TZ, so we adapt
+        if datetime.now(tz=reservation.reserved_from.tzinfo) < reservation.reserved_from:
+            ts_reserved = reservation.reserved_from
+            break
+        claimed = await WebExperiment.claim(reservation.id)
+        if claimed is not None:
+            log.info("Reservation of experiment %s is due", claimed.id)
+            return claimed
+
+    testbed = Testbed(name=server_config.testbed_name)
+    for candidate in await WebExperiment.get_queue(
+        only_elevated=only_elevated, limit=QUEUE_LOOKAHEAD
+    ):
+        if ts_reserved is not None:
+            # pack FIFO-experiments into the gap before the next reservation
+            _, ts_end = reservation_slot(
+                local_now() + server_config.reservation_prep_time, candidate.experiment.duration
+            )
+            if ts_end > ts_reserved:
+                continue
+        missing = []
+        if available is not None:
+            requested = TestbedTasks.from_xp(candidate.experiment, testbed).get_observers()
+            missing = sorted(set(requested) - available)
+        if len(missing) > 0:
+            # beanie does not save TZ, so we adapt
+            deferred_since = candidate.deferred_since or local_now()
+            overdue = (
+                datetime.now(tz=deferred_since.tzinfo) - deferred_since > server_config.deferral_max
+            )
+            if not overdue:
+                if missing != candidate.observers_awaited:
+                    log.info(
+                        "Deferring experiment %s - waiting for %s", candidate.id, ", ".join(missing)
+                    )
+                    await WebExperiment.defer(candidate.id, missing)
+                continue
+            log.warning(
+                "Experiment %s deferred too long -> runs without %s",
+                candidate.id,
+                ", ".join(missing),
+            )
+        claimed = await WebExperiment.claim(candidate.id)
+        if claimed is not None:
+            return claimed
+    return None
+
+
 async def run_web_experiment(
     xp_id: UUID,
     temp_path: Path | None,
     herd: Herd | None,
-) -> bool:
-    had_error = False
+) -> Failure | None:
+    """Run the experiment and return the failure (if any).
+
+    Experiments that failed transiently before execution get rescheduled.
+    """
+    failure = None
     ts_start = datetime.now()  # noqa: DTZ005
     log.info("HERD_RUN(id=%s)", str(xp_id))
     # mark as started
     web_exp = await WebExperiment.get_by_id(xp_id)
     if web_exp is None:
         log.warning("XP-dataset not found (deleted?) before running it")
-        return had_error
+        return None
     web_exp.started_at = local_now()
+    web_exp.scheduler_phase = SchedulerPhase.preparing
     testbed = Testbed(name=server_config.testbed_name)
     testbed_tasks = TestbedTasks.from_xp(web_exp.experiment, testbed)
     if not testbed_tasks.is_contained():
@@ -273,8 +668,14 @@ async def run_web_experiment(
     web_exp.observer_paths = testbed_tasks.get_output_paths()
     tb_status = await TestbedDB.get_one()
     web_exp.observers_requested = sorted(testbed_tasks.get_observers())
-    web_exp.observers_online = sorted(set(tb_status.scheduler.targets_online.values()))
-    web_exp.observers_offline = sorted(set(tb_status.scheduler.targets_offline.values()))
+    quarantined = observer_recovery.quarantined  # status might be older than the quarantine
+    web_exp.observers_online = sorted(
+        set(tb_status.scheduler.targets_online.values()) - quarantined
+    )
+    web_exp.observers_offline = sorted(
+        set(tb_status.scheduler.targets_offline.values())
+        | (set(tb_status.scheduler.targets_online.values()) & quarantined)
+    )
     # await web_exp.update_time_start(web_exp.started_at, force=True)
     await web_exp.save_changes()
 
@@ -284,16 +685,21 @@ async def run_web_experiment(
             cnx
             for cnx in herd.group_online
             if herd.hostnames.get(cnx.host) in web_exp.observers_requested
+            and herd.hostnames.get(cnx.host) not in quarantined
         ]
         log.info("  >>> Preparation <<<")
         ts_herd, _err1 = await herd_fetch_timestamp(herd)
+        log_stream = ObserverLogStream(xp_id, since=ts_herd)
         if _err1 is None:
             _, _err1 = await herd_prepare_experiment(herd, testbed_tasks)
-            await asyncio.sleep(10)  # stabilize
+            await asyncio.to_thread(herd_wait_idle, herd, timeout=10)
+        if _err1 is None and await WebExperiment.cancel_requested(xp_id):
+            _err1 = CANCEL_MESSAGE
+        if not leader_lease.held:
+            log.error("  .. %s -> experiment is left to the next scheduler", LEASE_MESSAGE)
+            return None
 
         exe_timestamp = None
-        exe_delay = timedelta(seconds=50)  # to better synchronize start
-        # TODO: make this delay 60s configurable?
         if isinstance(web_exp.experiment.duration, timedelta):
             exe_timeout = web_exp.experiment.duration + timedelta(minutes=10)
         else:
@@ -307,7 +713,7 @@ async def run_web_experiment(
             )
             exe_timeout = duration + timedelta(minutes=10)
         if _err1 is None:
-            herd.start_delay_s = round(exe_delay.total_seconds())
+            herd.start_delay_s = start_delay.delay_s
             log.info(
                 "  >>> Execution <<< runtime %s hms, timeout in %s hms, %d of %d observers",
                 str(web_exp.experiment.duration),
@@ -315,61 +721,41 @@ async def run_web_experiment(
                 len(herd.group_online),
                 len(herd.group_all),
             )
-            exe_timestamp = local_now() + exe_delay
-            _, _err1 = await herd_schedule_experiment(herd, testbed_tasks)
+            log.info("  .. %s", start_delay)
+            exe_timestamp = local_now() + timedelta(seconds=herd.start_delay_s)
+            time_reserved = None
+            if web_exp.reserved_from is not None and web_exp.experiment.time_start is not None:
+                time_reserved = as_aware(web_exp.experiment.time_start)
+                exe_timeout += max(time_reserved - local_now(), timedelta(0))
+            scheduled, _err1 = await herd_schedule_experiment(
+                herd, testbed_tasks, time_reserved=time_reserved
+            )
+            if scheduled is not None:
+                exe_timestamp, dispatch_s = scheduled
+                start_delay.record_dispatch(dispatch_s)
 
         # Reload XP to avoid race-condition / working on old data
         web_exp = await WebExperiment.get_by_id(xp_id)
         if isinstance(web_exp, WebExperiment):
             web_exp.executed_at = exe_timestamp
+            web_exp.scheduler_phase = SchedulerPhase.executing
+            web_exp.herd_since = ts_herd
+            if exe_timestamp is not None:
+                web_exp.expected_end_at = exe_timestamp + exe_timeout
             await web_exp.update_time_start(exe_timestamp, force=True)
             await web_exp.save_changes()
 
-        if _err1 is None:
-            log.info("  .. waiting for completion")
-            _err1 = await herd_wait_completion(herd, exe_timeout)
-
-        if _err1 is not None:
-            log.warning(_err1)
-            await asyncio.wait_for(asyncio.to_thread(herd.check_status, warn=True), timeout=30 + 15)
-            # check_status() waits 30 s to finish cmd internally
-
-        log.info("  .. retrieve logs & clean up")
-        await asyncio.sleep(20)  # finish IO, precaution
-        log_herd, _err2 = await herd_fetch_logs_and_clean_up(herd, since=ts_herd)
-        # will also re-add all online observers
-        if _err2 is not None:
-            log.warning(_err2)
-            await asyncio.wait_for(asyncio.to_thread(herd.check_status, warn=True), timeout=30 + 15)
-            # check_status() waits 30 s to finish cmd internally
-
-        log.info("  .. finished - now collecting data")
-        # Reload XP to avoid race-condition / working on old data
-        web_exp = await WebExperiment.get_by_id(xp_id)
-        if web_exp is None:
-            log.warning("XP-dataset not found (deleted?) after running it (deleted?)")
-            return (_err1 or _err2) is not None
-
-        if log_herd is not None:
-            web_exp.observers_output = log_herd
-        web_exp.finished_at = local_now()
-        web_exp.scheduler_error = _err1 or _err2
-
-        if len(web_exp.observers_output) == 0:
-            log.error("Herd collected no logs from nodes")
-        if web_exp.max_exit_code > 0:
-            log.error("Herd failed on at least one Observer")
-
-        # update XP from result-files with observer-start-TS
-        # await web_exp.update_time_start()
-
-        # take from files if possible, BUT has time of observer
-        await web_exp.update_result()
-        web_exp.scheduler_log, _ = await fetch_scheduler_log(ts_start=ts_start)
-        await web_exp.save_changes()
-        await notify_user(web_exp.id)
-        log.info("  .. users were informed")
-        had_error = web_exp.had_errors
+        failure = await complete_web_experiment(
+            xp_id,
+            herd,
+            testbed_tasks,
+            exe_timeout=exe_timeout,
+            log_stream=log_stream,
+            error=_err1,
+            ts_start=ts_start,
+            exe_timestamp=exe_timestamp,
+            exe_duration=web_exp.experiment.duration,
+        )
 
     else:  # dry run
         if temp_path is None:
@@ -391,7 +777,94 @@ async def run_web_experiment(
                     current=np.zeros(10_000),
                 )
         await web_exp.update_result(paths_result)
-    return had_error
+        launch_post_processing(web_exp.id, notify=False)
+    return failure
+
+
+async def reschedule(web_exp: WebExperiment, failure: Failure) -> None:
+    """Put the experiment back to the front of the queue (keeps its scheduling-time)."""
+    web_exp.scheduler_retries += 1
+    log.warning(
+        "  .. transient failure -> retry %d of %d (%s)",
+        web_exp.scheduler_retries,
+        server_config.scheduler_retries_max,
+        failure.message,
+    )
+    web_exp.started_at = None
+    web_exp.executed_at = None
+    web_exp.finished_at = None
+    web_exp.scheduler_phase = None
+    web_exp.expected_end_at = None
+    web_exp.scheduler_error = None
+    web_exp.observers_output = {}
+    web_exp.observers_had_data = {}
+    await web_exp.save_changes()
+
+
+observer_recovery = ObserverRecovery()
+start_delay = StartDelay()
+leader_lease = LeaderLease()
+
+
+async def recover_herd(herd: Herd | None, failure: Failure) -> None:
+    """Reboot only what is to blame - the scheduler keeps running.
+
+    Single observers recover in the background, only unattributable errors block the herd.
+    """
+    log.warning("  .. %s failure: %s", failure.kind.value, failure.message)
+    if herd is None:
+        return
+    if failure.kind == FailureKind.unknown:
+        log.info("  .. herd-reboot due to errors")
+        herd_cache.forget()
+        await herd_reboot(herd)
+    elif len(failure.observers) > 0:
+        herd_cache.forget(set(failure.observers))
+        observer_recovery.start(herd, set(failure.observers))
+
+
+post_processing_tasks: set[asyncio.Task] = set()
+
+
+async def post_process(xp_id: UUID, *, notify: bool = True) -> None:
+    """Analyze the results and inform the user.
+
+    Runs concurrently to the next experiment, as analyzing large files takes a while.
+    The user is informed even if the analysis failed.
+    """
+    try:
+        web_exp = await WebExperiment.get_by_id(xp_id)
+        if web_exp is None:
+            log.warning("XP-dataset not found (deleted?) for post-processing")
+            return
+        await web_exp.update_summary()
+        if len(web_exp.faulty_observers) > 0:
+            log.warning(
+                "XP %s has implausible results from %s",
+                xp_id,
+                ", ".join(web_exp.faulty_observers),
+            )
+    except Exception:  # noqa: BLE001
+        log.exception("Summarizing results of XP %s failed", xp_id)
+    if notify:
+        try:
+            await notify_user(xp_id)
+        except Exception:  # noqa: BLE001
+            log.exception("Informing the user about XP %s failed", xp_id)
+            return
+        log.info("  .. users were informed (XP %s)", xp_id)
+
+
+def launch_post_processing(xp_id: UUID, *, notify: bool = True) -> None:
+    task = asyncio.create_task(post_process(xp_id, notify=notify))
+    post_processing_tasks.add(task)  # keep reference, otherwise task could get collected
+    task.add_done_callback(post_processing_tasks.discard)
+
+
+async def finish_post_processing() -> None:
+    if len(post_processing_tasks) > 0:
+        log.info("Waiting for post-processing of %d experiment(s)", len(post_processing_tasks))
+        await asyncio.gather(*post_processing_tasks, return_exceptions=True)
 
 
 async def notify_user(xp_id: UUID) -> None:
@@ -430,7 +903,9 @@ async def update_status(herd: Herd | None = None, *, active: bool = False) -> No
         tb_.scheduler.targets_online = {}
         tb_.scheduler.targets_offline = {}
         tb = Testbed(name=server_config.testbed_name)
-        observers_online = {herd.hostnames.get(cnx.host) for cnx in herd.group_online}
+        observers_online = {
+            herd.hostnames.get(cnx.host) for cnx in herd.group_online
+        } - observer_recovery.quarantined
         observers_offline = set(herd.hostnames.values()) - observers_online
         for target_id in get_client().list_resource_ids("Target"):
             try:
@@ -487,9 +962,6 @@ async def scheduler(
     only_elevated: bool = False,
 ) -> None:
     _client = await db_client()
-    tb_ = await TestbedDB.get_one()
-    tb_.scheduler.activated = local_now()
-    await tb_.save_changes()
     wait_delay: int = 5
     update_delay: timedelta = timedelta(seconds=60)
 
@@ -508,20 +980,33 @@ async def scheduler(
             herd = Herd(inventory=inventory)
             stack.enter_context(herd)  # TODO: this is not async
             herd.disable_progress_bar()
+            handler_prev = signal.signal(signal.SIGTERM, shutdown_gracefully)
+        # standby keeps herd & fixtures ready, only the holder of the lease schedules
+        if not await leader_lease.wait(shutdown_event):
+            if handler_prev is not None:
+                signal.signal(signal.SIGTERM, handler_prev)
+            return
+        tb_ = await TestbedDB.get_one()
+        tb_.scheduler.activated = local_now()
+        await tb_.save_changes()
+        if herd is not None:
+            await resume_in_flight(herd)
+        if herd is not None and leader_lease.held:
             log.info("Run initial herd-cleanup")
             await herd_fetch_logs_and_clean_up(herd)
-            handler_prev = signal.signal(signal.SIGTERM, shutdown_gracefully)
-        # TODO: how to make sure there is only one scheduler? Singleton
         log.info("Checking experiment scheduling FIFO")
         await WebExperiment.reset_stuck_items()
         ts_update_next = local_now()
 
-        while not shutdown_event.is_set():
+        while not shutdown_event.is_set() and leader_lease.held:
             if local_now() > ts_update_next:
                 ts_update_next = local_now() + update_delay
                 await update_status(herd=herd, active=True)
 
-            next_experiment = await WebExperiment.get_next_scheduling(only_elevated=only_elevated)
+            next_experiment = await claim_runnable(
+                only_elevated=only_elevated,
+                available=await observers_available() if herd is not None else None,
+            )
             if next_experiment is None:
                 log.debug("... waiting %d s", wait_delay)
                 await asyncio.sleep(wait_delay)
@@ -530,16 +1015,13 @@ async def scheduler(
             log.debug("NOW scheduling experiment '%s'", next_experiment.experiment.name)
             await set_status_busy()
             try:
-                had_error = await run_web_experiment(
+                failure = await run_web_experiment(
                     next_experiment.id,
                     temp_path=temp_path,
                     herd=herd,
                 )
-            except RuntimeError:
-                had_error = True
-            except TimeoutError:
-                had_error = True
-            if had_error:
+            except (RuntimeError, TimeoutError) as xpt:
+                failure = Failure(kind=FailureKind.unknown, message=str(xpt))
                 web_exp = await WebExperiment.get_by_id(next_experiment.id)
                 if isinstance(web_exp, WebExperiment):
                     if web_exp.scheduler_error is None:
@@ -547,12 +1029,15 @@ async def scheduler(
                     if web_exp.finished_at is None:
                         web_exp.finished_at = local_now()
                     await web_exp.save_changes()
-
-                log.info("  .. herd-reboot due to errors (scheduler will quit / restart after)")
-                if herd is not None:
-                    await herd_reboot(herd)
-                return
-
+            if failure is not None:
+                await recover_herd(herd, failure)
+
+        if not leader_lease.held and not shutdown_event.is_set():
+            log.warning("Stopping scheduler as it lost the lease (restart -> standby)")
+        await leader_lease.release()
+        await finish_post_processing()
+        await observer_recovery.finish()
+        log.info("Readiness-probes: %s", probe_summary())
         if handler_prev is not None:
             signal.signal(signal.SIGTERM, handler_prev)
 
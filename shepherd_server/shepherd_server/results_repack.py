@@ -0,0 +1,249 @@
+"""Recompress result-files of finished experiments to save storage.
+
+Observers write with light compression to spare the CPU of the BeagleBone.
+The server rewrites these files with chunked gzip + shuffle (lossless).
+The content is verified before the original gets atomically replaced.
+The worker is throttled to not disturb running experiments:
+niced processes, limited IO-rate and pauses while the scheduler is busy.
+"""
+
+import asyncio
+import math
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from uuid import UUID
+
+import h5py
+import numpy as np
+from pydantic import BaseModel
+from pydantic import Field
+from shepherd_core.data_models.base.timezone import local_now
+
+from .api_experiments.models import ExperimentStats
+from .api_experiments.models import WebExperiment
+from .api_testbed.models_status import TestbedDB
+from .config import server_config
+from .instance_db import db_client
+from .logger import log
+
+CHUNK_BYTES = 2**24  # bounds RAM use per worker
+
+
+class _Throttle:
+    """Limit the IO-rate by sleeping after each chunk."""
+
+    def __init__(self, rate: int) -> None:
+        self.rate = rate
+        self.size = 0
+        self.ts_start = time.monotonic()
+
+    def account(self, size: int) -> None:
+        self.size += size
+        delay = self.size / self.rate - (time.monotonic() - self.ts_start)
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _values_equal(value1: object, value2: object) -> bool:
+    array1, array2 = np.asarray(value1), np.asarray(value2)
+    return array1.shape == array2.shape and np.array_equal(
+        array1, array2, equal_nan=array1.dtype.kind in "fc"
+    )
+
+
+def _attrs_equal(src: h5py.HLObject, dst: h5py.HLObject) -> bool:
+    if set(src.attrs.keys()) != set(dst.attrs.keys()):
+        return False
+    return all(_values_equal(src.attrs[key], dst.attrs[key]) for key in src.attrs)
+
+
+def _slice_step(dset: h5py.Dataset) -> int:
+    row_size = dset.dtype.itemsize * math.prod(dset.shape[1:])
+    return max(CHUNK_BYTES // max(row_size, 1), 1)
+
+
+def _copy_dataset(
+    src: h5py.Dataset, dst_group: h5py.Group, name: str, level: int, throttle: _Throttle
+) -> None:
+    if src.ndim == 0 or src.size == 0 or src.dtype.kind not in "biuf":
+        dst_group.copy(src, dst_group, name=name)  # scalars, strings, ... -> as is
+        return
+    dst = dst_group.create_dataset(
+        name,
+        shape=src.shape,
+        dtype=src.dtype,
+        maxshape=src.maxshape,
+        chunks=src.chunks or True,
+        compression="gzip",
+        compression_opts=level,
+        shuffle=True,
+    )
+    for key, value in src.attrs.items():
+        dst.attrs[key] = value
+    step = _slice_step(src)
+    for idx in range(0, src.shape[0], step):
+        data = src[idx : idx + step]
+        dst[idx : idx + step] = data
+        throttle.account(2 * data.nbytes)  # read + write
+
+
+def _copy_group(src: h5py.Group, dst: h5py.Group, level: int, throttle: _Throttle) -> None:
+    for key, value in src.attrs.items():
+        dst.attrs[key] = value
+    for name, item in src.items():
+        if isinstance(item, h5py.Group):
+            _copy_group(item, dst.create_group(name), level, throttle)
+        elif isinstance(item, h5py.Dataset):
+            _copy_dataset(item, dst, name, level, throttle)
+
+
+def _datasets_equal(src: h5py.Dataset, dst: h5py.Dataset, throttle: _Throttle) -> bool:
+    if src.shape != dst.shape or src.dtype != dst.dtype or not _attrs_equal(src, dst):
+        return False
+    if src.ndim == 0:
+        return _values_equal(src[()], dst[()])
+    step = _slice_step(src)
+    for idx in range(0, src.shape[0], step):
+        data = src[idx : idx + step]
+        if not _values_equal(data, dst[idx : idx + step]):
+            return False
+        throttle.account(2 * data.nbytes)
+    return True
+
+
+def _groups_equal(src: h5py.Group, dst: h5py.Group, throttle: _Throttle) -> bool:
+    if set(src.keys()) != set(dst.keys()) or not _attrs_equal(src, dst):
+        return False
+    for name, item in src.items():
+        other = dst[name]
+        if isinstance(item, h5py.Group):
+            if not isinstance(other, h5py.Group) or not _groups_equal(item, other, throttle):
+                return False
+        elif isinstance(item, h5py.Dataset) and (
+            not isinstance(other, h5py.Dataset) or not _datasets_equal(item, other, throttle)
+        ):
+            return False
+    return True
+
+
+def _is_repacked(h5file: h5py.File, level: int) -> bool:
+    dset = h5file["data"]["voltage"]
+    return dset.shuffle and dset.compression == "gzip" and int(dset.compression_opts or 0) >= level
+
+
+def repack_result(path: Path, level: int = 1, rate: int = 2**30) -> int:
+    """Rewrite a result-file with stronger compression - runs in a worker-process.
+
+    The original is only replaced if the content is equal and the new file is smaller.
+    Returns the amount of bytes saved.
+    """
+    path_temp = path.with_name(f".{path.name}.repack")
+    throttle = _Throttle(rate)
+    try:
+        with h5py.File(path, "r") as src:
+            if _is_repacked(src, level):
+                return 0
+            with h5py.File(path_temp, "w") as dst:
+                _copy_group(src, dst, level, throttle)
+            with h5py.File(path_temp, "r") as dst:
+                equivalent = _groups_equal(src, dst, throttle)
+        if not equivalent:
+            log.error("Repacked file differs from original -> discarded %s", path.as_posix())
+            path_temp.unlink()
+            return 0
+        size_pre = path.stat().st_size
+        size_post = path_temp.stat().st_size
+        if size_post >= size_pre:
+            path_temp.unlink()
+            return 0
+        shutil.copymode(path, path_temp)
+        path_temp.replace(path)  # atomic, open readers keep the old file
+    except (OSError, KeyError, TypeError, ValueError):
+        log.warning("Could not repack %s", path.as_posix())
+        path_temp.unlink(missing_ok=True)
+        return 0
+    log.debug("Repacked %s: %d -> %d MiB", path.as_posix(), size_pre >> 20, size_post >> 20)
+    return size_pre - size_post
+
+
+class _IdView(BaseModel):
+    id: UUID = Field(alias="_id")
+
+
+async def _get_candidates() -> list[UUID]:
+    """Finished experiments with results that were not repacked yet (oldest first)."""
+    views = (
+        await WebExperiment.find(
+            WebExperiment.finished_at < local_now() - server_config.repack_age_min,
+            WebExperiment.result_paths != None,  # noqa: E711 beanie cannot handle 'is not None'
+            WebExperiment.repacked_at == None,  # noqa: E711
+            projection_model=_IdView,
+        )
+        .sort(+WebExperiment.finished_at)
+        .to_list()
+    )
+    return [view.id for view in views]
+
+
+async def _wait_while_scheduler_is_busy() -> None:
+    announced = False
+    while (await TestbedDB.get_one()).scheduler.busy:
+        if not announced:
+            log.info("Scheduler is busy -> pausing repack")
+            announced = True
+        await asyncio.sleep(60)
+
+
+async def repack_experiment(xp_id: UUID, pool: ProcessPoolExecutor) -> int:
+    wxp = await WebExperiment.get_by_id(xp_id)
+    if wxp is None or wxp.result_paths is None:
+        return 0
+    loop = asyncio.get_running_loop()
+    savings = await asyncio.gather(
+        *[
+            loop.run_in_executor(
+                pool,
+                repack_result,
+                path,
+                server_config.repack_compression_level,
+                server_config.repack_rate_max,
+            )
+            for path in wxp.result_paths.values()
+            if path.is_file()
+        ]
+    )
+    # reload to avoid working on old data
+    wxp = await WebExperiment.get_by_id(xp_id)
+    if wxp is None:
+        return sum(savings)
+    wxp.repacked_at = local_now()
+    await wxp.update_size()  # also reflects on the quota of the user
+    await ExperimentStats.update_with(wxp)
+    log.info("Repacked XP %s, saved %d MiB", xp_id, sum(savings) >> 20)
+    return sum(savings)
+
+
+async def repack_results(*, follow: bool = False) -> int:
+    """Repack all finished experiments - optionally keep watching for new ones."""
+    await db_client()
+    saved = 0
+    with ProcessPoolExecutor(
+        max_workers=server_config.repack_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=os.nice,
+        initargs=(19,),
+    ) as pool:
+        # ⤷ spawned workers don't inherit the event-loop & db-client of this process
+        while True:
+            for xp_id in await _get_candidates():
+                await _wait_while_scheduler_is_busy()
+                saved += await repack_experiment(xp_id, pool)
+            if not follow:
+                break
+            await asyncio.sleep(10 * 60)
+    log.info("Repacking freed %d MiB", saved >> 20)
+    return saved
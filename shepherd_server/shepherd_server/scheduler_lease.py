@@ -0,0 +1,124 @@
+"""Leader-election between scheduler-instances via a lease in the database.
+
+Exactly one scheduler holds the lease and renews it periodically (heartbeat).
+Other instances wait as hot standby - herd-connections & fixtures are already set up -
+and take over within seconds once the lease expired (i.e. the active one died).
+Acquiring and renewing are atomic updates, so two instances can't both succeed.
+A failed renewal (i.e. database unreachable) is retried until the lease actually expires.
+"""
+
+import asyncio
+import os
+import socket
+from datetime import datetime
+from datetime import timedelta
+from uuid import uuid4
+
+from beanie.odm.queries.update import UpdateResponse
+from beanie.operators import Or
+from beanie.operators import Set
+from pymongo.errors import DuplicateKeyError
+from pymongo.errors import PyMongoError
+from shepherd_core.data_models.base.timezone import local_now
+
+from .api_testbed.models_status import SchedulerLease
+from .config import server_config
+from .logger import log
+
+LEASE_ID = "scheduler"
+
+
+class LeaderLease:
+    def __init__(self) -> None:
+        self.holder: str = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+        self.held: bool = False
+        self.expires_at: datetime | None = None
+        self.task: asyncio.Task | None = None
+
+    async def acquire(self) -> bool:
+        """Take or renew the lease - False if another scheduler holds it.
+
+        Database-errors are raised, as they don't tell who holds the lease.
+        """
+        ts_now = local_now()
+        try:
+            previous = await SchedulerLease.find_one(
+                SchedulerLease.id == LEASE_ID,
+                Or(SchedulerLease.holder == self.holder, SchedulerLease.expires_at < ts_now),
+            ).update(
+                Set(
+                    {
+                        SchedulerLease.holder: self.holder,
+                        SchedulerLease.expires_at: ts_now + server_config.scheduler_lease_ttl,
+                    }
+                ),
+                response_type=UpdateResponse.OLD_DOCUMENT,
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # filter did not match -> upsert collided with the valid lease of another holder
+            self.held = False
+            return False
+        if previous is None or previous.holder != self.holder:
+            log.info("Acquired scheduler-lease as %s", self.holder)
+            await SchedulerLease.find_one(SchedulerLease.id == LEASE_ID).update(
+                Set({SchedulerLease.acquired_at: ts_now})
+            )
+        self.held = True
+        self.expires_at = ts_now + server_config.scheduler_lease_ttl
+        return True
+
+    async def try_acquire(self, timeout: float) -> bool:
+        """Like acquire(), but an unreachable database only counts as failed attempt."""
+        try:
+            return await asyncio.wait_for(self.acquire(), timeout=timeout)
+        except TimeoutError:
+            log.warning("Timeout while accessing scheduler-lease")
+        except PyMongoError as xcp:
+            log.warning("Failed to access scheduler-lease: %s", xcp)
+        return False
+
+    async def wait(self, stop: asyncio.Event) -> bool:
+        """Stay in standby till the lease is acquired - False if stopped before."""
+        interval = server_config.scheduler_lease_ttl.total_seconds() / 3
+        standby = False
+        while not await self.try_acquire(timeout=interval):
+            if not standby:
+                log.info("Standby - another scheduler holds the lease")
+                standby = True
+            if stop.is_set():
+                return False
+            await asyncio.sleep(interval)
+        self.task = asyncio.create_task(self._heartbeat())
+        return True
+
+    async def _heartbeat(self) -> None:
+        ttl_s = server_config.scheduler_lease_ttl.total_seconds()
+        timeout = ttl_s / 6
+        delay = ttl_s / 3
+        while self.held:
+            await asyncio.sleep(delay)
+            if await self.try_acquire(timeout=timeout):
+                delay = ttl_s / 3
+                continue
+            # retry faster, but give up before the lease expires (another scheduler may take over)
+            delay = ttl_s / 10
+            ts_last_try = local_now() + timedelta(seconds=delay + timeout)
+            if self.held and self.expires_at is not None and ts_last_try < self.expires_at:
+                log.warning("Renewing scheduler-lease failed - retrying in %.0f s", delay)
+                continue
+            self.held = False
+            log.error("Lost scheduler-lease - another scheduler might take over")
+
+    async def release(self) -> None:
+        """Hand over immediately (i.e. on graceful shutdown)."""
+        if self.task is not None:
+            self.task.cancel()
+        if self.held:
+            self.held = False
+            try:
+                await SchedulerLease.find_one(
+                    SchedulerLease.id == LEASE_ID, SchedulerLease.holder == self.holder
+                ).update(Set({SchedulerLease.expires_at: local_now()}))
+            except PyMongoError as xcp:
+                log.warning("Failed to release scheduler-lease (expires on its own): %s", xcp)
@@ -0,0 +1,244 @@
+"""Discrete-event simulation of the scheduler to compare scheduling-policies.
+
+A workload (synthetic or recorded from the database) is replayed on a virtual clock,
+so hours of testbed-time are evaluated in milliseconds.
+Each job occupies its observers for preparation + runtime + teardown
+(+ a reboot if it fails). Exclusive policies block the whole testbed per job
+(like the current scheduler), others start jobs on disjoint sets of observers.
+Failures are drawn once per workload, so all policies see identical jobs.
+"""
+
+import heapq
+import json
+import random
+from collections.abc import Callable
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+from pydantic import BaseModel
+from pydantic import ConfigDict
+from pydantic import PositiveFloat
+from pydantic import PositiveInt
+
+from .api_accounts.models import User
+from .api_accounts.models import UserRole
+from .api_experiments.models import WebExperiment
+from .logger import log
+
+
+class SimJob(BaseModel):
+    id: int
+    owner: str
+    elevated: bool = False
+    arrival_s: float
+    """Time of scheduling, relative to the start of the workload."""
+    duration_s: float
+    observers: list[str]
+    prep_s: float = 111
+    teardown_s: float = 21
+    # ⤷ defaults are measured overheads (see performance.md)
+    fails: bool = False
+
+
+class WorkloadConfig(BaseModel):
+    """Parameters of a synthetic workload."""
+
+    jobs_n: PositiveInt = 200
+    users_n: PositiveInt = 10
+    elevated_users_n: int = 1
+    observers_n: PositiveInt = 20
+    observers_per_job: tuple[PositiveInt, PositiveInt] = (1, 20)
+    arrival_interval_s: PositiveFloat = 30 * 60
+    # ⤷ mean of exponential inter-arrival times
+    duration_s: tuple[PositiveFloat, PositiveFloat] = (60, 60 * 60)
+    prep_s: PositiveFloat = 111
+    teardown_s: PositiveFloat = 21
+    failure_rate: float = 0.05
+    seed: int = 0
+
+
+class SimResult(BaseModel):
+    policy: str
+    jobs_n: int
+    failed_n: int
+    makespan_s: float
+    utilization: float
+    """Share of observer-time that was used by runtime of experiments."""
+    wait_mean_s: float
+    wait_p50_s: float
+    wait_p90_s: float
+    wait_p99_s: float
+    wait_max_s: float
+
+    def __str__(self) -> str:
+        return (
+            f"{self.policy}: makespan {timedelta(seconds=round(self.makespan_s))}, "
+            f"utilization {100 * self.utilization:.1f} %, wait p50 / p90 / p99 / max = "
+            f"{self.wait_p50_s / 60:.0f} / {self.wait_p90_s / 60:.0f} / "
+            f"{self.wait_p99_s / 60:.0f} / {self.wait_max_s / 60:.0f} min"
+        )
+
+
+class Policy(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str
+    key: Callable[[SimJob, dict[str, float]], tuple]
+    """Ordering of the queue, gets the job and the consumed runtime per owner."""
+    exclusive: bool = True
+    """One job at a time on the whole testbed (otherwise on disjoint observers)."""
+
+
+POLICIES: dict[str, Policy] = {
+    policy.name: policy
+    for policy in [
+        Policy(name="fifo", key=lambda job, _: (job.arrival_s, job.id)),
+        Policy(name="elevated_first", key=lambda job, _: (not job.elevated, job.arrival_s)),
+        Policy(name="shortest_first", key=lambda job, _: (job.duration_s, job.arrival_s)),
+        Policy(name="fair_share", key=lambda job, usage: (usage.get(job.owner, 0), job.arrival_s)),
+        Policy(name="fifo_disjoint", key=lambda job, _: (job.arrival_s, job.id), exclusive=False),
+    ]
+}
+# ⤷ fifo mirrors WebExperiment.get_next_scheduling(), elevated_first its only_elevated-mode
+
+
+def synthetic_workload(config: WorkloadConfig) -> list[SimJob]:
+    rng = random.Random(config.seed)  # noqa: S311, no cryptography
+    observers = [f"sheep{index}" for index in range(config.observers_n)]
+    jobs = []
+    arrival_s = 0.0
+    for index in range(config.jobs_n):
+        arrival_s += rng.expovariate(1 / config.arrival_interval_s)
+        user = rng.randrange(config.users_n)
+        count = min(rng.randint(*config.observers_per_job), config.observers_n)
+        jobs.append(
+            SimJob(
+                id=index,
+                owner=f"user{user}",
+                elevated=user < config.elevated_users_n,
+                arrival_s=arrival_s,
+                duration_s=rng.uniform(*config.duration_s),
+                observers=sorted(rng.sample(observers, count)),
+                prep_s=config.prep_s,
+                teardown_s=config.teardown_s,
+                fails=rng.random() < config.failure_rate,
+            )
+        )
+    return jobs
+
+
+async def record_workload(since: datetime) -> list[SimJob]:
+    """Derive a workload from finished experiments - including measured overheads."""
+    wxps = (
+        await WebExperiment.find(
+            WebExperiment.finished_at > since,
+            WebExperiment.requested_execution_at != None,  # noqa: E711 beanie cannot handle 'is not None'
+            fetch_links=True,
+        )
+        .sort(+WebExperiment.requested_execution_at)
+        .to_list()
+    )
+    jobs = []
+    ts_ref = None
+    for wxp in wxps:
+        if wxp.started_at is None or wxp.executed_at is None or wxp.finished_at is None:
+            continue  # skipped or interrupted early
+        ts_ref = ts_ref or wxp.requested_execution_at
+        duration = wxp.experiment.duration or (wxp.finished_at - wxp.executed_at)
+        owner = wxp.owner if isinstance(wxp.owner, User) else None
+        jobs.append(
+            SimJob(
+                id=len(jobs),
+                owner=str(owner.email) if owner else "unknown",
+                elevated=owner is not None and owner.role in {UserRole.admin, UserRole.elevated},
+                arrival_s=(wxp.requested_execution_at - ts_ref).total_seconds(),
+                duration_s=duration.total_seconds(),
+                observers=wxp.observers_requested,
+                prep_s=max((wxp.executed_at - wxp.started_at).total_seconds(), 0),
+                teardown_s=max((wxp.finished_at - wxp.executed_at - duration).total_seconds(), 0),
+                fails=wxp.had_execution_errors,
+            )
+        )
+    log.info("Recorded %d of %d experiments as workload", len(jobs), len(wxps))
+    return jobs
+
+
+def save_workload(jobs: list[SimJob], path: Path) -> None:
+    path.write_text(json.dumps([job.model_dump(mode="json") for job in jobs], indent=1))
+
+
+def load_workload(path: Path) -> list[SimJob]:
+    return [SimJob.model_validate(item) for item in json.loads(path.read_text())]
+
+
+def simulate(jobs: list[SimJob], policy: Policy, reboot_s: float = 8 * 60) -> SimResult:
+    """Replay the workload on a virtual clock.
+
+    Events are arrivals and completions, the queue is re-evaluated after each of them.
+    A failed job additionally blocks its observers for the reboot.
+    """
+    if len(jobs) == 0:
+        raise ValueError("Workload contains no jobs")
+    observers_all = {name for job in jobs for name in job.observers}
+    arrivals = sorted(jobs, key=lambda job: job.arrival_s)
+    events: list[tuple[float, int, list[str]]] = []  # completion-time, id, observers
+    busy: set[str] = set()
+    queue: list[SimJob] = []
+    usage: dict[str, float] = {}
+    waits: list[float] = []
+    used_s = 0.0
+    now = 0.0
+    idx_arrival = 0
+    while idx_arrival < len(arrivals) or len(queue) > 0 or len(events) > 0:
+        # advance clock to next event (arrivals before completions at equal time)
+        ts_arrival = arrivals[idx_arrival].arrival_s if idx_arrival < len(arrivals) else None
+        if ts_arrival is not None and (len(events) == 0 or ts_arrival <= events[0][0]):
+            now = ts_arrival
+            queue.append(arrivals[idx_arrival])
+            idx_arrival += 1
+        elif len(events) > 0:
+            now, _, observers = heapq.heappop(events)
+            busy.difference_update(observers)
+        else:
+            break
+
+        # dispatch
+        for job in sorted(queue, key=lambda item: policy.key(item, usage)):
+            needed = observers_all if policy.exclusive else set(job.observers)
+            if len(busy & needed) > 0:
+                if policy.exclusive:
+                    break
+                continue  # backfill with later jobs
+            queue.remove(job)
+            busy.update(needed)
+            waits.append(now - job.arrival_s)
+            occupied_s = job.prep_s + job.duration_s + job.teardown_s
+            if job.fails:
+                occupied_s += reboot_s
+            heapq.heappush(events, (now + occupied_s, job.id, sorted(needed)))
+            usage[job.owner] = usage.get(job.owner, 0) + job.duration_s
+            used_s += job.duration_s * len(job.observers)
+
+    makespan_s = now - arrivals[0].arrival_s
+    waits_arr = np.asarray(waits)
+    return SimResult(
+        policy=policy.name,
+        jobs_n=len(jobs),
+        failed_n=sum(job.fails for job in jobs),
+        makespan_s=makespan_s,
+        utilization=used_s / (len(observers_all) * makespan_s) if makespan_s > 0 else 0,
+        wait_mean_s=float(waits_arr.mean()),
+        wait_p50_s=float(np.percentile(waits_arr, 50)),
+        wait_p90_s=float(np.percentile(waits_arr, 90)),
+        wait_p99_s=float(np.percentile(waits_arr, 99)),
+        wait_max_s=float(waits_arr.max()),
+    )
+
+
+def compare_policies(jobs: list[SimJob], policies: list[str] | None = None) -> list[SimResult]:
+    results = [simulate(jobs, POLICIES[name]) for name in policies or POLICIES]
+    for result in results:
+        log.info("  %s", result)
+    return results
@@ -1,3 +1,5 @@
+import io
+import tarfile
 from datetime import datetime
 from datetime import timedelta
 from pathlib import Path
@@ -142,7 +144,7 @@ def test_create_experiment_duration_with_valid_quota(
         assert response.status_code == 200
 
 
-def test_create_experiment_only_fifo_scheduler(
+def test_create_reservation_needs_lead_time(
     client: UserTestClient,
     sample_target_config: sdm.TargetConfig,
 ) -> None:
@@ -193,6 +195,34 @@ def test_create_experiment_with_unconstrained_path(
         assert response.status_code >= 400  # expect 403
 
 
+def test_create_experiments_in_batch(
+    client: UserTestClient,
+    sample_experiment: sdm.Experiment,
+) -> None:
+    too_long = sample_experiment.model_copy(
+        update={"duration": server_config.quota_default_duration + timedelta(seconds=5)}
+    )
+    batch = {
+        "experiments": [
+            sample_experiment.model_dump(mode="json"),
+            too_long.model_dump(mode="json"),
+            sample_experiment.model_dump(mode="json"),
+        ],
+        "schedule": True,
+    }
+    with client.authenticate_user_1():
+        response = client.post("/experiments/batch", json=batch)
+        assert response.status_code == 200
+        items = response.json()
+        assert len(items) == 3
+        assert items[1]["id"] is None
+        assert items[1]["error"] is not None
+        for item in (items[0], items[2]):
+            assert item["scheduled"]
+            response = client.get(f"/experiments/{item['id']}/state")
+            assert response.json() == "scheduled"
+
+
 def test_list_experiments_is_authenticated(client: TestClient) -> None:
     response = client.get("/experiments")
     assert response.status_code == 401
@@ -348,20 +378,123 @@ def test_get_all_experiments_shows_all(
     assert len_a2 >= len_u1
 
 
-# TODO: schedule idempotency
-
-
 def test_schedule_experiment(client: UserTestClient, created_experiment_id: str) -> None:
     with client.authenticate_user_1():
         response = client.post(f"/experiments/{created_experiment_id}/schedule")
         assert response.status_code == 204
         response = client.get(f"/experiments/{created_experiment_id}/state")
         assert response.json() == "scheduled"
+        response = client.get(f"/experiments/{created_experiment_id}/awaited")
+        assert response.json() == []
+
+
+def test_schedule_experiment_is_idempotent(
+    client: UserTestClient, created_experiment_id: str
+) -> None:
+    with client.authenticate_user_1():
+        response = client.post(f"/experiments/{created_experiment_id}/schedule")
+        assert response.status_code == 204
+        response = client.post(f"/experiments/{created_experiment_id}/schedule")
+        assert response.status_code == 409
+
+
+def test_schedule_experiment_is_private_to_owner(
+    client: UserTestClient, created_experiment_id: str
+) -> None:
+    with client.authenticate_user_2():
+        response = client.post(f"/experiments/{created_experiment_id}/schedule")
+        assert response.status_code == 403
+    with client.authenticate_user_1():
+        response = client.get(f"/experiments/{created_experiment_id}/state")
+        assert response.json() == "created"
 
 
 # TODO: schedule when quota is full - 3 kinds
 
 
+def _reservation(sample_target_config: sdm.TargetConfig, start_in: timedelta) -> dict:
+    xp = sdm.Experiment(
+        name="test-reservation",
+        time_start=datetime.now(tz=local_tz()) + start_in,
+        duration=30,
+        target_configs=[sample_target_config],
+    )
+    return xp.model_dump(mode="json")
+
+
+def test_reservation_conflicts_are_rejected(
+    client: UserTestClient,
+    sample_target_config: sdm.TargetConfig,
+) -> None:
+    with client.authenticate_user_1():
+        response = client.post(
+            "/experiments", json=_reservation(sample_target_config, timedelta(hours=1))
+        )
+        assert response.status_code == 200
+        xp_id = response.json()
+        response = client.post(f"/experiments/{xp_id}/schedule")
+        assert response.status_code == 204
+        response = client.get("/experiments/reservations")
+        assert response.status_code == 200
+        assert xp_id in [slot["experiment_id"] for slot in response.json()]
+
+    with client.authenticate_user_2():
+        response = client.post(
+            "/experiments",
+            json=_reservation(sample_target_config, timedelta(hours=1, minutes=5)),
+        )
+        assert response.status_code == 200
+        xp_id2 = response.json()
+        response = client.post(f"/experiments/{xp_id2}/schedule")
+        assert response.status_code == 409
+        response = client.get("/experiments/reservations")
+        assert all(slot["experiment_id"] is None for slot in response.json())
+
+    with client.authenticate_user_1():
+        response = client.post(f"/experiments/{xp_id}/cancel")
+        assert response.status_code == 204
+    with client.authenticate_user_2():
+        response = client.post(f"/experiments/{xp_id2}/schedule")
+        assert response.status_code == 204
+
+
+def test_cancel_scheduled_experiment(client: UserTestClient, scheduled_experiment_id: str) -> None:
+    with client.authenticate_user_1():
+        response = client.post(f"/experiments/{scheduled_experiment_id}/cancel")
+        assert response.status_code == 204
+        response = client.get(f"/experiments/{scheduled_experiment_id}/state")
+        assert response.json() == "created"
+        response = client.post(f"/experiments/{scheduled_experiment_id}/cancel")
+        assert response.status_code == 409
+
+
+def test_cancel_running_experiment(client: UserTestClient, running_experiment_id: str) -> None:
+    with client.authenticate_user_1():
+        response = client.post(f"/experiments/{running_experiment_id}/cancel")
+        assert response.status_code == 202
+        response = client.post(f"/experiments/{running_experiment_id}/cancel")
+        assert response.status_code == 409
+
+
+def test_cancel_finished_experiment_fails(
+    client: UserTestClient, finished_experiment_id: str
+) -> None:
+    with client.authenticate_user_1():
+        response = client.post(f"/experiments/{finished_experiment_id}/cancel")
+        assert response.status_code == 409
+
+
+def test_cancel_experiment_is_private_to_owner(
+    client: UserTestClient, scheduled_experiment_id: str
+) -> None:
+    with client.authenticate_user_2():
+        response = client.post(f"/experiments/{scheduled_experiment_id}/cancel")
+        assert response.status_code == 403
+    with client.authenticate_user_1():
+        response = client.get(f"/experiments/{scheduled_experiment_id}/state")
+        assert response.json() == "scheduled"
+
+
 def test_state_of_fresh_experiments(client: UserTestClient, created_experiment_id: str) -> None:
     with client.authenticate_user_1():
         response = client.get(f"/experiments/{created_experiment_id}/state")
@@ -481,3 +614,102 @@ def test_download_sheep_sends_file(client: UserTestClient, finished_experiment_i
     assert response.status_code == 200
     assert response.headers["content-type"] == "application/x-hdf5"
     assert int(response.headers["content-length"]) > 100
+
+
+def test_download_is_private_to_owner(client: UserTestClient, finished_experiment_id: str) -> None:
+    with client.authenticate_user_2():
+        response = client.get(f"/experiments/{finished_experiment_id}/download")
+        assert response.status_code == 403
+        response = client.get(f"/experiments/{finished_experiment_id}/download/unit_testing_sheep")
+        assert response.status_code == 403
+
+    with client.authenticate_admin():
+        response = client.get(f"/experiments/{finished_experiment_id}/download")
+        assert response.status_code == 200
+
+
+def test_download_bundle_contains_all(client: UserTestClient, finished_experiment_id: str) -> None:
+    with client.authenticate_user_1():
+        response = client.get(f"/experiments/{finished_experiment_id}/bundle")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-tar"
+    assert int(response.headers["content-length"]) == len(response.content)
+    with tarfile.open(fileobj=io.BytesIO(response.content)) as tar:
+        names = tar.getnames()
+    assert "experiment_config.yaml" in names
+    assert "unit_testing_sheep.h5" in names
+
+
+def test_download_bundle_rejects_incorrect_sheeps(
+    client: UserTestClient, finished_experiment_id: str
+) -> None:
+    with client.authenticate_user_1():
+        response = client.get(
+            f"/experiments/{finished_experiment_id}/bundle", params={"observers": ["invalid"]}
+        )
+    assert response.status_code == 404
+
+
+def test_download_bundle_rejected_for_unfinished_experiments(
+    client: UserTestClient, running_experiment_id: str
+) -> None:
+    with client.authenticate_user_1():
+        response = client.get(f"/experiments/{running_experiment_id}/bundle")
+    assert response.status_code == 409
+
+
+def test_preview_of_empty_recording_fails(
+    client: UserTestClient, finished_experiment_id: str
+) -> None:
+    with client.authenticate_user_1():
+        response = client.get(f"/experiments/{finished_experiment_id}/preview/unit_testing_sheep")
+    assert response.status_code == 400
+
+
+def test_preview_rejects_incorrect_sheeps(
+    client: UserTestClient, finished_experiment_id: str
+) -> None:
+    with client.authenticate_user_1():
+        response = client.get(f"/experiments/{finished_experiment_id}/preview/invalid")
+    assert response.status_code == 404
+
+
+def test_preview_rejected_for_unfinished_experiments(
+    client: UserTestClient, running_experiment_id: str
+) -> None:
+    with client.authenticate_user_1():
+        response = client.get(f"/experiments/{running_experiment_id}/preview/unit_testing_sheep")
+    assert response.status_code == 409
+
+
+def test_preview_of_other_user_is_forbidden(
+    client: UserTestClient, finished_experiment_id: str
+) -> None:
+    with client.authenticate_user_2():
+        response = client.get(f"/experiments/{finished_experiment_id}/preview/unit_testing_sheep")
+    assert response.status_code == 403
+
+
+def test_export_of_finished_experiment(client: UserTestClient, finished_experiment_id: str) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    with client.authenticate_user_1():
+        response = client.get(f"/experiments/{finished_experiment_id}/export/unit_testing_sheep")
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column_names == ["time", "voltage", "current"]
+
+
+def test_export_rejects_incorrect_sheeps(
+    client: UserTestClient, finished_experiment_id: str
+) -> None:
+    with client.authenticate_user_1():
+        response = client.get(f"/experiments/{finished_experiment_id}/export/invalid")
+    assert response.status_code == 404
+
+
+def test_export_rejected_for_unfinished_experiments(
+    client: UserTestClient, running_experiment_id: str
+) -> None:
+    with client.authenticate_user_1():
+        response = client.get(f"/experiments/{running_experiment_id}/export/unit_testing_sheep")
+    assert response.status_code == 409
@@ -0,0 +1,41 @@
+from shepherd_core import local_now
+from shepherd_server.benchmark_api import BenchmarkReport
+from shepherd_server.benchmark_api import EndpointStats
+from shepherd_server.benchmark_api import compare_to_baseline
+from shepherd_server.benchmark_api import evaluate
+
+
+def _report(p50_ms: float, p99_ms: float) -> BenchmarkReport:
+    return BenchmarkReport(
+        users_n=10,
+        experiments_n=100,
+        output_mib=400,
+        created_at=local_now(),
+        endpoints={"list": EndpointStats(requests=100, p50_ms=p50_ms, p99_ms=p99_ms, rps=100)},
+    )
+
+
+def test_benchmark_evaluate() -> None:
+    stats = evaluate([0.001] * 98 + [0.1, 0.1])
+    assert stats.requests == 100
+    assert stats.p50_ms == 1.0
+    assert stats.p99_ms > 50
+    assert 330 < stats.rps < 340
+
+
+def test_benchmark_without_regression() -> None:
+    baseline = _report(10, 20)
+    assert compare_to_baseline(_report(10, 20), baseline) == []
+    assert compare_to_baseline(_report(12, 24), baseline) == []
+    assert compare_to_baseline(_report(1, 2), baseline) == []
+
+
+def test_benchmark_detects_regression() -> None:
+    regressions = compare_to_baseline(_report(20, 21), _report(10, 20))
+    assert len(regressions) == 1
+    assert regressions[0].startswith("list.p50_ms")
+
+
+def test_benchmark_ignores_noise_of_fast_endpoints() -> None:
+    # +100 % but below the absolute slack
+    assert compare_to_baseline(_report(0.4, 0.8), _report(0.2, 0.4)) == []
@@ -0,0 +1,53 @@
+import pytest
+from shepherd_core.data_models.experiment import Experiment
+from shepherd_server.api_campaigns.models import CampaignRequest
+from shepherd_server.api_campaigns.models import campaign_state
+from shepherd_server.api_campaigns.models import expand_grid
+from shepherd_server.config import server_config
+
+
+def test_grid_expands_all_combinations(sample_experiment: Experiment) -> None:
+    request = CampaignRequest(
+        name="sweep",
+        template=sample_experiment,
+        parameters={
+            "duration": [10, 20, 30],
+            "target_configs.0.energy_env.name": [
+                "synthetic_static_3000mV_50mA",
+                "synthetic_static_2000mV_50mA",
+            ],
+        },
+    )
+    variants = expand_grid(request)
+    assert len(variants) == 6
+    assert len({xp.name for _, xp in variants}) == 6
+    assignment, experiment = variants[-1]
+    assert assignment["duration"] == 30
+    assert experiment.duration.total_seconds() == 30
+    assert experiment.target_configs[0].energy_env.name == "synthetic_static_2000mV_50mA"
+
+
+def test_grid_rejects_unknown_paths(sample_experiment: Experiment) -> None:
+    request = CampaignRequest(
+        name="sweep", template=sample_experiment, parameters={"duratoin": [10, 20]}
+    )
+    with pytest.raises(ValueError, match="Variant 0"):
+        expand_grid(request)
+
+
+def test_grid_is_limited(sample_experiment: Experiment) -> None:
+    request = CampaignRequest(
+        name="sweep",
+        template=sample_experiment,
+        parameters={"duration": list(range(1, server_config.campaign_variants_max + 2))},
+    )
+    with pytest.raises(ValueError, match="variants"):
+        expand_grid(request)
+
+
+def test_campaign_state_summary() -> None:
+    assert campaign_state(["created", "created"]) == "created"
+    assert campaign_state(["finished", "scheduled"]) == "scheduled"
+    assert campaign_state(["finished", "running", "waiting"]) == "running"
+    assert campaign_state(["finished", "failed", "deleted"]) == "finished"
+    assert campaign_state(["finished", "created"]) == "partial"
@@ -0,0 +1,31 @@
+import io
+import tarfile
+from pathlib import Path
+
+from shepherd_core.data_models.experiment import Experiment
+from shepherd_server.api_experiments.utils_bundle import BundleMember
+from shepherd_server.api_experiments.utils_bundle import TarBundle
+from shepherd_server.api_experiments.utils_bundle import model_to_yaml
+
+
+async def test_tar_bundle_is_readable(tmp_path: Path, sample_experiment: Experiment) -> None:
+    path_big = tmp_path / "sheep0.h5"
+    path_big.write_bytes(bytes(range(256)) * 10_000)
+    path_odd = tmp_path / "sheep0.log.gz"
+    path_odd.write_bytes(b"x" * 777)
+    bundle = TarBundle(
+        [
+            BundleMember(name="experiment_config.yaml", data=model_to_yaml(sample_experiment)),
+            BundleMember(name="sheep0.h5", path=path_big),
+            BundleMember(name="logs/sheep0.log.gz", path=path_odd),
+        ]
+    )
+    data = b"".join([chunk async for chunk in bundle.stream()])
+    assert len(data) == bundle.size
+
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        assert tar.getnames() == ["experiment_config.yaml", "sheep0.h5", "logs/sheep0.log.gz"]
+        assert tar.extractfile("sheep0.h5").read() == path_big.read_bytes()
+        assert tar.extractfile("logs/sheep0.log.gz").read() == path_odd.read_bytes()
+        config = tar.extractfile("experiment_config.yaml").read().decode()
+    assert "test-experiment" in config
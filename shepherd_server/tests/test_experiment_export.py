@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from shepherd_core.reader import Reader as CoreReader
+from shepherd_core.writer import Writer as CoreWriter
+from shepherd_server.api_experiments.utils_export import export_parquet
+from shepherd_server.api_experiments.utils_export import get_export
+from shepherd_server.cli import cli
+from typer.testing import CliRunner
+
+pq = pytest.importorskip("pyarrow.parquet")
+ds = pytest.importorskip("pyarrow.dataset")
+
+
+def write_recording(path: Path, hostname: str) -> Path:
+    samples_n = 150_000
+    with CoreWriter(path) as writer:
+        writer.store_hostname(hostname)
+        writer.append_iv_data_si(
+            timestamp=1_700_000_000.0,
+            voltage=np.linspace(0, 3, samples_n),
+            current=np.full(samples_n, 1e-3),
+        )
+    return path
+
+
+def test_export_matches_recording(tmp_path: Path) -> None:
+    path = write_recording(tmp_path / "sheep0.h5", "sheep0")
+    path_file = export_parquet(path, tmp_path / "export")
+    assert path_file == tmp_path / "export" / "observer=sheep0" / "data.parquet"
+
+    table = pq.read_table(path_file)
+    assert table.column_names == ["time", "voltage", "current"]
+    with CoreReader(path, verbose=False) as reader:
+        assert table.num_rows == reader.samples_n
+        _, voltage, current = next(reader.read(n_samples_per_chunk=reader.samples_n))
+        assert np.array_equal(table["voltage"].to_numpy(), voltage)
+        assert np.array_equal(table["current"].to_numpy(), current)
+        time_ns = table["time"].cast("int64").to_numpy()
+        assert np.array_equal(time_ns, reader.ds_time[:].astype(np.int64))
+    assert table.schema.metadata[b"observer"] == b"sheep0"
+
+
+def test_export_is_cached(tmp_path: Path) -> None:
+    path = write_recording(tmp_path / "sheep0.h5", "sheep0")
+    path_file = get_export(path, "sheep0")
+    mtime = path_file.stat().st_mtime_ns
+    assert get_export(path, "sheep0") == path_file
+    assert path_file.stat().st_mtime_ns == mtime
+
+
+def test_cli_export_is_partitioned(tmp_path: Path) -> None:
+    paths = [write_recording(tmp_path / f"rec{idx}.h5", f"sheep{idx}") for idx in range(2)]
+    res = CliRunner().invoke(
+        app=cli,
+        args=["export-parquet", *[p.as_posix() for p in paths], "--output", str(tmp_path / "out")],
+    )
+    assert res.exit_code == 0
+    dataset = ds.dataset(tmp_path / "out", partitioning="hive")
+    table = dataset.to_table(filter=ds.field("observer") == "sheep1")
+    assert table.num_rows == 150_000
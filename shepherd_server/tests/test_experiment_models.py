@@ -1,9 +1,17 @@
 import datetime
+import gzip
+from pathlib import Path
+from uuid import uuid4
 
+import pytest
 from shepherd_core.data_models.base.timezone import local_tz
 from shepherd_core.data_models.experiment import Experiment
 from shepherd_server.api_accounts.models import User
+from shepherd_server.api_experiments.models import ErrorData
+from shepherd_server.api_experiments.models import ReplyData
+from shepherd_server.api_experiments.models import StateData
 from shepherd_server.api_experiments.models import WebExperiment
+from shepherd_server.config import server_config
 
 
 async def test_get_next_scheduling(
@@ -49,3 +57,89 @@ async def test_get_next_scheduling(
 
     _next = await WebExperiment.get_next_scheduling()
     assert _next.id == one.id
+
+
+def test_reply_data_reads_streamed_log(tmp_path: Path) -> None:
+    path = tmp_path / "sheep0.log.gz"
+    for chunk in ["first\n", "", "second\n"]:
+        with gzip.open(path, "at", encoding="utf-8") as fd:
+            fd.write(chunk)
+    reply = ReplyData(exited=1, log_path=path)
+    assert reply.get_stdout() == "first\nsecond\n"
+
+    data = ErrorData(observers_requested=["sheep0"], observers_output={"sheep0": reply})
+    files = data.get_terminal_output(only_faulty=True)
+    assert len(files) == 1
+    assert "second" in files[0].file.getvalue()
+
+
+def test_reply_data_tolerates_missing_log(tmp_path: Path) -> None:
+    reply = ReplyData(exited=0, stdout="inline", log_path=tmp_path / "missing.log.gz")
+    assert reply.get_stdout() == "inline"
+
+
+def test_error_data_offloads_inline_logs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(server_config, "path_logs", tmp_path)
+    xp_id = uuid4()
+    data = ErrorData(
+        observers_requested=["sheep0"],
+        observers_output={"sheep0": ReplyData(exited=1, stdout="a" * 10_000, stderr="err")},
+        scheduler_log="scheduler says hi",
+    )
+    data.offload_logs(xp_id)
+    assert data.scheduler_log is None
+    assert data.observers_output["sheep0"].stdout == ""
+    assert len(data.model_dump_json()) < 1_000
+    assert data.get_scheduler_log() == "scheduler says hi"
+    assert data.observers_output["sheep0"].get_stdout() == "a" * 10_000
+    assert len(data.get_terminal_output()) == 2
+
+    data.delete_logs()
+    assert not (tmp_path / str(xp_id)).exists()
+
+
+async def test_claim_only_once(
+    sample_experiment: Experiment,
+    *,
+    database_for_tests: bool,
+) -> None:
+    assert database_for_tests
+    await WebExperiment.delete_all()
+    user = await User.by_email("user@test.com")
+    one = WebExperiment(experiment=sample_experiment, owner=user)
+    one.requested_execution_at = datetime.datetime(2000, 1, 1, tzinfo=local_tz())
+    await one.save()
+
+    claimed = await WebExperiment.claim(one.id)
+    assert claimed.id == one.id
+    assert claimed.started_at is not None
+    assert await WebExperiment.claim(one.id) is None
+
+
+def test_state_waiting_for_observers() -> None:
+    data = StateData(requested_execution_at=datetime.datetime.now(tz=local_tz()))
+    assert data.state == "scheduled"
+    data.observers_awaited = ["sheep03"]
+    assert data.state == "waiting"
+
+
+async def test_claim_clears_deferral(
+    sample_experiment: Experiment,
+    *,
+    database_for_tests: bool,
+) -> None:
+    assert database_for_tests
+    await WebExperiment.delete_all()
+    user = await User.by_email("user@test.com")
+    one = WebExperiment(experiment=sample_experiment, owner=user)
+    one.requested_execution_at = datetime.datetime(2000, 1, 1, tzinfo=local_tz())
+    await one.save()
+
+    await WebExperiment.defer(one.id, ["sheep03"])
+    deferred = await WebExperiment.get_by_id(one.id)
+    assert deferred.state == "waiting"
+    assert deferred.deferred_since is not None
+
+    claimed = await WebExperiment.claim(one.id)
+    assert claimed.observers_awaited == []
+    assert claimed.deferred_since is None
@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from shepherd_core.writer import Writer as CoreWriter
+from shepherd_server.api_experiments import utils_preview
+from shepherd_server.api_experiments.utils_preview import BinStats
+from shepherd_server.api_experiments.utils_preview import compute_preview
+from shepherd_server.api_experiments.utils_preview import get_preview
+from shepherd_server.api_experiments.utils_preview import preview_cache_path
+
+
+@pytest.fixture
+def recording(tmp_path: Path) -> Path:
+    path = tmp_path / "sheep0" / "recording.h5"
+    path.parent.mkdir()
+    samples_n = 250_000
+    with CoreWriter(path) as writer:
+        writer.append_iv_data_si(
+            timestamp=0.0,
+            voltage=np.linspace(0, 3, samples_n),
+            current=np.full(samples_n, 1e-3),
+        )
+    return path
+
+
+def test_bin_stats_handle_partial_bins() -> None:
+    stats = BinStats(bins_n=3)
+    values = np.arange(10, dtype=float)
+    stats.add(values[:3], offset=0, bin_n=4)  # chunk ends within a bin
+    stats.add(values[3:], offset=3, bin_n=4)
+    series = stats.to_series()
+    assert series.min == [0, 4, 8]
+    assert series.max == [3, 7, 9]
+    assert series.mean == [1.5, 5.5, 8.5]
+
+
+def test_preview_with_bins_wider_than_chunks(
+    recording: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(utils_preview, "CHUNK_SAMPLES_MAX", 2**10)
+    preview = compute_preview(recording, "sheep0", points=3)
+    assert len(preview.time_s) == 3
+    assert preview.voltage.min[0] == pytest.approx(0, abs=1e-3)
+    assert preview.voltage.max[-1] == pytest.approx(3, abs=1e-3)
+    assert preview.voltage.mean[1] == pytest.approx(1.5, abs=1e-2)
+    assert preview.current.mean[2] == pytest.approx(1e-3, rel=1e-2)
+
+
+def test_preview_of_whole_recording(recording: Path) -> None:
+    preview = compute_preview(recording, "sheep0", points=100)
+    assert len(preview.time_s) == 100
+    assert len(preview.voltage.mean) == 100
+    assert preview.duration_s == pytest.approx(2.5, rel=1e-3)
+    assert preview.voltage.min[0] == pytest.approx(0, abs=1e-3)
+    assert preview.voltage.max[-1] == pytest.approx(3, abs=1e-3)
+    assert preview.current.mean[50] == pytest.approx(1e-3, rel=1e-2)
+    assert all(
+        low <= avg <= high
+        for low, avg, high in zip(
+            preview.power.min, preview.power.mean, preview.power.max, strict=True
+        )
+    )
+
+
+def test_preview_of_window(recording: Path) -> None:
+    preview = compute_preview(recording, "sheep0", start_s=1, duration_s=0.5, points=7)
+    assert len(preview.time_s) == 7
+    assert preview.time_s[0] == pytest.approx(1, rel=1e-3)
+    assert preview.duration_s == pytest.approx(0.5, rel=1e-3)
+    assert preview.voltage.min[0] == pytest.approx(1.2, abs=1e-3)
+
+
+def test_preview_of_empty_window_fails(recording: Path) -> None:
+    with pytest.raises(ValueError, match="no samples"):
+        compute_preview(recording, "sheep0", start_s=10)
+
+
+def test_preview_is_cached(recording: Path) -> None:
+    preview = get_preview(recording, "sheep0", points=10)
+    path_cache = preview_cache_path(recording, 0, None, 10)
+    assert path_cache.is_file()
+    assert get_preview(recording, "sheep0", points=10) == preview
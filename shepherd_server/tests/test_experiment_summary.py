@@ -0,0 +1,76 @@
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+from shepherd_core.data_models.base.timezone import local_tz
+from shepherd_core.writer import Writer as CoreWriter
+from shepherd_server.api_experiments.models import StateData
+from shepherd_server.api_experiments.utils_summary import ObserverSummary
+from shepherd_server.api_experiments.utils_summary import summarize_result
+from shepherd_server.api_experiments.utils_summary import summarize_results
+
+
+def write_recording(path: Path, samples_n: int, *, time_jump: bool = False) -> Path:
+    with CoreWriter(path) as writer:
+        writer.store_hostname(path.stem)
+        half_n = samples_n // 2
+        for idx, offset_s in enumerate([0.0, 10.0 if time_jump else 0.0]):
+            writer.append_iv_data_si(
+                timestamp=offset_s + idx * half_n / 100_000,
+                voltage=np.full(half_n, 2.0),
+                current=np.full(half_n, 1e-3),
+            )
+    return path
+
+
+def test_summary_of_valid_recording(tmp_path: Path) -> None:
+    summary = summarize_result(write_recording(tmp_path / "sheep0.h5", 200_000))
+    assert summary.is_plausible
+    assert summary.samples_n == 200_000
+    assert summary.time_jumps_n == 0
+    assert summary.voltage_mean_v == pytest.approx(2.0, rel=1e-3)
+    assert summary.energy_ws == pytest.approx(2 * 2.0 * 1e-3, rel=1e-2)
+    assert "200000 samples" in str(summary)
+
+
+def test_summary_detects_time_jump(tmp_path: Path) -> None:
+    summary = summarize_result(write_recording(tmp_path / "sheep0.h5", 200_000, time_jump=True))
+    assert summary.time_jumps_n == 1
+    assert not summary.is_plausible
+
+
+def test_summary_of_corrupted_file(tmp_path: Path) -> None:
+    path = tmp_path / "sheep0.h5"
+    path.write_bytes(b"no hdf5")
+    summary = summarize_result(path)
+    assert not summary.readable
+    assert not summary.is_plausible
+
+
+async def test_summaries_of_several_observers(tmp_path: Path) -> None:
+    paths = {
+        "sheep0": write_recording(tmp_path / "sheep0.h5", 100_000),
+        "sheep1": write_recording(tmp_path / "sheep1.h5", 0),
+    }
+    summaries = await summarize_results(paths)
+    assert summaries["sheep0"].is_plausible
+    assert not summaries["sheep1"].is_plausible
+
+
+def test_implausible_data_marks_experiment_as_failed() -> None:
+    now = datetime.now(tz=local_tz())
+    data = StateData(
+        observers_requested=["sheep0", "sheep1"],
+        observers_online=["sheep0", "sheep1"],
+        observers_had_data={"sheep0": True, "sheep1": True},
+        observers_summary={
+            "sheep0": ObserverSummary(samples_n=10),
+            "sheep1": ObserverSummary(samples_n=0),
+        },
+        executed_at=now,
+        finished_at=now,
+    )
+    assert not data.had_execution_errors
+    assert data.faulty_observers == ["sheep1"]
+    assert data.state == "failed"
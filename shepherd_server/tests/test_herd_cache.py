@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+import pytest
+from shepherd_core.data_models import Experiment
+from shepherd_core.data_models.task import TestbedTasks
+from shepherd_core.data_models.testbed import Testbed
+from shepherd_server.config import server_config
+from shepherd_server.herd_cache import HerdCache
+from shepherd_server.herd_cache import firmware_fingerprint
+
+OBSERVER = "unit_testing_sheep"
+
+
+@pytest.fixture
+def tb_tasks(sample_experiment: Experiment) -> TestbedTasks:
+    return TestbedTasks.from_xp(sample_experiment, Testbed(name="unit_testing_testbed"))
+
+
+def test_fingerprint_ignores_output_path(tb_tasks: TestbedTasks) -> None:
+    ots = tb_tasks.observer_tasks[0]
+    fingerprint = firmware_fingerprint(ots.fw1_mod, ots.fw1_prog)
+    assert fingerprint is not None
+    prog_moved = ots.fw1_prog.model_copy(update={"firmware_file": "/tmp/other.hex"})
+    assert firmware_fingerprint(ots.fw1_mod, prog_moved) == fingerprint
+    mod_other = ots.fw1_mod.model_copy(update={"custom_id": 1234})
+    assert firmware_fingerprint(mod_other, ots.fw1_prog) != fingerprint
+    prog_other = ots.fw1_prog.model_copy(update={"voltage": 2.0})
+    assert firmware_fingerprint(ots.fw1_mod, prog_other) != fingerprint
+    assert firmware_fingerprint(None, ots.fw1_prog) is None
+
+
+def test_skip_programmed_target(tb_tasks: TestbedTasks) -> None:
+    cache = HerdCache()
+    tasks, pending = cache.strip_programmed(tb_tasks)
+    assert tasks.observer_tasks[0].fw1_prog is not None
+    assert (OBSERVER, 1) in pending
+    cache.store_programmed(pending, programmed={OBSERVER})
+
+    tasks, pending = cache.strip_programmed(tb_tasks)
+    assert tasks.observer_tasks[0].fw1_mod is None
+    assert tasks.observer_tasks[0].fw1_prog is None
+    assert len(pending) == 0
+
+    cache.forget({OBSERVER})
+    tasks, _ = cache.strip_programmed(tb_tasks)
+    assert tasks.observer_tasks[0].fw1_prog is not None
+
+
+def test_failed_programming_is_not_cached(tb_tasks: TestbedTasks) -> None:
+    cache = HerdCache()
+    _, pending = cache.strip_programmed(tb_tasks)
+    cache.store_programmed(pending, programmed=set())
+    tasks, _ = cache.strip_programmed(tb_tasks)
+    assert tasks.observer_tasks[0].fw1_prog is not None
+
+
+def test_cache_expires(tb_tasks: TestbedTasks, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = HerdCache()
+    _, pending = cache.strip_programmed(tb_tasks)
+    cache.store_programmed(pending, programmed={OBSERVER})
+    monkeypatch.setattr(server_config, "firmware_cache_age_max", timedelta(0))
+    tasks, _ = cache.strip_programmed(tb_tasks)
+    assert tasks.observer_tasks[0].fw1_prog is not None
+
+
+def test_check_interval(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = HerdCache()
+    assert cache.needs_check(OBSERVER)
+    cache.store_checked({OBSERVER})
+    assert not cache.needs_check(OBSERVER)
+    monkeypatch.setattr(server_config, "herd_check_interval", timedelta(0))
+    assert cache.needs_check(OBSERVER)
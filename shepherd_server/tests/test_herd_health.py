@@ -0,0 +1,55 @@
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from fabric import Result
+from shepherd_core import local_now
+from shepherd_server.config import server_config
+from shepherd_server.herd_health import HealthMonitor
+
+OBSERVERS = ["sheep0", "sheep1"]
+
+
+def _monitor(tmp_path: Path, started_ago: timedelta) -> HealthMonitor:
+    paths = {obs: Path(f"/var/shepherd/experiments/xp/{obs}.h5") for obs in OBSERVERS}
+    monitor = HealthMonitor(paths, ts_start=local_now() - started_ago, duration=timedelta(hours=8))
+    for obs, health in monitor.observers.items():
+        health.path = tmp_path / f"{obs}.h5"
+    return monitor
+
+
+def test_healthy_while_data_grows(tmp_path: Path) -> None:
+    monitor = _monitor(tmp_path, started_ago=timedelta(hours=1))
+    for obs in OBSERVERS:
+        (tmp_path / f"{obs}.h5").write_bytes(b"data")
+    monitor.update_files()
+    assert monitor.failed() == {}
+    assert monitor.abort_reason() is None
+
+
+def test_abort_without_data(tmp_path: Path) -> None:
+    monitor = _monitor(tmp_path, started_ago=timedelta(hours=1))
+    monitor.update_files()
+    assert set(monitor.failed()) == set(OBSERVERS)
+    monitor.update_logs(
+        {"sheep0": Result(connection=None, stdout="2026 ERROR - target not responding\n")}
+    )
+    assert monitor.observers["sheep0"].errors == ["2026 ERROR - target not responding"]
+    assert "2 of 2" in monitor.abort_reason()
+
+
+def test_grace_after_start(tmp_path: Path) -> None:
+    monitor = _monitor(tmp_path, started_ago=timedelta(seconds=10))
+    monitor.update_files()
+    assert monitor.failed() == {}
+
+
+def test_abort_fraction(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monitor = _monitor(tmp_path, started_ago=timedelta(minutes=30))
+    (tmp_path / "sheep1.h5").write_bytes(b"data")
+    monitor.update_files()
+    monitor.update_finished({"sheep0"})
+    assert monitor.failed() == {"sheep0": "service stopped early"}
+    assert monitor.abort_reason() is None
+    monkeypatch.setattr(server_config, "health_abort_fraction", 0.5)
+    assert monitor.abort_reason() is not None
@@ -0,0 +1,48 @@
+import socket
+from types import SimpleNamespace
+
+from shepherd_server.herd_readiness import herd_wait_inactive
+from shepherd_server.herd_readiness import port_open
+from shepherd_server.herd_readiness import probe_durations
+from shepherd_server.herd_readiness import probe_summary
+from shepherd_server.herd_readiness import probe_until
+
+
+def test_probe_returns_when_ready() -> None:
+    answers = iter([False, False, True])
+    assert probe_until("unit ready", lambda: next(answers), timeout=5, interval=0.01)
+    assert probe_durations["unit ready"][-1] < 1
+    assert "unit ready" in probe_summary()
+
+
+def test_probe_times_out() -> None:
+    assert not probe_until("unit never", lambda: False, timeout=0.05, interval=0.01)
+    assert probe_durations["unit never"][-1] >= 0.04
+
+
+def test_port_open() -> None:
+    with socket.socket() as server:
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        port = server.getsockname()[1]
+        assert port_open("127.0.0.1", port)
+    assert not port_open("127.0.0.1", port, timeout=0.5)
+
+
+class HerdStopping:
+    """Answers like Herd.run_cmd() - sheep0 restarts once, sheep1 is unreachable."""
+
+    def __init__(self) -> None:
+        self.group_online = ["sheep0", "sheep1"]
+        self.calls = 0
+
+    def run_cmd(self, **_kwargs: object) -> dict[str, SimpleNamespace]:
+        self.calls += 1
+        state = "activating" if self.calls == 1 else "inactive"
+        return {"sheep0": SimpleNamespace(exited=3, stdout=f"{state}\n")}
+
+
+def test_wait_inactive_polls_till_inactive() -> None:
+    herd = HerdStopping()
+    assert herd_wait_inactive(herd, timeout=5)
+    assert herd.calls == 2
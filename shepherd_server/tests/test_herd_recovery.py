@@ -0,0 +1,112 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from shepherd_core import local_now
+from shepherd_server.api_experiments.models import ReplyData
+from shepherd_server.api_experiments.models import StateData
+from shepherd_server.herd_recovery import FailureKind
+from shepherd_server.herd_recovery import ObserverRecovery
+from shepherd_server.herd_recovery import classify_failure
+
+from shepherd_server import herd_recovery
+
+OBSERVERS = ["sheep0", "sheep1", "sheep2"]
+
+
+def _state(*, executed: bool = True, error: str | None = None) -> StateData:
+    return StateData(
+        requested_execution_at=local_now(),
+        started_at=local_now(),
+        executed_at=local_now() if executed else None,
+        finished_at=local_now(),
+        observers_requested=OBSERVERS,
+        observers_online=OBSERVERS,
+        observers_output={obs: ReplyData(exited=0) for obs in OBSERVERS},
+        observers_had_data=dict.fromkeys(OBSERVERS, executed),
+        scheduler_error=error,
+    )
+
+
+def test_classify_success() -> None:
+    assert classify_failure(_state()) is None
+
+
+def test_classify_single_observer() -> None:
+    state = _state()
+    state.observers_output["sheep1"] = ReplyData(exited=1)
+    state.observers_had_data["sheep2"] = False
+    failure = classify_failure(state)
+    assert failure.kind == FailureKind.observer
+    assert failure.observers == ["sheep1", "sheep2"]
+    assert not failure.retryable
+
+
+def test_classify_offline_observer_is_not_blamed() -> None:
+    state = _state()
+    state.observers_online = ["sheep0", "sheep1"]
+    state.observers_had_data["sheep2"] = False
+    failure = classify_failure(state)
+    assert failure.kind == FailureKind.observer
+    assert failure.observers == []
+
+
+def test_classify_transient_before_execution() -> None:
+    state = _state(
+        executed=False,
+        error="Caught runtime error during herd_prepare_experiment() -> "
+        "Resync or checking network-drives failed on all observers",
+    )
+    failure = classify_failure(state)
+    assert failure.kind == FailureKind.transient
+    assert failure.retryable
+
+
+def test_classify_failed_preparation() -> None:
+    state = _state(executed=False, error="Preparation of targets failed - will skip experiment")
+    assert classify_failure(state).kind == FailureKind.experiment
+
+
+def test_classify_unknown() -> None:
+    failure = classify_failure(_state(error="Timeout waiting for experiment-status"))
+    assert failure.kind == FailureKind.unknown
+    failure = classify_failure(_state(executed=False, error="Starting Emulation failed"))
+    assert failure.kind == FailureKind.unknown
+
+
+class MailStub:
+    def __init__(self) -> None:
+        self.compositions: list[dict] = []
+
+    async def send_herd_reboot_email(self, composition: dict) -> None:
+        self.compositions.append(composition)
+
+
+async def test_recovery_quarantines_till_readmission(monkeypatch: pytest.MonkeyPatch) -> None:
+    rebooted = threading.Event()
+    mail = MailStub()
+    monkeypatch.setattr(herd_recovery, "connection_clone", lambda cnx: cnx)
+    monkeypatch.setattr(herd_recovery, "get_mail_engine", lambda: mail)
+    monkeypatch.setattr(
+        herd_recovery, "_reboot_and_resync", lambda _cnx, _timeout: rebooted.wait(timeout=5)
+    )
+    herd = SimpleNamespace(
+        hostnames={f"10.0.0.{idx}": obs for idx, obs in enumerate(OBSERVERS)},
+        group_all=[
+            SimpleNamespace(host=f"10.0.0.{idx}", close=lambda: None)
+            for idx in range(len(OBSERVERS))
+        ],
+    )
+    recovery = ObserverRecovery()
+    recovery.start(herd, {"sheep1"})
+    recovery.start(herd, {"sheep1"})  # already in recovery -> no second task
+    assert recovery.quarantined == {"sheep1"}
+    assert len(recovery.tasks) == 1
+
+    rebooted.set()
+    await recovery.finish()
+    await asyncio.sleep(0)  # done-callbacks run in the next iteration
+    assert recovery.quarantined == set()
+    assert mail.compositions[0]["rebooted"] == {"sheep1"}
+    assert mail.compositions[0]["post"] == set(OBSERVERS)
@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from shepherd_core import local_now
+from shepherd_server.config import server_config
+from shepherd_server.herd_start_delay import MISS_PENALTY_S
+from shepherd_server.herd_start_delay import PENALTY_DECAY_S
+from shepherd_server.herd_start_delay import SAMPLES_MIN
+from shepherd_server.herd_start_delay import StartDelay
+
+
+def test_delay_defaults_to_max() -> None:
+    estimator = StartDelay()
+    assert estimator.delay_s == server_config.start_delay_max.total_seconds()
+    for _ in range(SAMPLES_MIN - 1):
+        estimator.record_dispatch(2.0)
+    assert estimator.delay_s == server_config.start_delay_max.total_seconds()
+
+
+def test_delay_follows_dispatch_latency() -> None:
+    estimator = StartDelay()
+    for _ in range(20):
+        estimator.record_dispatch(2.0)
+    margin_s = server_config.start_delay_margin.total_seconds()
+    assert estimator.delay_s == 2 + margin_s
+    for _ in range(5):
+        estimator.record_dispatch(100.0)  # slow dispatch is capped
+    assert estimator.delay_s == server_config.start_delay_max.total_seconds()
+
+
+def test_miss_increases_delay() -> None:
+    estimator = StartDelay()
+    for _ in range(20):
+        estimator.record_dispatch(2.0)
+    delay_s = estimator.delay_s
+    planned = local_now()
+    assert not estimator.record_start(planned, planned + timedelta(seconds=0.5))
+    assert not estimator.record_start(planned, None)
+    assert estimator.record_start(planned, planned + timedelta(seconds=4))
+    assert estimator.misses == 1
+    assert estimator.delay_s > delay_s
+
+
+def test_delay_recovers_after_punctual_starts() -> None:
+    estimator = StartDelay()
+    for _ in range(20):
+        estimator.record_dispatch(2.0)
+    delay_s = estimator.delay_s
+    planned = local_now()
+    assert estimator.record_start(planned, planned + timedelta(seconds=4))
+    assert estimator.delay_s > delay_s
+    for _ in range(round(MISS_PENALTY_S / PENALTY_DECAY_S)):
+        assert not estimator.record_start(planned, planned)
+    assert estimator.penalty_s == 0
+    assert estimator.delay_s == delay_s
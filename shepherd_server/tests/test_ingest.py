@@ -0,0 +1,104 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from shepherd_core.writer import Writer as CoreWriter
+from shepherd_server.cli import cli
+from shepherd_server.ingest_pipeline import CHUNK_SAMPLES
+from shepherd_server.ingest_pipeline import benchmark
+from shepherd_server.ingest_pipeline import ingest
+from shepherd_server.ingest_sinks import SINKS
+from shepherd_server.ingest_sinks import IngestBatch
+from shepherd_server.ingest_sinks import sinks_available
+from typer.testing import CliRunner
+
+from shepherd_server import ingest_pipeline
+
+SAMPLES_N = 300_000
+
+
+def write_recording(path: Path, hostname: str) -> Path:
+    with CoreWriter(path) as writer:
+        writer.store_hostname(hostname)
+        writer.append_iv_data_si(
+            timestamp=1_700_000_000.0,
+            voltage=np.linspace(0, 3, SAMPLES_N),
+            current=np.full(SAMPLES_N, 1e-3),
+        )
+    return path
+
+
+@pytest.fixture
+def recordings(tmp_path: Path) -> list[Path]:
+    return [write_recording(tmp_path / f"rec{idx}.h5", f"sheep{idx}") for idx in range(3)]
+
+
+@pytest.mark.parametrize("sink_name", sinks_available())
+def test_ingest_into_sink(sink_name: str, recordings: list[Path], tmp_path: Path) -> None:
+    with SINKS[sink_name](tmp_path / f"db.{sink_name}") as sink:
+        stats = ingest(recordings, sink, workers=2)
+        assert stats.rows == 3 * SAMPLES_N
+        assert stats.rows_per_s > 0
+        assert sink.count_rows("sheep1") == SAMPLES_N
+        assert sink.get_checkpoint(recordings[0].resolve().as_posix()) == SAMPLES_N
+
+
+@pytest.mark.parametrize("sink_name", sinks_available())
+def test_ingest_resumes_from_checkpoint(
+    sink_name: str, recordings: list[Path], tmp_path: Path
+) -> None:
+    source = recordings[0].resolve().as_posix()
+    with SINKS[sink_name](tmp_path / f"db.{sink_name}") as sink:
+        # simulate an interrupted run with the first chunk already stored
+        sink.write(
+            IngestBatch(
+                observer="sheep0",
+                source=source,
+                offset_end=CHUNK_SAMPLES,
+                time_ns=np.arange(CHUNK_SAMPLES),
+                voltage=np.zeros(CHUNK_SAMPLES),
+                current=np.zeros(CHUNK_SAMPLES),
+            )
+        )
+        stats = ingest(recordings[:1], sink)
+        assert stats.rows == SAMPLES_N - CHUNK_SAMPLES
+        assert sink.count_rows("sheep0") == SAMPLES_N
+        # complete files are skipped
+        assert ingest(recordings[:1], sink).rows == 0
+
+
+def test_ingest_skips_unreadable_file(recordings: list[Path], tmp_path: Path) -> None:
+    path_bad = tmp_path / "bad.h5"
+    path_bad.write_bytes(b"no hdf5")
+    with SINKS["sqlite"](tmp_path / "db.sqlite") as sink:
+        stats = ingest([path_bad, *recordings[:1]], sink)
+    assert stats.rows == SAMPLES_N
+
+
+def test_ingest_stops_readers_on_sink_error(
+    recordings: list[Path], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(ingest_pipeline, "QUEUE_SIZE", 1)  # readers block on the full queue
+
+    def write_fails(_batch: IngestBatch) -> None:
+        raise OSError("disk full")
+
+    with SINKS["sqlite"](tmp_path / "db.sqlite") as sink:
+        monkeypatch.setattr(sink, "write", write_fails)
+        with pytest.raises(OSError, match="disk full"):
+            ingest(recordings, sink, workers=3)
+
+
+def test_benchmark_reports_all_sinks(recordings: list[Path]) -> None:
+    results = benchmark(recordings[:1], workers=1)
+    assert {stats.sink for stats in results} == set(sinks_available())
+
+
+def test_cli_ingest(recordings: list[Path], tmp_path: Path) -> None:
+    res = CliRunner().invoke(
+        app=cli,
+        args=["ingest", *[p.as_posix() for p in recordings], "--target", str(tmp_path / "db")],
+    )
+    assert res.exit_code == 0
+    with SINKS["sqlite"](tmp_path / "db") as sink:
+        assert sink.count_rows() == 3 * SAMPLES_N
@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import h5py
+import numpy as np
+from shepherd_core.reader import Reader as CoreReader
+from shepherd_core.writer import Writer as CoreWriter
+from shepherd_server.results_repack import repack_result
+
+
+def write_uncompressed(path: Path) -> Path:
+    samples_n = 200_000
+    with CoreWriter(path, compression=None) as writer:
+        writer.store_hostname("sheep0")
+        writer.append_iv_data_si(
+            timestamp=0.0,
+            voltage=np.round(2 + np.sin(np.linspace(0, 60, samples_n)), 2),
+            current=np.full(samples_n, 1e-3),
+        )
+        writer.h5file.create_dataset("extra", data=np.arange(10).reshape(5, 2))
+    return path
+
+
+def test_repack_shrinks_file_and_keeps_content(tmp_path: Path) -> None:
+    path = write_uncompressed(tmp_path / "sheep0.h5")
+    with CoreReader(path, verbose=False) as reader:
+        voltage_pre = reader.ds_voltage[:]
+        hostname_pre = reader.get_hostname()
+    size_pre = path.stat().st_size
+
+    saved = repack_result(path)
+    assert saved > 0
+    assert path.stat().st_size == size_pre - saved
+    assert not path.with_name(f".{path.name}.repack").exists()
+    with CoreReader(path, verbose=False) as reader:
+        assert np.array_equal(reader.ds_voltage[:], voltage_pre)
+        assert reader.get_hostname() == hostname_pre
+        assert reader.ds_voltage.compression == "gzip"
+        assert reader.ds_voltage.shuffle
+        assert reader.h5file["extra"].shape == (5, 2)
+
+
+def test_repack_skips_repacked_file(tmp_path: Path) -> None:
+    path = write_uncompressed(tmp_path / "sheep0.h5")
+    assert repack_result(path) > 0
+    assert repack_result(path) == 0
+
+
+def test_repack_keeps_unreadable_file(tmp_path: Path) -> None:
+    path = tmp_path / "sheep0.h5"
+    path.write_bytes(b"no hdf5")
+    assert repack_result(path) == 0
+    assert path.read_bytes() == b"no hdf5"
+
+
+def test_repack_with_throttle(tmp_path: Path) -> None:
+    path = write_uncompressed(tmp_path / "sheep0.h5")
+    assert repack_result(path, rate=2**30) > 0
+    with h5py.File(path, "r") as h5file:
+        assert h5file["data"]["time"].compression == "gzip"
@@ -0,0 +1,83 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from pymongo.errors import ServerSelectionTimeoutError
+from shepherd_core.data_models.base.timezone import local_now
+from shepherd_server.api_testbed.models_status import SchedulerLease
+from shepherd_server.config import server_config
+from shepherd_server.instance_db import db_client
+from shepherd_server.scheduler_lease import LeaderLease
+
+
+@pytest.fixture
+async def lease_db() -> bool:
+    await db_client()
+    await SchedulerLease.delete_all()
+    return True
+
+
+async def test_only_one_holder(*, lease_db: bool) -> None:
+    assert lease_db
+    active = LeaderLease()
+    standby = LeaderLease()
+    assert await active.acquire()
+    assert not await standby.acquire()
+    assert await active.acquire()  # renewal
+
+
+async def test_takeover_after_release(*, lease_db: bool) -> None:
+    assert lease_db
+    active = LeaderLease()
+    standby = LeaderLease()
+    assert await active.acquire()
+    await active.release()
+    assert await standby.acquire()
+    assert not await active.acquire()
+
+
+async def test_takeover_after_expiry(monkeypatch: pytest.MonkeyPatch, *, lease_db: bool) -> None:
+    assert lease_db
+    monkeypatch.setattr(server_config, "scheduler_lease_ttl", timedelta(0))
+    active = LeaderLease()
+    standby = LeaderLease()
+    assert await active.acquire()
+    assert await standby.acquire()
+
+
+def outage(lease: LeaderLease, failures: int) -> None:
+    """Database fails the next renewals, then recovers (-1: stays down)."""
+    calls = {"count": 0}
+
+    async def acquire() -> bool:
+        calls["count"] += 1
+        if failures < 0 or calls["count"] <= failures:
+            raise ServerSelectionTimeoutError("database unreachable")
+        lease.expires_at = local_now() + server_config.scheduler_lease_ttl
+        return True
+
+    lease.acquire = acquire
+
+
+async def test_heartbeat_survives_outage(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(server_config, "scheduler_lease_ttl", timedelta(seconds=0.6))
+    lease = LeaderLease()
+    lease.held = True
+    lease.expires_at = local_now() + server_config.scheduler_lease_ttl
+    outage(lease, failures=1)
+    task = asyncio.create_task(lease._heartbeat())  # noqa: SLF001
+    await asyncio.sleep(0.8)
+    assert lease.held
+    task.cancel()
+
+
+async def test_heartbeat_gives_up_before_expiry(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(server_config, "scheduler_lease_ttl", timedelta(seconds=0.6))
+    lease = LeaderLease()
+    lease.held = True
+    lease.expires_at = local_now() + server_config.scheduler_lease_ttl
+    outage(lease, failures=-1)
+    task = asyncio.create_task(lease._heartbeat())  # noqa: SLF001
+    await asyncio.sleep(0.55)
+    assert not lease.held
+    task.cancel()
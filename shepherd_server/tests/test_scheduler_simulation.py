@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+from shepherd_server.scheduler_simulation import POLICIES
+from shepherd_server.scheduler_simulation import SimJob
+from shepherd_server.scheduler_simulation import WorkloadConfig
+from shepherd_server.scheduler_simulation import load_workload
+from shepherd_server.scheduler_simulation import save_workload
+from shepherd_server.scheduler_simulation import simulate
+from shepherd_server.scheduler_simulation import synthetic_workload
+
+
+def _job(idx: int, arrival_s: float, duration_s: float, observers: list[str]) -> SimJob:
+    return SimJob(
+        id=idx,
+        owner=f"user{idx}",
+        arrival_s=arrival_s,
+        duration_s=duration_s,
+        observers=observers,
+        prep_s=0,
+        teardown_s=0,
+    )
+
+
+def test_simulation_fifo_is_serial() -> None:
+    jobs = [_job(0, 0, 100, ["sheep0"]), _job(1, 0, 100, ["sheep1"])]
+    result = simulate(jobs, POLICIES["fifo"])
+    assert result.makespan_s == 200
+    assert result.wait_max_s == 100
+    assert result.utilization == pytest.approx(0.5)
+
+
+def test_simulation_disjoint_runs_in_parallel() -> None:
+    jobs = [
+        _job(0, 0, 100, ["sheep0"]),
+        _job(1, 0, 100, ["sheep0", "sheep1"]),
+        _job(2, 0, 100, ["sheep1"]),
+    ]
+    result = simulate(jobs, POLICIES["fifo_disjoint"])
+    # job 2 backfills next to job 0, job 1 waits for both
+    assert result.makespan_s == 200
+    assert result.wait_max_s == 100
+
+
+def test_simulation_shortest_first_reduces_wait() -> None:
+    jobs = [_job(0, 0, 1000, ["sheep0"]), _job(1, 1, 1000, ["sheep0"])]
+    jobs += [_job(idx, 2, 10, ["sheep0"]) for idx in range(2, 6)]
+    fifo = simulate(jobs, POLICIES["fifo"])
+    sjf = simulate(jobs, POLICIES["shortest_first"])
+    assert fifo.makespan_s == sjf.makespan_s
+    assert sjf.wait_mean_s < fifo.wait_mean_s
+
+
+def test_simulation_failures_add_reboot() -> None:
+    job = _job(0, 0, 100, ["sheep0"])
+    job.fails = True
+    result = simulate([job], POLICIES["fifo"], reboot_s=50)
+    assert result.failed_n == 1
+    assert result.makespan_s == 150
+
+
+def test_simulation_synthetic_is_reproducible(tmp_path: Path) -> None:
+    config = WorkloadConfig(jobs_n=50, seed=3)
+    jobs = synthetic_workload(config)
+    assert jobs == synthetic_workload(config)
+    save_workload(jobs, tmp_path / "workload.json")
+    assert load_workload(tmp_path / "workload.json") == jobs
+    for policy in POLICIES.values():
+        result = simulate(jobs, policy)
+        assert result.jobs_n == 50
+        assert 0 < result.utilization <= 1